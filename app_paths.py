@@ -0,0 +1,21 @@
+"""
+Nuitkalicious - Application data locations
+Description: Shared helper for the per-user directory Nuitkalicious keeps its
+caches, history and settings in
+"""
+
+import os
+
+
+def app_data_dir(*parts):
+    """Return (and create) a directory under the Nuitkalicious data folder"""
+    # NUITKALICIOUS_HOME lets CI machines point everything at a scratch disk
+    base = os.environ.get('NUITKALICIOUS_HOME')
+    if not base:
+        if os.name == 'nt':
+            base = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'Nuitkalicious')
+        else:
+            base = os.path.join(os.path.expanduser('~'), '.nuitkalicious')
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
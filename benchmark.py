@@ -0,0 +1,228 @@
+"""
+Nuitkalicious - Executable benchmarks
+Description: Runs a built program and measures what users notice: time to
+exit (or to a "ready" line on stdout), peak memory of the whole process tree
+and the size of the output. Cold runs first drop the output's files from the
+page cache where the OS allows it.
+"""
+
+import os
+import re
+import shlex
+import signal
+import subprocess
+import threading
+import time
+
+import process_tree
+from build_cache import path_size
+
+# How often the process tree is sampled for its memory use, and checked for exit
+SAMPLE_INTERVAL = 0.02
+POLL_INTERVAL = 0.002
+
+
+class RunSample:
+    """One run of a program"""
+
+    def __init__(self, elapsed, peak_rss, returncode, timed_out=False, ready=False):
+        self.elapsed = elapsed
+        self.peak_rss = peak_rss
+        self.returncode = returncode
+        self.timed_out = timed_out
+        self.ready = ready
+
+    @property
+    def ok(self):
+        # Reaching the ready line counts as success even though the program was stopped
+        return self.ready or (not self.timed_out and self.returncode == 0)
+
+
+def benchmark_settings(options):
+    """Return the [benchmark] settings with numbers coerced"""
+    settings = dict(options['benchmark'])
+    settings['timeout'] = float(settings['timeout'])
+    settings['repeat'] = max(1, int(settings['repeat']))
+    settings['startup_threshold_pct'] = float(settings['startup_threshold_pct'])
+    settings['size_threshold_pct'] = float(settings['size_threshold_pct'])
+    return settings
+
+
+def split_args(text):
+    return shlex.split(text, posix=os.name != 'nt') if text else []
+
+
+def command_for(executable, command):
+    """Return the argument list for a benchmark command line
+
+    {exe} in the command is replaced by the program; without it the command
+    is taken as the program's own arguments.
+    """
+    args = split_args(command)
+    if any('{exe}' in arg for arg in args):
+        return [arg.replace('{exe}', executable) for arg in args]
+    return [executable] + args
+
+
+def evict_from_page_cache(path):
+    """Ask the OS to drop a file or folder from the page cache; returns True if it could"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    paths = [path] if os.path.isfile(path) else [
+        os.path.join(directory, name) for directory, _dirnames, names in os.walk(path) for name in names]
+    for name in paths:
+        try:
+            fd = os.open(name, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def _tree_rss(pid):
+    return sum(sample.rss for sample in process_tree.process_tree(pid))
+
+
+def kill_tree(process):
+    """Kill a program started by run_sample() and everything it started, such as a onefile child"""
+    if process.poll() is not None:
+        return
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                       capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def run_sample(args, cwd=None, timeout=60, env=None, ready_pattern=None, on_start=None):
+    """Run a program once and return a RunSample
+
+    With ready_pattern the run ends, and the program is stopped, as soon as a
+    stdout line matches it. on_start(process) lets callers cancel the run.
+    """
+    ready_at = []
+    ready_event = threading.Event()
+    kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {'start_new_session': True}
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.PIPE if ready_pattern else subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, **kwargs)
+    if on_start:
+        on_start(process)
+
+    if ready_pattern:
+        pattern = re.compile(ready_pattern)
+
+        def watch():
+            for raw in process.stdout:
+                if not ready_event.is_set() and pattern.search(raw.decode('utf-8', 'replace')):
+                    ready_at.append(time.perf_counter())
+                    ready_event.set()
+            process.stdout.close()
+
+        threading.Thread(target=watch, daemon=True).start()
+
+    peak = 0
+    timed_out = False
+    # The first sample waits one interval: until the child has exec'd, its
+    # memory is a copy of this process (the kernel's own peak counter, from
+    # wait4, includes that copy too, so it is not used)
+    next_sample = start + SAMPLE_INTERVAL
+    while True:
+        if ready_event.is_set():
+            kill_tree(process)
+            process.wait()
+            return RunSample(ready_at[0] - start, peak or None, process.returncode, ready=True)
+        if process.poll() is not None:
+            elapsed = time.perf_counter() - start
+            break
+        now = time.perf_counter()
+        if now - start > timeout:
+            kill_tree(process)
+            process.wait()
+            elapsed = time.perf_counter() - start
+            timed_out = True
+            break
+        if now >= next_sample:
+            peak = max(peak, _tree_rss(process.pid))
+            next_sample = now + SAMPLE_INTERVAL
+        ready_event.wait(POLL_INTERVAL)
+    return RunSample(elapsed, peak or None, process.returncode, timed_out)
+
+
+class ProgramMetrics:
+    """Size, startup, memory and benchmark numbers for one built program
+
+    unpacked is what a onefile program leaves unpacked on disk, when measured.
+    """
+
+    FIELDS = ('size', 'cold_start', 'warm_start', 'peak_rss', 'benchmark', 'unpacked')
+
+    def __init__(self, size=None, cold_start=None, warm_start=None, peak_rss=None, benchmark=None, unpacked=None,
+                 errors=None):
+        self.size = size
+        self.cold_start = cold_start
+        self.warm_start = warm_start
+        self.peak_rss = peak_rss
+        self.benchmark = benchmark
+        self.unpacked = unpacked
+        self.errors = errors or []
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['errors'] = self.errors
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: data.get(key) for key in cls.FIELDS + ('errors',)})
+
+
+def measure_program(executable, output, settings, cwd=None, on_start=None, check_cancelled=None):
+    """Measure a built program with the [benchmark] settings; returns ProgramMetrics
+
+    output is the file or folder whose size is reported (the .dist folder for
+    standalone builds). Startup is measured repeat + 1 times: the first run is
+    the cold one, the fastest later run the warm one.
+    """
+    metrics = ProgramMetrics(size=path_size(output))
+    startup = [executable] + split_args(settings['startup_args'])
+    ready_pattern = settings['ready_pattern'] or None
+    samples = []
+    for index in range(settings['repeat'] + 1):
+        if check_cancelled:
+            check_cancelled()
+        if index == 0:
+            evict_from_page_cache(output)
+        sample = run_sample(startup, cwd, settings['timeout'], ready_pattern=ready_pattern, on_start=on_start)
+        if not sample.ok:
+            reason = 'timed out' if sample.timed_out else f"exit code {sample.returncode}"
+            metrics.errors.append(f"Startup run {reason}")
+            return metrics
+        samples.append(sample)
+    metrics.cold_start = samples[0].elapsed
+    metrics.warm_start = min(sample.elapsed for sample in samples[1:])
+    rss = [sample.peak_rss for sample in samples if sample.peak_rss]
+    metrics.peak_rss = max(rss) if rss else None
+
+    if settings['command']:
+        times = []
+        for _ in range(settings['repeat']):
+            if check_cancelled:
+                check_cancelled()
+            sample = run_sample(command_for(executable, settings['command']), cwd, settings['timeout'],
+                                on_start=on_start)
+            if not sample.ok:
+                reason = 'timed out' if sample.timed_out else f"exit code {sample.returncode}"
+                metrics.errors.append(f"Benchmark command {reason}")
+                break
+            times.append(sample.elapsed)
+        if times:
+            metrics.benchmark = min(times)
+    return metrics
@@ -0,0 +1,371 @@
+"""
+Nuitkalicious - Build cache
+Description: Content-addressed "skip if unchanged" cache of finished Nuitka
+outputs. A build is keyed by a fingerprint of the Nuitka command, the script
+and its local imports, the resource files and icon, and the Python/Nuitka
+versions of the interpreter doing the compile.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+import uuid
+
+from app_paths import app_data_dir
+
+CACHE_FORMAT = 1
+META_FILE = 'meta.json'
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Return the sha256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _resolve_local_module(name, base_dir):
+    # Map a dotted module name onto a .py file or package below base_dir
+    candidate = os.path.join(base_dir, *name.split('.'))
+    if os.path.isfile(candidate + '.py'):
+        return candidate + '.py'
+    init_file = os.path.join(candidate, '__init__.py')
+    if os.path.isfile(init_file):
+        return init_file
+    return None
+
+
+def find_local_imports(script_path):
+    """Return the script plus every module it imports from its own directory tree"""
+    script_path = os.path.abspath(script_path)
+    root_dir = os.path.dirname(script_path)
+    seen = set()
+    pending = [script_path]
+
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            with open(path, 'rb') as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            continue
+
+        module_dir = os.path.dirname(path)
+        for node in ast.walk(tree):
+            names = []
+            if isinstance(node, ast.Import):
+                names = [(alias.name, root_dir) for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    # Relative import - walk up from the importing module
+                    base = module_dir
+                    for _ in range(node.level - 1):
+                        base = os.path.dirname(base)
+                else:
+                    base = root_dir
+                if node.module:
+                    names.append((node.module, base))
+                    # "from pkg import mod" may name submodules as well
+                    names.extend((f"{node.module}.{alias.name}", base) for alias in node.names)
+                else:
+                    names.extend((alias.name, base) for alias in node.names)
+
+            for name, base in names:
+                # Importing a.b.c also executes a/__init__.py and a/b/__init__.py
+                parts = name.split('.')
+                for i in range(1, len(parts) + 1):
+                    resolved = _resolve_local_module('.'.join(parts[:i]), base)
+                    if resolved and resolved not in seen:
+                        pending.append(resolved)
+
+    return sorted(seen)
+
+
+_VERSION_PROBE = (
+    "import sys\n"
+    "try:\n"
+    "    from importlib.metadata import version\n"
+    "    nuitka_version = version('nuitka')\n"
+    "except Exception:\n"
+    "    nuitka_version = ''\n"
+    "print(sys.version.split()[0])\n"
+    "print(nuitka_version)\n"
+)
+
+
+def probe_versions(python_path):
+    """Return (python_version, nuitka_version) for an interpreter"""
+    try:
+        result = subprocess.run(
+            [python_path, '-c', _VERSION_PROBE],
+            capture_output=True,
+            text=True,
+            timeout=60,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+    except (OSError, subprocess.SubprocessError):
+        return '', ''
+    lines = result.stdout.splitlines() + ['', '']
+    return lines[0].strip(), lines[1].strip()
+
+
+def compute_fingerprint(command, script_path, resource_files=(), icon_path=None,
+                        python_version='', nuitka_version='', module_files=None, packages=None):
+    """Return the cache key for a build
+
+    module_files defaults to the script and its local imports. packages is an
+    optional list of [distribution, version] pairs for third-party code the
+    script reaches, so upgrading one of them in the venv is a cache miss.
+    """
+    if module_files is None:
+        module_files = find_local_imports(script_path)
+    script_dir = os.path.dirname(os.path.abspath(script_path))
+
+    def entry(path):
+        # Hash relative to the script so identical checkouts on other machines match
+        rel = os.path.relpath(os.path.abspath(path), script_dir) if path else ''
+        return [rel.replace(os.sep, '/'), hash_file(path) if path and os.path.isfile(path) else None]
+
+    document = {
+        'format': CACHE_FORMAT,
+        # Absolute paths in the command differ between machines and checkouts
+        'command': [part.replace(script_dir, '<script_dir>') for part in command],
+        'modules': [entry(path) for path in module_files],
+        'resources': [entry(path) for path in resource_files],
+        'icon': entry(icon_path) if icon_path else None,
+        'python': python_version,
+        'nuitka': nuitka_version,
+        'packages': packages or [],
+    }
+    payload = json.dumps(document, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def expected_outputs(script_path, output_dir, standalone=False, onefile=False):
+    """Return the output paths Nuitka produces for a script"""
+    stem = os.path.splitext(os.path.basename(script_path))[0]
+    exe_suffix = '.exe' if os.name == 'nt' else '.bin'
+    if onefile:
+        return [os.path.join(output_dir, stem + exe_suffix)]
+    if standalone:
+        return [os.path.join(output_dir, stem + '.dist')]
+    return [os.path.join(output_dir, stem + exe_suffix)]
+
+
+def find_executable(script_path, output_dir, standalone=False, onefile=False):
+    """Return the program Nuitka built for a script, or None"""
+    output = expected_outputs(script_path, output_dir, standalone, onefile)[0]
+    if not os.path.isdir(output):
+        return output if os.path.isfile(output) else None
+    stem = os.path.splitext(os.path.basename(script_path))[0]
+    for name in (stem + '.exe', stem + '.bin', stem):
+        path = os.path.join(output, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def path_size(path):
+    """Return the size of a file, or of everything below a folder"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _remove_path(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def _copy_path(source, target):
+    if os.path.isdir(source):
+        shutil.copytree(source, target, symlinks=True)
+    else:
+        shutil.copy2(source, target)
+
+
+class ArtifactStore:
+    """Directory of cached build outputs, one sub-directory per cache key
+
+    Each entry carries a meta.json whose mtime records when it was last used,
+    so several processes (or machines, for a shared directory) can use the
+    same store without a central index.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _read_meta(self, key):
+        try:
+            with open(os.path.join(self._entry_dir(key), META_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def has(self, key):
+        return self._read_meta(key) is not None
+
+    def touch(self, key):
+        meta_path = os.path.join(self._entry_dir(key), META_FILE)
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+
+    def restore(self, key, dest_dir):
+        """Copy a cached entry into dest_dir and return the restored paths"""
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        restored = []
+        for name in meta['outputs']:
+            source = os.path.join(self._entry_dir(key), 'outputs', name)
+            target = os.path.join(dest_dir, name)
+            # Restore beside the target and swap in, so a failed copy never
+            # leaves a half-written executable behind
+            staging = f"{target}.restore-{uuid.uuid4().hex[:8]}"
+            _copy_path(source, staging)
+            _remove_path(target)
+            os.replace(staging, target)
+            restored.append(target)
+        self.touch(key)
+        return restored
+
+    def import_entry(self, key, other_store):
+        """Copy an entry from another store into this one"""
+        source_dir = other_store._entry_dir(key)
+        staging = os.path.join(self.root, f".incoming-{uuid.uuid4().hex}")
+        shutil.copytree(source_dir, staging, symlinks=True)
+        self._publish(key, staging)
+
+    def put(self, key, paths):
+        """Store finished outputs under key"""
+        staging = os.path.join(self.root, f".incoming-{uuid.uuid4().hex}")
+        outputs_dir = os.path.join(staging, 'outputs')
+        os.makedirs(outputs_dir)
+        try:
+            names = []
+            for path in paths:
+                name = os.path.basename(path.rstrip('/\\'))
+                _copy_path(path, os.path.join(outputs_dir, name))
+                names.append(name)
+            meta = {
+                'format': CACHE_FORMAT,
+                'outputs': names,
+                'size': path_size(outputs_dir),
+                'created': time.time(),
+            }
+            with open(os.path.join(staging, META_FILE), 'w') as f:
+                json.dump(meta, f)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._publish(key, staging)
+
+    def _publish(self, key, staging):
+        # Rename is atomic, so readers see either no entry or a complete one
+        target = self._entry_dir(key)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another build (or machine) published the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        """Return (key, size, last_used) for every entry"""
+        result = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return result
+        for name in names:
+            if name.startswith('.'):
+                continue
+            meta_path = os.path.join(self.root, name, META_FILE)
+            try:
+                last_used = os.path.getmtime(meta_path)
+                with open(meta_path, 'r') as f:
+                    size = json.load(f).get('size', 0)
+            except (OSError, ValueError):
+                continue
+            result.append((name, size, last_used))
+        return result
+
+    def total_size(self):
+        return sum(size for _key, size, _used in self.entries())
+
+    def evict(self):
+        """Remove least recently used entries until the store fits max_bytes"""
+        if not self.max_bytes:
+            return []
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _key, size, _used in entries)
+        removed = []
+        for key, size, _used in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+
+class BuildCache:
+    """Local artifact store with an optional shared-directory backend"""
+
+    def __init__(self, local_dir=None, max_bytes=DEFAULT_MAX_BYTES, shared_dir=None, shared_max_bytes=None):
+        self.local = ArtifactStore(local_dir or app_data_dir('artifacts'), max_bytes)
+        self.shared = None
+        if shared_dir:
+            self.shared = ArtifactStore(shared_dir, shared_max_bytes)
+
+    def lookup(self, key, dest_dir):
+        """Restore outputs for key into dest_dir; returns the paths or None on a miss"""
+        if self.local.has(key):
+            return self.local.restore(key, dest_dir)
+        if self.shared is not None and self.shared.has(key):
+            # Pull the entry down so the next hit is local
+            self.local.import_entry(key, self.shared)
+            self.shared.touch(key)
+            return self.local.restore(key, dest_dir)
+        return None
+
+    def store(self, key, paths):
+        """Save finished outputs; missing paths mean the build did not produce them"""
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            return False
+        self.local.put(key, paths)
+        if self.shared is not None and not self.shared.has(key):
+            try:
+                self.shared.import_entry(key, self.local)
+            except OSError:
+                # The shared directory is best effort - a network hiccup
+                # should not fail a build that already succeeded
+                pass
+        return True
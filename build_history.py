@@ -0,0 +1,278 @@
+"""
+Nuitkalicious - Build history
+Description: Records every build in a local SQLite database (option
+fingerprint, per-phase durations, cache hits, output size, exit status) and
+uses the history of the same configuration to turn Nuitka's output into a
+progress fraction and a predicted ETA while a build runs. Builds that take
+far longer than their historical median are flagged.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from app_paths import app_data_dir
+
+# Nuitka's phases in the order they run, with the output lines that start them.
+# Matched against normal output and --show-progress output alike.
+PHASES = (
+    ('optimization', "Python optimization",
+     re.compile(r"Starting Python compilation|Nuitka-Progress|PASS 1\b|Optimizing module")),
+    ('c_generation', "C generation",
+     re.compile(r"Completed Python level compilation|Generating source code for C backend")),
+    ('c_compile', "C compile", re.compile(r"Running C compilation via Scons|Backend C compiler")),
+    ('link', "Link", re.compile(r"Backend linking program|Linking program")),
+    ('onefile', "Onefile packing", re.compile(r"Creating single file|Nuitka-Onefile")),
+)
+PHASE_LABELS = {name: label for name, label, _pattern in PHASES}
+
+_PERCENT = re.compile(r"(\d{1,3})%")
+_MODULES_LEFT = re.compile(r"(\d+) more modules? to go")
+_CACHE_HITS = re.compile(r"cache hit'?:?\s*(\d+)", re.IGNORECASE)
+
+# A build this many times slower than the median of its configuration is flagged
+SLOW_FACTOR = 1.5
+# Successful builds of a configuration needed before its median is trusted
+MIN_SAMPLES = 3
+# Builds whose durations are used for a prediction
+ESTIMATE_SAMPLES = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    script TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    returncode INTEGER,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    elapsed REAL NOT NULL,
+    output_size INTEGER,
+    cache_hits INTEGER,
+    cache_misses INTEGER,
+    phases TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_fingerprint ON builds (fingerprint, started);
+CREATE INDEX IF NOT EXISTS builds_script ON builds (script, started);
+"""
+
+
+def build_fingerprint(cmd, env=None):
+    """Return the key of a build configuration
+
+    --jobs and --output-dir are left out: they change how a build runs, not
+    what it builds, and the auto jobs count moves with free memory. env holds
+    extra compiler settings such as PGO's profile flags.
+    """
+    args = [arg for arg in cmd if not arg.startswith(('--jobs=', '--output-dir='))]
+    args += [f'{name}={value}' for name, value in sorted((env or {}).items())]
+    return hashlib.sha256('\0'.join(args).encode('utf-8')).hexdigest()[:16]
+
+
+def format_duration(seconds):
+    if seconds < 10:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+class Estimate:
+    """Median phase durations of earlier builds of a configuration"""
+
+    def __init__(self, phases, total, samples, same_config):
+        self.phases = phases
+        self.total = total
+        self.samples = samples
+        # False when only other configurations of the same script were found
+        self.same_config = same_config
+
+
+class BuildHistory:
+    """SQLite store of finished builds"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), 'build_history.sqlite')
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Imported here: sqlite3 costs the GUI's startup ~15 ms and is first needed by a build
+        import sqlite3
+
+        # One connection per call: builds finish on worker threads
+        db = sqlite3.connect(self.path, timeout=10)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(self, script, fingerprint, started, elapsed, phases, returncode=None, cancelled=False,
+               output_size=None, cache_hits=None, cache_misses=None):
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT INTO builds (started, script, fingerprint, returncode, cancelled, elapsed, output_size,"
+                " cache_hits, cache_misses, phases) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started, os.path.abspath(script), fingerprint, returncode, int(cancelled), elapsed, output_size,
+                 cache_hits, cache_misses, json.dumps(phases)))
+
+    def _successful(self, column, value, limit):
+        with self._connect() as db:
+            return db.execute(
+                f"SELECT elapsed, phases FROM builds WHERE {column} = ? AND returncode = 0 AND NOT cancelled"
+                " ORDER BY started DESC LIMIT ?", (value, limit)).fetchall()
+
+    def estimate(self, fingerprint, script=None):
+        """Return an Estimate from the latest successful builds, or None without history
+
+        Builds of the same configuration are preferred; other configurations
+        of the same script are a rough fallback.
+        """
+        rows = self._successful('fingerprint', fingerprint, ESTIMATE_SAMPLES)
+        same_config = bool(rows)
+        if not rows and script:
+            rows = self._successful('script', os.path.abspath(script), ESTIMATE_SAMPLES)
+        if not rows:
+            return None
+        import statistics
+
+        phases = {}
+        for name, _label, _pattern in PHASES:
+            durations = [json.loads(row['phases']).get(name) for row in rows]
+            durations = [seconds for seconds in durations if seconds is not None]
+            if durations:
+                phases[name] = statistics.median(durations)
+        return Estimate(phases, statistics.median(row['elapsed'] for row in rows), len(rows), same_config)
+
+    def median_elapsed(self, fingerprint):
+        """Return the median successful build time of a configuration, or None with too few builds"""
+        rows = self._successful('fingerprint', fingerprint, ESTIMATE_SAMPLES)
+        if len(rows) < MIN_SAMPLES:
+            return None
+        import statistics
+
+        return statistics.median(row['elapsed'] for row in rows)
+
+    def recent(self, script=None, limit=50):
+        """Return the latest builds, newest first, as dicts"""
+        query = "SELECT * FROM builds"
+        params = []
+        if script:
+            query += " WHERE script = ?"
+            params.append(os.path.abspath(script))
+        query += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as db:
+            rows = db.execute(query, params).fetchall()
+        return [dict(row, phases=json.loads(row['phases'])) for row in rows]
+
+
+class PhaseTracker:
+    """Follow a running build through Nuitka's phases
+
+    feed() takes each output line and returns the new phase name when a
+    phase starts. progress() can be called from any thread.
+    """
+
+    def __init__(self, estimate=None, median_elapsed=None):
+        self.estimate = estimate
+        self.median_elapsed = median_elapsed
+        self.started = time.perf_counter()
+        self.phase = None
+        self.phase_started = self.started
+        self.phase_fraction = None
+        self.modules_done = 0
+        self.durations = {}
+        self.cache_hits = None
+        self._lock = threading.Lock()
+
+    def feed(self, line):
+        hits = _CACHE_HITS.search(line)
+        with self._lock:
+            if hits and 'ccache' in line.lower():
+                self.cache_hits = int(hits.group(1))
+            index = self._index(self.phase)
+            # Phases only move forward; later phases may repeat earlier markers
+            for position, (name, _label, pattern) in enumerate(PHASES):
+                if position > index and pattern.search(line):
+                    self._enter(name)
+                    return name
+            self._update_fraction(line)
+        return None
+
+    @staticmethod
+    def _index(phase):
+        for position, (name, _label, _pattern) in enumerate(PHASES):
+            if name == phase:
+                return position
+        return -1
+
+    def _enter(self, name):
+        now = time.perf_counter()
+        if self.phase is not None:
+            self.durations[self.phase] = now - self.phase_started
+        self.phase = name
+        self.phase_started = now
+        self.phase_fraction = None
+
+    def _update_fraction(self, line):
+        if self.phase is None:
+            return
+        left = _MODULES_LEFT.search(line)
+        percent = _PERCENT.search(line)
+        if percent and 0 <= int(percent.group(1)) <= 100:
+            self.phase_fraction = int(percent.group(1)) / 100
+        elif left and self.phase == 'optimization':
+            # Modules are discovered as it goes, so this only ever looks ahead
+            self.modules_done += 1
+            self.phase_fraction = self.modules_done / (self.modules_done + int(left.group(1)))
+
+    def finish(self):
+        """Close the running phase and return {phase: seconds}"""
+        with self._lock:
+            if self.phase is not None:
+                self.durations[self.phase] = time.perf_counter() - self.phase_started
+                self.phase = None
+            return dict(self.durations)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def progress(self):
+        """Return (fraction or None, seconds left or None, phase label, slow)
+
+        The fraction is None when there is no history to compare with.
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            label = PHASE_LABELS.get(self.phase, "Starting")
+            slow = bool(self.median_elapsed) and elapsed > self.median_elapsed * SLOW_FACTOR
+            if self.estimate is None:
+                return None, None, label, slow
+            phases = self.estimate.phases
+            in_phase = time.perf_counter() - self.phase_started
+            remaining = 0.0
+            index = self._index(self.phase)
+            for position, (name, _label, _pattern) in enumerate(PHASES):
+                expected = phases.get(name)
+                if expected is None or position < index:
+                    continue
+                if position == index:
+                    if self.phase_fraction is not None:
+                        remaining += expected * (1 - self.phase_fraction)
+                    else:
+                        remaining += max(0.0, expected - in_phase)
+                else:
+                    remaining += expected
+            if index < 0:
+                # Still probing and starting Nuitka: whatever the history left out of the phases
+                remaining += max(0.0, self.estimate.total - sum(phases.values()) - elapsed)
+            # Never claim to be done while the build is running
+            fraction = min(0.99, elapsed / (elapsed + remaining)) if elapsed + remaining else None
+            return fraction, remaining, label, slow
@@ -0,0 +1,216 @@
+"""
+Nuitkalicious - Build manifests
+Description: Keeps a compact, gzipped manifest of every finished build: the
+files it produced (size, content hash and kind), the modules Nuitka
+compiled, the full option set and command, and the time spent in each phase.
+Any two manifests of a script can be diffed to explain why an output grew or
+a build slowed down.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app_paths import app_data_dir
+from build_cache import expected_outputs
+from build_history import PHASE_LABELS, format_duration
+from dist_analyzer import categorize, file_digest, package_of, walk_files
+
+# Manifests kept per script
+KEEP_MANIFESTS = 30
+# 8-byte digests: plenty to tell a changed file, and half the manifest size
+DIGEST_SIZE = 8
+
+
+def _hash_files(root, paths):
+    # Nuitka rewrites every file on each build, so there is nothing to reuse; hash in parallel
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as pool:
+        return list(pool.map(lambda path: file_digest(os.path.join(root, path), DIGEST_SIZE), paths))
+
+
+def create_manifest(options, cmd, output_dir, started, elapsed, phases, modules=None):
+    """Return the manifest of a finished build as a dict
+
+    modules are the ModuleCosts of its compilation report, when there is one.
+    """
+    output = expected_outputs(options['script'], output_dir, options['standalone'], options['onefile'])[0]
+    if os.path.isdir(output):
+        root = output
+        listed = list(walk_files(output))
+    else:
+        root = os.path.dirname(output)
+        listed = [(os.path.basename(output), os.path.getsize(output))]
+    executable = os.path.splitext(os.path.basename(options['script']))[0]
+    executable = next((path for path, _size in listed if os.path.splitext(path)[0] == executable and '/' not in path),
+                      None)
+    digests = _hash_files(root, [path for path, _size in listed])
+    files = {path: [size, digest, categorize(path, executable)]
+             for (path, size), digest in zip(listed, digests)}
+    return {
+        'script': os.path.abspath(options['script']),
+        'started': started,
+        'elapsed': elapsed,
+        'phases': phases,
+        'options': options,
+        'cmd': cmd,
+        'output': os.path.basename(output),
+        'total_bytes': sum(size for size, _digest, _category in files.values()),
+        'files': files,
+        'modules': {module.name: [module.kind, module.c_bytes, module.python_seconds] for module in modules or ()},
+    }
+
+
+class ManifestStore:
+    """Manifests of one script, kept under the app data folder with a small index"""
+
+    def __init__(self, script_path, root=None):
+        self.script_path = os.path.abspath(script_path)
+        key = hashlib.sha256(os.path.normcase(self.script_path).encode('utf-8')).hexdigest()[:16]
+        self.folder = os.path.join(root or app_data_dir('manifests'), key)
+        self.index_path = os.path.join(self.folder, 'index.json')
+
+    def entries(self):
+        """Return the index entries, newest first"""
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def record(self, manifest):
+        """Store a manifest; returns its index entry"""
+        os.makedirs(self.folder, exist_ok=True)
+        started = manifest['started']
+        name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}-{int(started * 1000) % 1000:03d}"
+        with gzip.open(os.path.join(self.folder, name + '.json.gz'), 'wt', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        entry = {'id': name, 'started': manifest['started'], 'elapsed': manifest['elapsed'],
+                 'total_bytes': manifest['total_bytes'], 'files': len(manifest['files']),
+                 'modules': len(manifest['modules'])}
+        entries = [entry] + self.entries()
+        for old in entries[KEEP_MANIFESTS:]:
+            try:
+                os.remove(os.path.join(self.folder, old['id'] + '.json.gz'))
+            except OSError:
+                pass
+        with open(self.index_path + '.tmp', 'w') as f:
+            json.dump(entries[:KEEP_MANIFESTS], f, indent=1)
+        os.replace(self.index_path + '.tmp', self.index_path)
+        return entry
+
+    def load(self, entry_id):
+        with gzip.open(os.path.join(self.folder, entry_id + '.json.gz'), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def describe_entry(entry):
+    return (f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['started']))}  "
+            f"{entry['total_bytes'] / 1024 ** 2:.1f} MB, {entry['files']} files, "
+            f"built in {format_duration(entry['elapsed'])}")
+
+
+def _flatten(options, prefix=''):
+    flat = {}
+    for name, value in options.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{name}.'))
+        else:
+            flat[f'{prefix}{name}'] = value
+    return flat
+
+
+def _flags(cmd):
+    # The output folder changes between matrix or staging builds without changing the build
+    return {arg for arg in cmd[:-1] if arg.startswith('-') and not arg.startswith('--output-dir=')}
+
+
+def _signed_mb(size):
+    return f"{'+' if size >= 0 else '-'}{abs(size) / 1024 ** 2:.2f} MB"
+
+
+class ManifestDiff:
+    """What changed from one build's manifest to another's"""
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+        self.size_delta = new['total_bytes'] - old['total_bytes']
+        self.elapsed = (old['elapsed'], new['elapsed'])
+        self.phases = [(name, old['phases'].get(name), new['phases'].get(name)) for name in PHASE_LABELS
+                       if name in old['phases'] or name in new['phases']]
+
+        old_options, new_options = _flatten(old['options']), _flatten(new['options'])
+        self.option_changes = [(name, old_options.get(name), new_options.get(name))
+                               for name in sorted(set(old_options) | set(new_options))
+                               if old_options.get(name) != new_options.get(name)]
+        old_flags, new_flags = _flags(old['cmd']), _flags(new['cmd'])
+        self.flags_added = sorted(new_flags - old_flags)
+        self.flags_removed = sorted(old_flags - new_flags)
+
+        old_modules, new_modules = old['modules'], new['modules']
+        self.modules_added = sorted((name, new_modules[name][1]) for name in set(new_modules) - set(old_modules))
+        self.modules_removed = sorted((name, old_modules[name][1]) for name in set(old_modules) - set(new_modules))
+
+        old_files, new_files = old['files'], new['files']
+        # (path, size, kind) of added and removed files, (path, old size, new size) of changed ones
+        self.files_added = sorted((path, new_files[path][0], new_files[path][2])
+                                  for path in set(new_files) - set(old_files))
+        self.files_removed = sorted((path, old_files[path][0], old_files[path][2])
+                                    for path in set(old_files) - set(new_files))
+        self.files_changed = sorted((path, old_files[path][0], new_files[path][0])
+                                    for path in set(old_files) & set(new_files)
+                                    if old_files[path][1] != new_files[path][1])
+
+        packages = {}
+        for files, sign in ((old_files, -1), (new_files, 1)):
+            for path, (size, _digest, _category) in files.items():
+                package = package_of(path)
+                packages[package] = packages.get(package, 0) + sign * size
+        self.package_deltas = sorted(((package, delta) for package, delta in packages.items() if delta),
+                                     key=lambda item: abs(item[1]), reverse=True)
+
+    def _files_of(self, files, kinds):
+        return [item for item in files if item[2] in kinds]
+
+    def lines(self, limit=20):
+        """Return the diff as text lines, most telling sections first"""
+        old_elapsed, new_elapsed = self.elapsed
+        lines = [f"Size: {self.old['total_bytes'] / 1024 ** 2:.1f} MB -> {self.new['total_bytes'] / 1024 ** 2:.1f} MB "
+                 f"({_signed_mb(self.size_delta)})",
+                 f"Build time: {format_duration(old_elapsed)} -> {format_duration(new_elapsed)} "
+                 f"({'+' if new_elapsed >= old_elapsed else '-'}{format_duration(abs(new_elapsed - old_elapsed))})"]
+        for name, old, new in self.phases:
+            shown = [format_duration(value) if value is not None else '-' for value in (old, new)]
+            lines.append(f"  {PHASE_LABELS[name]}: {shown[0]} -> {shown[1]}")
+
+        def section(title, items, show):
+            if items:
+                lines.append(f"{title} ({len(items)}):")
+                lines.extend(f"  {show(item)}" for item in items[:limit])
+                if len(items) > limit:
+                    lines.append(f"  ... and {len(items) - limit} more")
+
+        def show_file(item):
+            return f"{item[0]} ({item[1] / 1024:.0f} KB)"
+
+        def show_module(item):
+            return item[0] + (f" ({item[1] / 1024:.0f} KB of C)" if item[1] else "")
+
+        section("Option changes", self.option_changes, lambda item: f"{item[0]}: {item[1]!r} -> {item[2]!r}")
+        section("Flags added", self.flags_added, str)
+        section("Flags removed", self.flags_removed, str)
+        section("Package size changes", self.package_deltas, lambda item: f"{item[0]}: {_signed_mb(item[1])}")
+        for verb, files in (("added", self.files_added), ("removed", self.files_removed)):
+            section(f"Libraries and extension modules {verb}", self._files_of(files, ('extension', 'library')),
+                    show_file)
+            section(f"Data files {verb}", self._files_of(files, ('data', 'python')), show_file)
+        section("Files changed", sorted(self.files_changed, key=lambda item: abs(item[2] - item[1]), reverse=True),
+                lambda item: f"{item[0]}: {item[1] / 1024:.0f} KB -> {item[2] / 1024:.0f} KB")
+        section("Modules added", self.modules_added, show_module)
+        section("Modules removed", self.modules_removed, show_module)
+        if not self.old['modules'] or not self.new['modules']:
+            lines.append("(Module lists need the compilation report turned on for both builds)")
+        return lines
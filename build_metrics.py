@@ -0,0 +1,177 @@
+"""
+Nuitkalicious - Build resource metrics
+Description: Samples a build's whole process tree (Nuitka, scons and every
+compiler child) at a fixed interval for CPU time, memory and disk I/O, keeps
+a short time series for the GUI's live chart and writes a JSON summary plus a
+Prometheus textfile-collector file when the build ends, so node exporters
+pick the numbers up without any network service.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+import process_tree
+from app_paths import app_data_dir
+
+DEFAULT_INTERVAL = 0.5
+# JSON summaries kept in the metrics folder
+KEEP_SUMMARIES = 200
+
+
+class ResourceSampler:
+    """Sample a process tree in a background thread until it exits or stop() is called
+
+    CPU time counts live processes plus the children they have already
+    waited for, so short compiler runs between two samples still add up.
+    Disk I/O is the last value seen per process and misses processes that
+    start and exit between samples.
+    """
+
+    def __init__(self, root_pid, interval=DEFAULT_INTERVAL):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.started = time.time()
+        self.ended = None
+        # (seconds since start, tree RSS, CPU use in cores, process count)
+        self.series = []
+        self.cpu_seconds = 0.0
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self._rss_total = 0
+        self._io = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not process_tree.supported():
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.ended is None:
+            self.ended = time.time()
+
+    def _run(self):
+        last_time, last_cpu = time.perf_counter(), 0.0
+        started = last_time
+        while True:
+            tree = process_tree.process_tree(self.root_pid)
+            if not tree:
+                break
+            now = time.perf_counter()
+            cpu = sum(sample.cpu_time + sample.children_cpu_time for sample in tree)
+            rss = sum(sample.rss for sample in tree)
+            with self._lock:
+                # Never count down when a process exits before its parent waits for it
+                cpu = max(cpu, self.cpu_seconds)
+                cores = (cpu - last_cpu) / (now - last_time) if now > last_time and self.series else 0.0
+                self.cpu_seconds = cpu
+                self.peak_rss = max(self.peak_rss, rss)
+                self.peak_processes = max(self.peak_processes, len(tree))
+                self._rss_total += rss
+                for sample in tree:
+                    self._io[(sample.pid, sample.create_time)] = (sample.read_bytes, sample.write_bytes)
+                self.series.append((now - started, rss, cores, len(tree)))
+            last_time, last_cpu = now, cpu
+            if self._stop.wait(self.interval):
+                break
+        self.ended = time.time()
+
+    def snapshot(self):
+        """Return a copy of the time series, for live charts"""
+        with self._lock:
+            return list(self.series)
+
+    def summary(self):
+        """Return the build's totals as a dict"""
+        with self._lock:
+            wall = (self.ended or time.time()) - self.started
+            count = len(self.series)
+            return {
+                'wall_seconds': wall,
+                'cpu_seconds': self.cpu_seconds,
+                'average_cores': self.cpu_seconds / wall if wall > 0 else 0.0,
+                'peak_rss_bytes': self.peak_rss,
+                'average_rss_bytes': self._rss_total // count if count else 0,
+                'read_bytes': sum(read for read, _write in self._io.values()),
+                'write_bytes': sum(write for _read, write in self._io.values()),
+                'peak_processes': self.peak_processes,
+                'samples': count,
+                'interval': self.interval,
+            }
+
+
+def describe(summary):
+    """Return a one-line description of a summary"""
+    return (f"CPU {summary['cpu_seconds']:.0f}s ({summary['average_cores']:.1f} cores), "
+            f"peak RSS {summary['peak_rss_bytes'] / 1024 ** 2:.0f} MB "
+            f"(avg {summary['average_rss_bytes'] / 1024 ** 2:.0f} MB), "
+            f"read {summary['read_bytes'] / 1024 ** 2:.0f} MB, written {summary['write_bytes'] / 1024 ** 2:.0f} MB")
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(summary, labels):
+    """Return summary as Prometheus text exposition format"""
+    label_text = ','.join(f'{name}="{_label(value)}"' for name, value in sorted(labels.items()))
+    metrics = (
+        ('build_duration_seconds', "Wall time of the last build", summary['wall_seconds']),
+        ('build_cpu_seconds', "CPU time of the last build's process tree", summary['cpu_seconds']),
+        ('build_peak_rss_bytes', "Peak resident memory of the last build's process tree",
+         summary['peak_rss_bytes']),
+        ('build_average_rss_bytes', "Average resident memory of the last build's process tree",
+         summary['average_rss_bytes']),
+        ('build_read_bytes', "Bytes the last build read from storage", summary['read_bytes']),
+        ('build_write_bytes', "Bytes the last build wrote to storage", summary['write_bytes']),
+        ('build_peak_processes', "Most processes the last build ran at once", summary['peak_processes']),
+        ('build_success', "1 if the last build succeeded", 1 if summary.get('success') else 0),
+        ('build_last_end_timestamp_seconds', "When the last build ended", summary.get('ended', 0)),
+    )
+    lines = []
+    for name, help_text, value in metrics:
+        lines.append(f"# HELP nuitkalicious_{name} {help_text}")
+        lines.append(f"# TYPE nuitkalicious_{name} gauge")
+        lines.append(f"nuitkalicious_{name}{{{label_text}}} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path, text):
+    # The textfile collector must never read a half-written file
+    with open(path + '.tmp', 'w') as f:
+        f.write(text)
+    os.replace(path + '.tmp', path)
+
+
+def export_metrics(summary, script, fingerprint, json_dir=None, textfile_dir=None):
+    """Write the JSON summary (and the .prom file when textfile_dir is set); returns the paths"""
+    stem = os.path.splitext(os.path.basename(script))[0]
+    json_dir = json_dir or app_data_dir('metrics')
+    os.makedirs(json_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(summary.get('ended', time.time())))
+    paths = [os.path.join(json_dir, f'{stem}-{stamp}.json')]
+    data = dict(summary, script=os.path.abspath(script), fingerprint=fingerprint)
+    _write_atomic(paths[0], json.dumps(data, indent=1))
+    summaries = sorted((os.path.join(json_dir, name) for name in os.listdir(json_dir) if name.endswith('.json')),
+                       key=os.path.getmtime)
+    for old in summaries[:-KEEP_SUMMARIES]:
+        os.remove(old)
+
+    if textfile_dir:
+        # One file per script, so builds of different scripts do not overwrite each other
+        safe = re.sub(r'[^A-Za-z0-9_]', '_', stem)
+        path = os.path.join(textfile_dir, f'nuitkalicious_{safe}.prom')
+        _write_atomic(path, prometheus_text(summary, {'script': os.path.abspath(script),
+                                                      'config': fingerprint}))
+        paths.append(path)
+    return paths
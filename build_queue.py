@@ -0,0 +1,251 @@
+"""
+Nuitkalicious - Build queue
+Description: Queue of builds, each with its own option set, run concurrently
+by a scheduler that splits the machine's cores between the running builds'
+--jobs values. Every build gets its own temp directory.
+"""
+
+import collections
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from build_runner import BuildRunner
+from jobs_governor import JobsGovernor, JobsHistory
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def set_jobs(args, jobs):
+    """Return args with any --jobs option replaced by --jobs=jobs"""
+    return [arg for arg in args if not arg.startswith('--jobs=')] + [f'--jobs={jobs}']
+
+
+class QueueItem:
+    """One queued build"""
+
+    def __init__(self, item_id, script_path, args, priority=0, cwd=None, env=None):
+        self.id = item_id
+        self.script_path = script_path
+        self.args = list(args)
+        self.priority = priority
+        self.cwd = cwd or os.path.dirname(script_path) or None
+        self.env = env
+        self.status = QUEUED
+        self.jobs = None
+        self.result = None
+        self.added = time.time()
+        self.started = None
+        self.finished = None
+        self.log = collections.deque(maxlen=5000)
+        self.runner = None
+        # Set by cancel() while the build is still starting; _start() honours it
+        self.cancel_requested = False
+
+    @property
+    def name(self):
+        return os.path.basename(self.script_path)
+
+    def elapsed(self):
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class BuildQueue:
+    """Priority queue of builds with a core-aware parallel scheduler
+
+    on_update(item) is called from scheduler threads whenever an item
+    changes state; GUIs must marshal it onto their own thread.
+    """
+
+    def __init__(self, max_parallel=None, total_cores=None, on_update=None, on_output=None,
+                 govern_memory=True):
+        self.total_cores = total_cores or os.cpu_count() or 1
+        self.govern_memory = govern_memory
+        self.max_parallel = max_parallel or max(1, self.total_cores // 4)
+        self.on_update = on_update
+        self.on_output = on_output
+        self.items = collections.OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._first_start = None
+        self._completed = []
+
+    # Queue management
+    def add(self, script_path, args, priority=0, cwd=None, env=None, start=True):
+        """Queue a build; pass start=False while adding a batch, then call schedule()"""
+        with self._lock:
+            item = QueueItem(next(self._ids), script_path, args, priority, cwd, env)
+            self.items[item.id] = item
+        self._notify(item)
+        if start:
+            self.schedule()
+        return item
+
+    def set_priority(self, item_id, priority):
+        with self._lock:
+            item = self.items.get(item_id)
+            if item is None or item.status != QUEUED:
+                return False
+            item.priority = priority
+        self._notify(item)
+        return True
+
+    def cancel(self, item_id):
+        with self._lock:
+            item = self.items.get(item_id)
+            if item is None or item.status in FINISHED_STATES:
+                return False
+            dequeued = item.status == QUEUED
+            if dequeued:
+                item.status = CANCELLED
+                item.finished = time.time()
+                runner = None
+            else:
+                item.cancel_requested = True
+                runner = item.runner
+        if runner is not None:
+            # The runner's exit callback records the cancelled state; a runner that has not
+            # started yet ignores this, and _start() cancels it once it has
+            runner.cancel()
+        elif dequeued:
+            self._notify(item)
+        return True
+
+    def cancel_all(self):
+        for item_id in list(self.items):
+            self.cancel(item_id)
+
+    def remove_finished(self):
+        with self._lock:
+            for item_id in [i for i, item in self.items.items() if item.status in FINISHED_STATES]:
+                del self.items[item_id]
+
+    def set_max_parallel(self, max_parallel):
+        self.max_parallel = max(1, int(max_parallel))
+        self.schedule()
+
+    # Scheduling
+    def _jobs_for(self, running, starting):
+        # Split the cores evenly between the builds that will be running, but
+        # never hand out cores that builds already running are using
+        fair_share = self.total_cores // (len(running) + starting)
+        free = self.total_cores - sum(item.jobs or 0 for item in running)
+        return max(1, min(fair_share, free // starting))
+
+    def schedule(self):
+        """Start queued builds while there are free slots"""
+        to_start = []
+        with self._lock:
+            running = [item for item in self.items.values() if item.status == RUNNING]
+            queued = [item for item in self.items.values() if item.status == QUEUED]
+            # Highest priority first, then first come first served
+            queued.sort(key=lambda item: (-item.priority, item.id))
+            free = self.max_parallel - len(running)
+            if free <= 0 or not queued:
+                return
+            starting = queued[:free]
+            jobs = self._jobs_for(running, len(starting))
+            for item in starting:
+                item.status = RUNNING
+                item.jobs = jobs
+                item.started = time.time()
+                if self._first_start is None:
+                    self._first_start = item.started
+                to_start.append(item)
+        for item in to_start:
+            self._start(item)
+
+    def _start(self, item):
+        # Private temp dir so concurrent builds never share scratch files
+        temp_dir = tempfile.mkdtemp(prefix=f'nuitkalicious-{item.id}-')
+        env = dict(item.env if item.env is not None else os.environ)
+        env.update(TMP=temp_dir, TEMP=temp_dir, TMPDIR=temp_dir)
+
+        def on_output(stream, line):
+            item.log.append(line if stream == 'stdout' else f"[stderr] {line}")
+            if self.on_output:
+                self.on_output(item, line)
+
+        # Created before the process can exit, so on_exit always sees it
+        governor = JobsGovernor(
+            None, on_event=lambda message: item.log.append(f"[jobs] {message}")) if self.govern_memory else None
+
+        def on_exit(result):
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if governor is not None:
+                governor.stop()
+                JobsHistory().record(governor.peak_job_rss, '--lto=yes' in item.args)
+            with self._lock:
+                item.result = result
+                item.finished = time.time()
+                item.runner = None
+                if result.cancelled:
+                    item.status = CANCELLED
+                else:
+                    item.status = SUCCEEDED if result.returncode == 0 else FAILED
+                    self._completed.append(item.finished)
+            self._notify(item)
+            self.schedule()
+
+        runner = BuildRunner(set_jobs(item.args, item.jobs), cwd=item.cwd, env=env,
+                             on_output=on_output, on_exit=on_exit)
+        with self._lock:
+            item.runner = runner
+            cancelled = item.cancel_requested
+        if cancelled:
+            # Cancelled between schedule() and here; the build never starts
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            with self._lock:
+                item.status = CANCELLED
+                item.finished = time.time()
+                item.runner = None
+            self._notify(item)
+            self.schedule()
+            return
+        self._notify(item)
+        try:
+            runner.start()
+            if governor is not None:
+                # Parallel builds compete for memory; pause compilers rather than OOM
+                governor.root_pid = runner.pid
+                governor.start()
+            with self._lock:
+                cancelled = item.cancel_requested
+            if cancelled:
+                # cancel() came while the process was starting, when the runner could not stop it
+                runner.cancel()
+        except Exception as e:
+            item.log.append(f"Could not start build: {e}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            with self._lock:
+                item.status = FAILED
+                item.finished = time.time()
+                item.runner = None
+            self._notify(item)
+            self.schedule()
+
+    def _notify(self, item):
+        if self.on_update:
+            self.on_update(item)
+
+    # Statistics
+    def counts(self):
+        counts = collections.Counter(item.status for item in self.items.values())
+        return {state: counts.get(state, 0) for state in (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)}
+
+    def throughput(self):
+        """Return completed builds per hour since the first build started"""
+        if not self._completed or self._first_start is None:
+            return 0.0
+        hours = (max(self._completed) - self._first_start) / 3600.0
+        return len(self._completed) / hours if hours > 0 else 0.0
@@ -0,0 +1,156 @@
+"""
+Nuitkalicious - Build runner
+Description: Runs Nuitka as a child process with pipes, streams its output
+line by line, and reports the exact exit code and wall time. Completion is
+signalled by the process exiting rather than by polling a status file.
+"""
+
+import os
+import shlex
+import signal
+import subprocess
+import threading
+import time
+
+
+def format_command(args):
+    """Return an argument list as a command line for the current platform"""
+    if os.name == 'nt':
+        return subprocess.list2cmdline(args)
+    return shlex.join(args)
+
+
+def venv_environment(venv_dir, base_env=None):
+    """Return an environment equivalent to activating venv_dir"""
+    env = dict(os.environ if base_env is None else base_env)
+    if venv_dir:
+        bin_dir = os.path.join(venv_dir, 'Scripts' if os.name == 'nt' else 'bin')
+        env['VIRTUAL_ENV'] = venv_dir
+        env['PATH'] = bin_dir + os.pathsep + env.get('PATH', '')
+        env.pop('PYTHONHOME', None)
+    # Nuitka prints progress as it goes; make sure it is not held in a pipe buffer
+    env['PYTHONUNBUFFERED'] = '1'
+    return env
+
+
+class BuildResult:
+    """Outcome of a finished build"""
+
+    def __init__(self, returncode, elapsed, cancelled=False):
+        self.returncode = returncode
+        self.elapsed = elapsed
+        self.cancelled = cancelled
+
+    @property
+    def success(self):
+        return self.returncode == 0 and not self.cancelled
+
+    def describe(self):
+        minutes, seconds = divmod(self.elapsed, 60)
+        duration = f"{int(minutes)}m {seconds:.1f}s" if minutes else f"{seconds:.1f}s"
+        if self.cancelled:
+            return f"cancelled after {duration}"
+        return f"exit code {self.returncode} in {duration}"
+
+
+class BuildRunner:
+    """Spawn a build and stream its output
+
+    on_output(stream, line) is called from reader threads with stream set to
+    'stdout' or 'stderr'; on_exit(result) is called once, from the thread
+    that saw the process exit.
+    """
+
+    def __init__(self, args, cwd=None, env=None, on_output=None, on_exit=None):
+        self.args = list(args)
+        self.cwd = cwd
+        self.env = env
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.process = None
+        self.result = None
+        self._cancelled = False
+        self._started = None
+        self._finished = threading.Event()
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def start(self):
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            # Own process group, so cancelling also stops scons and the C compilers
+            kwargs['start_new_session'] = True
+
+        self._started = time.perf_counter()
+        self.process = subprocess.Popen(
+            self.args,
+            cwd=self.cwd,
+            env=self.env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors='replace',
+            bufsize=1,
+            **kwargs
+        )
+        readers = [
+            threading.Thread(target=self._pump, args=(self.process.stdout, 'stdout'), daemon=True),
+            threading.Thread(target=self._pump, args=(self.process.stderr, 'stderr'), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        threading.Thread(target=self._wait, args=(readers,), daemon=True).start()
+        return self
+
+    def _pump(self, pipe, stream):
+        for line in pipe:
+            if self.on_output:
+                self.on_output(stream, line.rstrip('\r\n'))
+        pipe.close()
+
+    def _wait(self, readers):
+        returncode = self.process.wait()
+        elapsed = time.perf_counter() - self._started
+        # Deliver the last lines before announcing the exit
+        for reader in readers:
+            reader.join()
+        self.result = BuildResult(returncode, elapsed, self._cancelled)
+        self._finished.set()
+        if self.on_exit:
+            self.on_exit(self.result)
+
+    def cancel(self, grace=5.0):
+        """Stop the build and every process it started"""
+        if self.process is None or self.process.poll() is not None:
+            return
+        self._cancelled = True
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(self.process.pid)],
+                           capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGTERM)
+        except OSError:
+            return
+
+        def force_kill():
+            if not self._finished.wait(grace):
+                try:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+
+        threading.Thread(target=force_kill, daemon=True).start()
+
+    def wait(self, timeout=None):
+        """Block until the build exits and return its BuildResult"""
+        self._finished.wait(timeout)
+        return self.result
+
+    def run(self):
+        return self.start().wait()
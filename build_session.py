@@ -0,0 +1,407 @@
+"""
+Nuitkalicious - Build session
+Description: One build of an option set, from cache lookup through the Nuitka
+run to storing the outputs and cleaning up. Used by the GUI's workers and by
+the command-line entry point, so it must never import tkinter.
+"""
+
+import glob
+import os
+import shutil
+import time
+
+from build_cache import BuildCache, compute_fingerprint, expected_outputs, path_size, probe_versions
+from build_metrics import ResourceSampler, describe, export_metrics
+from build_manifest import ManifestStore, create_manifest
+from build_history import SLOW_FACTOR, BuildHistory, PhaseTracker, build_fingerprint, format_duration
+from build_runner import BuildRunner, venv_environment
+from compilation_report import ReportError, report_path, summarize, summary_path, with_report
+from cache_manager import CacheManager
+from import_graph import ImportGraph
+from jobs_governor import AUTO, JobsGovernor, JobsHistory
+from nuitka_options import build_nuitka_command, interpreter_path, with_output_dir
+from ram_staging import StagingError, StagingSizes, plan_stage
+from resource_pack import ACCESSOR_MODULE, prepare_pack
+from tcl_trim import prepare_tcl_trim
+
+
+def build_cache_for(options):
+    """Create the build cache from an option set's cache settings"""
+    settings = options['cache']
+    try:
+        max_bytes = int(float(settings.get('max_gb')) * 1024 ** 3)
+    except (TypeError, ValueError):
+        max_bytes = None
+    return BuildCache(max_bytes=max_bytes, shared_dir=settings.get('shared_dir') or None)
+
+
+def cache_manager_for(options):
+    """Create the compiler cache manager from an option set's cache settings"""
+    settings = options['cache']
+    limits = {}
+    for name, value in settings.get('limits_mb', {}).items():
+        try:
+            limits[name] = int(value)
+        except (TypeError, ValueError):
+            pass
+    # ccache and clcache hold the same kind of objects, so share the limit
+    if 'ccache' in limits:
+        limits['clcache'] = limits['ccache']
+    return CacheManager(settings.get('compiler_dir') or None, limits)
+
+
+def prepare_build_inputs(options, cmd, progress=None, check_cancelled=None):
+    """Bring the files a command includes but Nuitkalicious generates up to date"""
+    if f'--include-module={ACCESSOR_MODULE}' in cmd:
+        prepare_pack(options, progress, check_cancelled)
+    if any(arg.startswith('--tcl-library-dir=') for arg in cmd):
+        report = prepare_tcl_trim(options, interpreter_path(options), progress)
+        if progress:
+            progress(report.lines()[0])
+
+
+def remove_build_artifacts(folder, check_cancelled=None):
+    """Remove the build, *.build and __pycache__ folders Nuitka leaves behind"""
+    for artifact in ('build', '*.build', '__pycache__'):
+        if check_cancelled:
+            check_cancelled()
+        for path in glob.glob(os.path.join(folder, artifact)):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+
+class BuildSession:
+    """Prepare, run and finish one build
+
+    prepare() returns the restored output paths when the build cache already
+    holds an identical build, in which case start() is not needed. progress
+    callbacks receive a single message string.
+    """
+
+    def __init__(self, options, cmd=None, build_cache=None, cache_manager=None, inventory=None,
+                 output_dir=None, env=None, history=True, stage=True):
+        self.options = options
+        self.cmd = cmd or build_nuitka_command(options)
+        self.python_path = interpreter_path(options)
+        self.script_path = options['script']
+        # output_dir must match the command's --output-dir when both are overridden
+        self.output_dir = output_dir or os.path.dirname(self.script_path)
+        self.extra_env = env or {}
+        self.venv_dir = options['venv'] if options.get('use_venv') and options.get('venv') else None
+        self.build_cache = build_cache
+        self.cache_manager = cache_manager
+        self.inventory = inventory
+        self.cache_key = None
+        self.pending_cache = None
+        self.cache_scope = None
+        self.cache_snapshot = None
+        self.cache_env = {}
+        self.warnings = []
+        self.elapsed = 0.0
+        self.runner = None
+        self.governor = None
+        # Pass history=False to leave a build out of the build history and manifests
+        self.history = history
+        self.tracker = None
+        self.started_at = None
+        self.cache_stats = None
+        self.sampler = None
+        self.phase_durations = {}
+        self.report_path = None
+        self.report_modules = None
+        # The RamStage the build runs in, when it is staged on a RAM disk
+        self.stage = None
+        # Pass stage=False for builds that must keep their output path, such as PGO's
+        self.allow_stage = stage
+
+    def prepare(self, progress=None):
+        """Look the build up in the build cache and ready the compiler caches"""
+        start = time.perf_counter()
+        # Generated inputs such as the resource pack must be current before the cache lookup
+        prepare_build_inputs(self.options, self.cmd, progress)
+        if self.inventory is not None and self.venv_dir:
+            # Free when the venv is unchanged since its last probe
+            info = self.inventory.probe(self.venv_dir)
+            python_version, nuitka_version = info.python_version, info.nuitka_version
+        else:
+            python_version, nuitka_version = probe_versions(self.python_path)
+
+        # Skip the build entirely when an identical one is already cached
+        if self.build_cache is not None:
+            if progress:
+                progress("Checking build cache...")
+            module_files, packages = self._dependencies()
+            try:
+                cache_key = compute_fingerprint(self.cmd, self.script_path, self.options['resources'],
+                                                self.options['icon'] or None, python_version, nuitka_version,
+                                                module_files, packages)
+                restored = self.build_cache.lookup(cache_key, self.output_dir)
+            except Exception as e:
+                self.warnings.append(f"Build cache unavailable: {str(e)}")
+            else:
+                self.cache_key = cache_key
+                if restored:
+                    self.elapsed = time.perf_counter() - start
+                    return restored
+                # Remember what to store once this build succeeds
+                outputs = expected_outputs(self.script_path, self.output_dir,
+                                           self.options['standalone'], self.options['onefile'])
+                self.pending_cache = (cache_key, outputs)
+
+        # Point Nuitka at the persistent caches for this Nuitka version and venv
+        if self.cache_manager is not None:
+            try:
+                scope = self.cache_manager.scope_for(nuitka_version, self.venv_dir)
+                self.cache_snapshot = self.cache_manager.snapshot(scope)
+                self.cache_env = self.cache_manager.environment(scope)
+                self.cache_scope = scope
+            except Exception as e:
+                self.warnings.append(f"Compiler caches unavailable: {str(e)}")
+
+        # Module builds produce an extension module, not the outputs staging moves back
+        if self.allow_stage and self.options['ram_staging']['enabled'] and '--module' not in self.cmd:
+            try:
+                self.stage, note = plan_stage(self.options)
+            except OSError as e:
+                note = f"RAM-disk staging unavailable: {str(e)}"
+            if self.stage is None:
+                self.warnings.append(note)
+            elif progress:
+                progress(note)
+        self.elapsed = time.perf_counter() - start
+        return None
+
+    def _dependencies(self):
+        # Key the cache on what the program reaches: its local modules and package versions
+        try:
+            graph = ImportGraph(self.script_path, self.python_path)
+        except Exception as e:
+            self.warnings.append(f"Import analysis unavailable, using local imports only: {str(e)}")
+            return None, None
+        return graph.local_files(), graph.packages()
+
+    def environment(self):
+        # Activating the venv is just PATH/VIRTUAL_ENV; Nuitka runs directly from its python
+        env = venv_environment(self.venv_dir)
+        env.update(self.cache_env)
+        env.update(self.extra_env)
+        return env
+
+    def _start_tracking(self):
+        # Earlier builds of the same configuration predict this one's phases
+        estimate = median = None
+        if self.history is True:
+            try:
+                self.history = BuildHistory()
+            except Exception as e:
+                self.warnings.append(f"Build history unavailable: {str(e)}")
+                self.history = None
+        if self.history:
+            fingerprint = build_fingerprint(self.cmd, self.extra_env)
+            try:
+                estimate = self.history.estimate(fingerprint, self.script_path)
+                median = self.history.median_elapsed(fingerprint)
+            except Exception as e:
+                self.warnings.append(f"Build history unavailable: {str(e)}")
+        self.tracker = PhaseTracker(estimate, median)
+        self.started_at = time.time()
+
+    def progress(self):
+        """Return (fraction, seconds left, phase label, slow) of the running build; see PhaseTracker"""
+        if self.tracker is None:
+            return None, None, "Starting", False
+        return self.tracker.progress()
+
+    def start(self, on_output=None):
+        """Start Nuitka; on_output(stream, line) also receives 'jobs' governor and 'phase' events"""
+        self._start_tracking()
+        tracker = self.tracker
+
+        def track(stream, line):
+            if on_output:
+                on_output(stream, line)
+            if stream in ('stdout', 'stderr') and tracker.feed(line) and on_output:
+                _fraction, remaining, label, _slow = tracker.progress()
+                eta = f" (about {format_duration(remaining)} left)" if remaining is not None else ""
+                on_output('phase', f"{label}{eta}")
+
+        args = self.cmd
+        if self.options['compilation_report']:
+            # Only the run asks for the report; cache keys and history use the plain command
+            self.report_path = report_path(self.script_path, self.output_dir)
+            for stale in (self.report_path, summary_path(self.script_path, self.output_dir)):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            args = with_report(self.cmd, self.report_path)
+        if self.stage is not None:
+            # Only Nuitka's output moves; the working folder and the report stay put
+            args = with_output_dir(args, self.stage.folder)
+        self.runner = BuildRunner(args, cwd=self.output_dir, env=self.environment(),
+                                  on_output=track)
+        self.runner.start()
+        metrics = self.options['metrics']
+        if metrics['enabled']:
+            try:
+                interval = max(0.1, float(metrics['interval']))
+            except (TypeError, ValueError):
+                interval = 0.5
+            self.sampler = ResourceSampler(self.runner.pid, interval).start()
+        if self.options.get('jobs') == AUTO:
+            self.governor = JobsGovernor(
+                self.runner.pid, on_event=lambda message: on_output and on_output('jobs', message))
+            self.governor.start()
+        return self.runner
+
+    def wait(self):
+        """Wait for Nuitka to exit and return its BuildResult"""
+        result = self.runner.wait()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.governor is not None:
+            self.governor.stop()
+            # Feed the observed per-job peak back into the next auto jobs choice
+            JobsHistory().record(self.governor.peak_job_rss, bool(self.options.get('lto')))
+            self.governor = None
+        return result
+
+    def cancel(self):
+        if self.runner is not None:
+            self.runner.cancel()
+
+    def _record_history(self, success, notes):
+        result = self.runner.result if self.runner is not None else None
+        if result is None or self.tracker is None:
+            return
+        phases = self.phase_durations = self.tracker.finish()
+        output_size = None
+        if success:
+            outputs = expected_outputs(self.script_path, self.output_dir, self.options['standalone'],
+                                       self.options['onefile'])
+            output_size = path_size(outputs[0]) if os.path.exists(outputs[0]) else None
+        ccache = (self.cache_stats or {}).get('ccache', {})
+        hits = ccache.get('hits', self.tracker.cache_hits)
+        median = self.tracker.median_elapsed
+        if success and median and result.elapsed > median * SLOW_FACTOR:
+            notes.append(f"Slow build: {format_duration(result.elapsed)} against a usual "
+                         f"{format_duration(median)} for this configuration")
+        if self.history:
+            try:
+                self.history.record(self.script_path, build_fingerprint(self.cmd, self.extra_env),
+                                    self.started_at, result.elapsed, phases, result.returncode,
+                                    result.cancelled, output_size, hits, ccache.get('misses'))
+            except Exception as e:
+                notes.append(f"Could not record build history: {str(e)}")
+
+    def _export_metrics(self, success, notes):
+        result = self.runner.result if self.runner is not None else None
+        if self.sampler is None or result is None:
+            return
+        summary = self.sampler.summary()
+        summary.update(success=success, returncode=result.returncode, cancelled=result.cancelled,
+                       ended=self.sampler.ended)
+        metrics = self.options['metrics']
+        try:
+            paths = export_metrics(summary, self.script_path, build_fingerprint(self.cmd, self.extra_env),
+                                   metrics['json_dir'] or None, metrics['textfile_dir'] or None)
+        except OSError as e:
+            notes.append(f"Could not write build metrics: {str(e)}")
+            return
+        notes.append(f"Resources: {describe(summary)}")
+        if len(paths) > 1:
+            notes.append(f"Metrics written to {paths[-1]}")
+
+    def _summarize_report(self, progress, notes):
+        # Before cleanup: the generated C files in the build folder give each module's C size
+        if self.report_path is None or not os.path.exists(self.report_path):
+            return
+        if progress:
+            progress("Reading compilation report...")
+        try:
+            modules, _info = summarize(self.script_path, self.output_dir, self.phase_durations.get('c_compile'),
+                                       self.stage.build_dir if self.stage is not None else None)
+        except (OSError, ReportError) as e:
+            notes.append(str(e))
+            return
+        self.report_modules = modules
+        if modules:
+            costly = max(modules, key=lambda module: module.total_seconds)
+            notes.append(f"Compilation report: {len(modules)} modules, most costly {costly.name} "
+                         f"({costly.total_seconds:.1f}s)")
+
+    def _record_manifest(self, success, progress, notes):
+        # What a later build is diffed against: output files, modules, options and phase times
+        result = self.runner.result if self.runner is not None else None
+        if not success or not self.history or result is None:
+            return
+        if progress:
+            progress("Writing build manifest...")
+        store = ManifestStore(self.script_path)
+        try:
+            previous = store.entries()
+            manifest = create_manifest(self.options, self.cmd, self.output_dir, self.started_at, result.elapsed,
+                                       self.phase_durations, self.report_modules)
+            entry = store.record(manifest)
+        except (OSError, ValueError) as e:
+            notes.append(f"Could not write the build manifest: {str(e)}")
+            return
+        if previous:
+            size = (entry['total_bytes'] - previous[0]['total_bytes']) / 1024 ** 2
+            notes.append(f"Since the previous build: {size:+.1f} MB, "
+                         f"{entry['elapsed'] - previous[0]['elapsed']:+.1f}s build time")
+
+    def _copy_back(self, progress, notes):
+        # Move the program off the RAM disk first: everything after reads it from the output folder
+        if progress:
+            progress("Moving the program off the RAM disk...")
+        try:
+            self.stage.copy_back(self.output_dir, self.options['standalone'], self.options['onefile'])
+        except StagingError as e:
+            notes.append(str(e))
+            return False
+        try:
+            StagingSizes().record(self.script_path, self.stage.size())
+        except OSError:
+            pass
+        return True
+
+    def finish(self, success, progress=None, check_cancelled=None):
+        """Cache the outputs, collect cache statistics, record the build and clean up; returns notes"""
+        notes = []
+        # A program that could not be moved back stays on the RAM disk for the user to rescue
+        keep_stage = False
+        if self.stage is not None and success:
+            success = self._copy_back(progress, notes)
+            keep_stage = not success
+        # Keep the outputs for the next unchanged build
+        if success and self.pending_cache and self.build_cache is not None:
+            if progress:
+                progress("Storing outputs in build cache...")
+            try:
+                cache_key, outputs = self.pending_cache
+                self.build_cache.store(cache_key, outputs)
+            except Exception as e:
+                notes.append(f"Could not cache outputs: {str(e)}")
+        self.pending_cache = None
+        if self.cache_scope and self.cache_snapshot:
+            try:
+                stats = self.cache_manager.build_stats(self.cache_scope, self.cache_snapshot)
+                self.cache_stats = stats
+                notes.append(f"Cache: {CacheManager.format_stats(stats)}")
+            except Exception:
+                pass
+            self.cache_snapshot = None
+        self._record_history(success, notes)
+        self._export_metrics(success, notes)
+        self._summarize_report(progress, notes)
+        self._record_manifest(success, progress, notes)
+        if progress:
+            progress("Cleaning up build artifacts...")
+        remove_build_artifacts(self.output_dir, check_cancelled)
+        if self.stage is not None and not keep_stage:
+            # A RAM-disk tree of tens of thousands of files; unlinking it need not hold anything up
+            self.stage.discard()
+            self.stage = None
+        if self.cache_manager is not None:
+            # Keep the compiler caches but trim them back to their size limits
+            self.cache_manager.enforce_limits()
+        return notes
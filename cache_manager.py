@@ -0,0 +1,233 @@
+"""
+Nuitkalicious - Compiler cache manager
+Description: Keeps ccache/clcache, Nuitka's bytecode cache and the DLL
+dependency cache in a persistent location, bounds each cache's size with LRU
+eviction, reports hit/miss statistics per build and supports selective
+invalidation per Nuitka version or per virtual environment.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+
+from app_paths import app_data_dir
+
+# Nuitka reads these to decide where each of its caches lives
+CACHE_ENV_VARS = {
+    'ccache': 'NUITKA_CACHE_DIR_CCACHE',
+    'clcache': 'NUITKA_CACHE_DIR_CLCACHE',
+    'bytecode': 'NUITKA_CACHE_DIR_BYTECODE',
+    'dll-dependencies': 'NUITKA_CACHE_DIR_DLL_DEPENDENCIES',
+}
+
+DEFAULT_LIMITS_MB = {
+    'ccache': 5120,
+    'clcache': 5120,
+    'bytecode': 1024,
+    'dll-dependencies': 256,
+}
+
+SCOPES_FILE = 'scopes.json'
+SYSTEM_SCOPE = 'system'
+
+
+def _venv_key(venv_path):
+    # Scopes for the system interpreter are keyed by name rather than path
+    if not venv_path or venv_path == SYSTEM_SCOPE:
+        return SYSTEM_SCOPE
+    return os.path.normcase(os.path.abspath(venv_path))
+
+
+def _scan(path):
+    # Return [(path, size, last_used)] for every file below path
+    files = []
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            files.append((file_path, st.st_size, max(st.st_atime, st.st_mtime)))
+    return files
+
+
+def _ccache_stats(ccache_dir):
+    # Read hit/miss counters from ccache itself when it is available
+    ccache = shutil.which('ccache')
+    if not ccache:
+        return None
+    env = dict(os.environ, CCACHE_DIR=ccache_dir)
+    try:
+        result = subprocess.run([ccache, '--print-stats'], capture_output=True, text=True,
+                                env=env, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    counters = {}
+    for line in result.stdout.splitlines():
+        key, _sep, value = line.partition('\t')
+        if value.strip().isdigit():
+            counters[key.strip()] = int(value)
+    hits = counters.get('direct_cache_hit', 0) + counters.get('preprocessed_cache_hit', 0)
+    return hits, counters.get('cache_miss', 0)
+
+
+class CacheManager:
+    """Persistent, size-bounded home for Nuitka's compiler caches
+
+    Caches are partitioned into scopes, one per (Nuitka version, venv) pair,
+    so invalidating one environment never throws away another's objects:
+
+        <root>/<scope>/<cache name>/...
+    """
+
+    def __init__(self, root=None, limits_mb=None):
+        self.root = root or app_data_dir('nuitka-cache')
+        os.makedirs(self.root, exist_ok=True)
+        self.limits_mb = dict(DEFAULT_LIMITS_MB)
+        if limits_mb:
+            self.limits_mb.update(limits_mb)
+
+    # Scopes
+    def _load_scopes(self):
+        try:
+            with open(os.path.join(self.root, SCOPES_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_scopes(self, scopes):
+        path = os.path.join(self.root, SCOPES_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(scopes, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    def scope_for(self, nuitka_version, venv_path):
+        """Return (and register) the scope id for a Nuitka version and venv"""
+        venv_key = _venv_key(venv_path)
+        venv_hash = hashlib.sha256(venv_key.encode('utf-8')).hexdigest()[:10]
+        scope = f"nuitka-{nuitka_version or 'unknown'}_venv-{venv_hash}"
+        scopes = self._load_scopes()
+        if scope not in scopes:
+            scopes[scope] = {'nuitka_version': nuitka_version, 'venv': venv_key}
+            self._save_scopes(scopes)
+        return scope
+
+    def scopes(self):
+        return self._load_scopes()
+
+    def cache_dir(self, scope, name):
+        path = os.path.join(self.root, scope, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def environment(self, scope):
+        """Return the environment variables pointing Nuitka at this scope's caches"""
+        env = {var: self.cache_dir(scope, name) for name, var in CACHE_ENV_VARS.items()}
+        env['NUITKA_CACHE_DIR'] = os.path.join(self.root, scope)
+        # ccache enforces its own bound too, which keeps a single huge build in check
+        env['CCACHE_MAXSIZE'] = f"{self.limits_mb['ccache']}M"
+        return env
+
+    # Statistics
+    def snapshot(self, scope):
+        """Record the state of a scope's caches before a build"""
+        ccache_dir = self.cache_dir(scope, 'ccache')
+        snapshot = {'ccache_counters': _ccache_stats(ccache_dir), 'caches': {}}
+        for name in CACHE_ENV_VARS:
+            files = _scan(self.cache_dir(scope, name))
+            snapshot['caches'][name] = (len(files), sum(size for _p, size, _u in files))
+        return snapshot
+
+    def build_stats(self, scope, before):
+        """Return per-cache statistics for the build since before was taken"""
+        stats = {}
+        after_counters = _ccache_stats(self.cache_dir(scope, 'ccache'))
+        before_counters = before.get('ccache_counters')
+        for name in CACHE_ENV_VARS:
+            files = _scan(self.cache_dir(scope, name))
+            count, size = len(files), sum(s for _p, s, _u in files)
+            old_count, _old_size = before['caches'].get(name, (0, 0))
+            entry = {'entries': count, 'bytes': size, 'new_entries': max(0, count - old_count)}
+            if name == 'ccache' and after_counters and before_counters:
+                entry['hits'] = after_counters[0] - before_counters[0]
+                entry['misses'] = after_counters[1] - before_counters[1]
+            stats[name] = entry
+        return stats
+
+    @staticmethod
+    def format_stats(stats):
+        """Return a one-line summary of build_stats output"""
+        parts = []
+        for name, entry in stats.items():
+            if 'hits' in entry:
+                total = entry['hits'] + entry['misses']
+                rate = (100.0 * entry['hits'] / total) if total else 0.0
+                parts.append(f"{name} {entry['hits']}/{total} hits ({rate:.0f}%)")
+            elif entry['entries']:
+                # Without counters, new entries are the misses this build paid for
+                parts.append(f"{name} {entry['new_entries']} misses, "
+                             f"{entry['entries'] - entry['new_entries']} warm entries")
+        return ', '.join(parts) if parts else 'caches empty'
+
+    # Size limits
+    def enforce_limits(self):
+        """Evict least recently used files from each cache type across all scopes"""
+        removed = {}
+        for name in CACHE_ENV_VARS:
+            limit = self.limits_mb.get(name)
+            if not limit:
+                continue
+            files = []
+            for scope in self._load_scopes():
+                path = os.path.join(self.root, scope, name)
+                if os.path.isdir(path):
+                    files.extend(_scan(path))
+            total = sum(size for _p, size, _u in files)
+            budget = limit * 1024 * 1024
+            count = 0
+            for path, size, _used in sorted(files, key=lambda f: f[2]):
+                if total <= budget:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                count += 1
+            removed[name] = count
+        return removed
+
+    # Invalidation
+    def invalidate(self, nuitka_version=None, venv_path=None):
+        """Remove every scope matching the given Nuitka version and/or venv
+
+        With neither given, all caches are cleared.
+        """
+        venv_key = _venv_key(venv_path) if venv_path else None
+        scopes = self._load_scopes()
+        removed = []
+        for scope, info in list(scopes.items()):
+            if nuitka_version and info.get('nuitka_version') != nuitka_version:
+                continue
+            if venv_key and info.get('venv') != venv_key:
+                continue
+            shutil.rmtree(os.path.join(self.root, scope), ignore_errors=True)
+            del scopes[scope]
+            removed.append(scope)
+        self._save_scopes(scopes)
+        return removed
+
+    def usage(self):
+        """Return total bytes per cache type across all scopes"""
+        totals = dict.fromkeys(CACHE_ENV_VARS, 0)
+        for scope in self._load_scopes():
+            for name in CACHE_ENV_VARS:
+                path = os.path.join(self.root, scope, name)
+                if os.path.isdir(path):
+                    totals[name] += sum(size for _p, size, _u in _scan(path))
+        return totals
@@ -0,0 +1,220 @@
+"""
+Nuitkalicious - Compilation report
+Description: Asks Nuitka for its XML compilation report and reads it with a
+streaming parser (reports of big programs run to tens of MB). Each module
+gets its Python-level optimization time, the size of its generated C code
+with an estimated share of the C compile, and the modules whose imports
+pulled it in. The result is kept as a small JSON summary next to the report.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ElementTree
+
+from nuitka_options import DEFAULT_NOFOLLOW
+
+# Packages with a Nuitka plugin that is not on by default
+PLUGIN_FOR_PACKAGE = {
+    'PyQt5': 'pyqt5',
+    'PyQt6': 'pyqt6',
+    'PySide2': 'pyside2',
+    'PySide6': 'pyside6',
+    'tkinter': 'tk-inter',
+    '_tkinter': 'tk-inter',
+    'matplotlib': 'matplotlib',
+    'gevent': 'gevent',
+    'kivy': 'kivy',
+    'glfw': 'glfw',
+    'Pmw': 'pmw-freezer',
+    'webview': 'pywebview',
+    'dill': 'dill-compat',
+    'eventlet': 'eventlet',
+    'spacy': 'spacy',
+    'transformers': 'transformers',
+}
+
+
+class ReportError(Exception):
+    """Raised when a compilation report is missing or cannot be read"""
+
+
+def report_path(script_path, output_dir):
+    stem = os.path.splitext(os.path.basename(script_path))[0]
+    return os.path.join(output_dir, f'{stem}.report.xml')
+
+
+def summary_path(script_path, output_dir):
+    return report_path(script_path, output_dir)[:-len('.xml')] + '.json'
+
+
+def with_report(cmd, path):
+    """Return a Nuitka command that writes its compilation report to path
+
+    --remove-output is dropped so the generated C files are still there to
+    be measured; BuildSession.finish() removes the build folder afterwards.
+    """
+    args = [arg for arg in cmd[:-1] if arg != '--remove-output' and not arg.startswith('--report=')]
+    return args + [f'--report={path}', cmd[-1]]
+
+
+class ModuleCost:
+    """What one module cost the build"""
+
+    def __init__(self, name, kind='', usage='', reason='', source_path=''):
+        self.name = name
+        self.kind = kind
+        self.usage = usage
+        self.reason = reason
+        self.source_path = source_path
+        self.python_seconds = 0.0
+        self.c_bytes = None
+        # The C compile is not timed per module; its time is shared out by C size
+        self.c_seconds = None
+        self.importers = []
+
+    @property
+    def total_seconds(self):
+        return self.python_seconds + (self.c_seconds or 0.0)
+
+    @property
+    def top(self):
+        return self.name.split('.')[0]
+
+    def plugin(self):
+        """Return the Nuitka plugin for this module's package, or None"""
+        return PLUGIN_FOR_PACKAGE.get(self.top)
+
+    def inclusion(self):
+        """Return why the module was included, naming the modules that import it"""
+        if self.importers:
+            shown = ', '.join(self.importers[:3])
+            more = f" and {len(self.importers) - 3} more" if len(self.importers) > 3 else ""
+            return f"imported by {shown}{more}"
+        return self.reason or self.usage
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        module = cls(data['name'])
+        vars(module).update(data)
+        return module
+
+
+def parse_report(path):
+    """Stream a compilation report; returns ({name: ModuleCost}, info)
+
+    info holds the report's own attributes (Nuitka version, mode,
+    completion) and the plugins that were active.
+    """
+    modules = {}
+    # used module -> modules importing it
+    importers = {}
+    info = {'plugins': []}
+    current = None
+    root = None
+    try:
+        for event, element in ElementTree.iterparse(path, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if root is None:
+                    root = element
+                    info.update(element.attrib)
+                elif tag == 'module':
+                    attrs = element.attrib
+                    current = ModuleCost(attrs.get('name', '?'), attrs.get('kind', ''), attrs.get('usage', ''),
+                                         attrs.get('reason', ''), attrs.get('source_path', ''))
+                    modules[current.name] = current
+                continue
+            if current is not None and tag.endswith('-time') and 'time' in element.attrib:
+                # optimization-time (once per pass) and code-generation-time
+                try:
+                    current.python_seconds += float(element.attrib['time'])
+                except ValueError:
+                    pass
+            elif current is not None and tag == 'module_usage':
+                used = element.attrib.get('name')
+                if used and used != current.name:
+                    importers.setdefault(used, []).append(current.name)
+            elif tag == 'plugin' and element.attrib.get('name'):
+                info['plugins'].append(element.attrib['name'])
+            elif tag == 'module':
+                current = None
+                # Keep memory flat however big the report is
+                element.clear()
+                root.clear()
+    except (OSError, ElementTree.ParseError) as e:
+        raise ReportError(f"Could not read the compilation report {path}: {e}")
+    if root is None:
+        raise ReportError(f"{path} is empty")
+    for name, users in importers.items():
+        if name in modules:
+            modules[name].importers = sorted(set(users))
+    return modules, info
+
+
+def c_source_sizes(build_dir):
+    """Return {module name: bytes of generated C} from a Nuitka build folder"""
+    sizes = {}
+    try:
+        names = os.listdir(build_dir)
+    except OSError:
+        return sizes
+    for name in names:
+        if name.startswith('module.') and name.endswith('.c'):
+            try:
+                sizes[name[len('module.'):-len('.c')]] = os.path.getsize(os.path.join(build_dir, name))
+            except OSError:
+                pass
+    return sizes
+
+
+def summarize(script_path, output_dir, c_compile_seconds=None, build_dir=None):
+    """Parse the report of a finished build and save its JSON summary; returns (modules, info)
+
+    build_dir is Nuitka's <script>.build folder when it is not in output_dir.
+    """
+    modules, info = parse_report(report_path(script_path, output_dir))
+    stem = os.path.splitext(os.path.basename(script_path))[0]
+    sizes = c_source_sizes(build_dir or os.path.join(output_dir, f'{stem}.build'))
+    total = sum(sizes.values())
+    for name, size in sizes.items():
+        module = modules.get(name)
+        if module is None:
+            continue
+        module.c_bytes = size
+        if c_compile_seconds and total:
+            module.c_seconds = c_compile_seconds * size / total
+    info['c_compile_seconds'] = c_compile_seconds
+    info['c_bytes'] = total or None
+    with open(summary_path(script_path, output_dir), 'w') as f:
+        json.dump({'info': info, 'modules': [module.to_dict() for module in modules.values()]}, f)
+    return list(modules.values()), info
+
+
+def load_summary(script_path, output_dir=None):
+    """Return (modules, info) saved by the last reported build of a script"""
+    output_dir = output_dir or os.path.dirname(os.path.abspath(script_path))
+    path = summary_path(script_path, output_dir)
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise ReportError("No compilation report yet; build with the report turned on first")
+    except (OSError, ValueError) as e:
+        raise ReportError(f"Could not read {path}: {e}")
+    return [ModuleCost.from_dict(item) for item in data['modules']], data['info']
+
+
+def nofollow_flags(import_flags, analyzed, names):
+    """Return import flags that also stop Nuitka following names
+
+    Without analyzed flags the defaults still apply, so they are carried over.
+    """
+    flags = list(import_flags) if analyzed else [f'--nofollow-import-to={name}' for name in DEFAULT_NOFOLLOW]
+    for name in names:
+        flag = f'--nofollow-import-to={name}'
+        if flag not in flags:
+            flags.append(flag)
+    return flags
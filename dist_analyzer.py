@@ -0,0 +1,249 @@
+"""
+Nuitkalicious - Distribution size analyzer
+Description: Walks a standalone build's .dist folder and breaks its size down
+by kind of file (extension module, shared library, Python file, data) and by
+package. It finds identical files by content hash, flags files known to be
+heavy and rarely needed (Qt plugins and translations, Tcl/Tk encodings and
+demos, test packages, sample data) and suggests the Nuitka flags that leave
+them out, with the bytes each would save.
+"""
+
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+CATEGORIES = ('executable', 'extension', 'library', 'python', 'data')
+_EXTENSION = re.compile(r'\.(pyd|(cpython|abi3|pypy)[^/]*\.so)$', re.IGNORECASE)
+_LIBRARY = re.compile(r'\.(so(\.[\d.]+)?|dll|dylib)$', re.IGNORECASE)
+
+# Qt plugin folders the program cannot start without
+REQUIRED_QT_PLUGINS = {'platforms'}
+
+# (title, pattern on the path inside the folder, flags leaving the matched folder out).
+# 'item' is the matched folder; test packages are also kept from being followed.
+HEAVY_RULES = (
+    ("Qt translations", re.compile(r'^(?P<item>(?:PySide[26]|PyQt[56])/.*?translations)/'),
+     lambda item: ['--noinclude-qt-translations']),
+    ("Qt plugin", re.compile(r'^(?P<item>(?:PySide[26]|PyQt[56])/(?:.*/)?(?:qt-)?plugins/(?P<plugin>[^/]+))/'),
+     lambda item: [f'--noinclude-qt-plugins={os.path.basename(item)}']),
+    ("Qt software OpenGL", re.compile(r'^(?P<item>(?:.*/)?opengl32sw\.dll)$', re.IGNORECASE),
+     lambda item: [f'--noinclude-dlls={item}']),
+    ("Tcl/Tk encodings", re.compile(r'^(?P<item>tcl[\d.]*/encoding)/'),
+     lambda item: [f'--noinclude-data-files={item}/*']),
+    ("Tcl/Tk message catalogs", re.compile(r'^(?P<item>t(?:cl|k)[\d.]*/msgs)/'),
+     lambda item: [f'--noinclude-data-files={item}/*']),
+    ("Tk demos", re.compile(r'^(?P<item>tk[\d.]*/demos)/'),
+     lambda item: [f'--noinclude-data-files={item}/*']),
+    ("Test package", re.compile(r'^(?P<item>(?:[\w.-]+/)+?tests?)/'),
+     lambda item: [f"--nofollow-import-to={item.replace('/', '.')}", f'--noinclude-data-files={item}/*']),
+    ("Sample data", re.compile(r'^(?P<item>matplotlib/mpl-data/sample_data)/'),
+     lambda item: [f'--noinclude-data-files={item}/*']),
+)
+
+# Content hashing reads in blocks this big; hashlib releases the GIL on them
+_BLOCK = 1024 * 1024
+
+
+class AnalyzerError(Exception):
+    """Raised when there is no distribution folder to analyze"""
+
+
+class Suggestion:
+    """Flags that would leave some files out, with the bytes saved"""
+
+    def __init__(self, title, item, flags):
+        self.title = title
+        self.item = item
+        self.flags = flags
+        self.savings = 0
+        self.files = 0
+
+    def describe(self):
+        return f"{self.title}: {self.item} ({self.files} files, {self.savings / 1024 ** 2:.1f} MB)"
+
+
+class DistReport:
+    """Sizes, duplicates and suggestions of one distribution folder"""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = []
+        self.total = 0
+        self.by_category = dict.fromkeys(CATEGORIES, 0)
+        self.by_package = {}
+        # (size, [paths]) of files with identical content, biggest waste first
+        self.duplicates = []
+        self.suggestions = []
+
+    @property
+    def duplicate_bytes(self):
+        return sum(size * (len(paths) - 1) for size, paths in self.duplicates)
+
+    def largest(self, count=20):
+        """Return the (path, size, category) of the biggest files"""
+        return sorted(self.files, key=lambda entry: entry[1], reverse=True)[:count]
+
+    def lines(self, top=15):
+        """Return the report as text lines"""
+        mb = 1024 ** 2
+        lines = [f"{self.root}: {len(self.files)} files, {self.total / mb:.1f} MB"]
+        lines += [f"  {category:<11}{size / mb:>9.1f} MB" for category, size in self.by_category.items() if size]
+        lines.append("Largest packages:")
+        for package, size in sorted(self.by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+            lines.append(f"  {package:<40}{size / mb:>9.1f} MB")
+        if self.duplicates:
+            lines.append(f"Duplicate files ({self.duplicate_bytes / mb:.1f} MB wasted):")
+            for size, paths in self.duplicates[:top]:
+                lines.append(f"  {len(paths)} x {size / 1024:.0f} KB: {', '.join(paths[:3])}"
+                             + (f" and {len(paths) - 3} more" if len(paths) > 3 else ""))
+        if self.suggestions:
+            lines.append(f"Suggested exclusions (up to {sum(s.savings for s in self.suggestions) / mb:.1f} MB):")
+            for index, suggestion in enumerate(self.suggestions, 1):
+                lines.append(f"  {index}. {suggestion.describe()}")
+                lines.append(f"     {' '.join(suggestion.flags)}")
+        return lines
+
+
+def dist_folder(options, output_dir=None):
+    """Return the .dist folder of a script's last standalone or onefile build"""
+    script = options['script']
+    output_dir = output_dir or os.path.dirname(os.path.abspath(script))
+    stem = os.path.splitext(os.path.basename(script))[0]
+    folder = os.path.join(output_dir, stem + '.dist')
+    if os.path.isdir(folder):
+        return folder
+    if options['onefile']:
+        # The payload is compressed into the binary; Nuitka only keeps the folder it packed without --remove-output
+        raise AnalyzerError(f"{stem} is a onefile build and {stem}.dist is gone; "
+                            f"build once as standalone (the same files) to analyze it")
+    raise AnalyzerError(f"No {stem}.dist folder yet; analyze a standalone build")
+
+
+def categorize(path, executable=None):
+    name = os.path.basename(path)
+    if executable and path == executable:
+        return 'executable'
+    if _EXTENSION.search(name):
+        return 'extension'
+    if _LIBRARY.search(name):
+        return 'library'
+    if name.endswith(('.py', '.pyc', '.pyi')):
+        return 'python'
+    return 'data'
+
+
+def package_of(path):
+    """Return the top folder of a path inside a distribution, which is its package"""
+    return path.split('/', 1)[0] if '/' in path else '(top level)'
+
+
+def walk_files(root, check_cancelled=None):
+    """Yield (path relative to root with '/' separators, size) of every file below root"""
+    # os.scandir keeps this to one stat per file, which matters at 50k files
+    stack = ['']
+    while stack:
+        relative = stack.pop()
+        if check_cancelled:
+            check_cancelled()
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                path = f'{relative}/{entry.name}' if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield path, entry.stat(follow_symlinks=False).st_size
+
+
+def file_digest(path, size=16):
+    digest = hashlib.blake2b(digest_size=size)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_duplicates(root, files, workers=None, check_cancelled=None):
+    """Return (size, [paths]) of files with identical content
+
+    Only files sharing a size are hashed, on a thread pool.
+    """
+    by_size = {}
+    for path, size, _category in files:
+        if size:
+            by_size.setdefault(size, []).append(path)
+    candidates = [(path, size) for size, paths in by_size.items() if len(paths) > 1 for path in paths]
+    if not candidates:
+        return []
+    workers = workers or min(32, (os.cpu_count() or 1) * 2)
+    groups = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        digests = pool.map(lambda candidate: file_digest(os.path.join(root, candidate[0])), candidates)
+        for (path, size), digest in zip(candidates, digests):
+            if check_cancelled:
+                check_cancelled()
+            groups.setdefault((size, digest), []).append(path)
+    finally:
+        # A cancelled analysis drops the files not hashed yet
+        pool.shutdown(cancel_futures=True)
+    duplicates = [(size, sorted(paths)) for (size, _digest), paths in groups.items() if len(paths) > 1]
+    duplicates.sort(key=lambda item: item[0] * (len(item[1]) - 1), reverse=True)
+    return duplicates
+
+
+def suggest(files):
+    """Return the Suggestions for the heavy files among files, biggest savings first"""
+    found = {}
+    for path, size, _category in files:
+        for title, pattern, flags in HEAVY_RULES:
+            match = pattern.search(path)
+            if not match:
+                continue
+            item = match.group('item')
+            if title == "Qt plugin" and match.group('plugin') in REQUIRED_QT_PLUGINS:
+                break
+            key = (title, item)
+            if key not in found:
+                found[key] = Suggestion(title, item, flags(item))
+            found[key].savings += size
+            found[key].files += 1
+            break
+    # Qt translations match once per binding folder but are one flag
+    merged = {}
+    for suggestion in found.values():
+        key = tuple(suggestion.flags)
+        if key in merged:
+            merged[key].savings += suggestion.savings
+            merged[key].files += suggestion.files
+        else:
+            merged[key] = suggestion
+    return sorted(merged.values(), key=lambda suggestion: suggestion.savings, reverse=True)
+
+
+def analyze(root, executable=None, progress=None, check_cancelled=None):
+    """Analyze a distribution folder and return a DistReport"""
+    report = DistReport(root)
+    if progress:
+        progress(f"Scanning {os.path.basename(root)}...")
+    for path, size in walk_files(root, check_cancelled):
+        category = categorize(path, executable)
+        report.files.append((path, size, category))
+        report.total += size
+        report.by_category[category] += size
+        package = package_of(path)
+        report.by_package[package] = report.by_package.get(package, 0) + size
+    if progress:
+        progress(f"Hashing files of equal size among {len(report.files)}...")
+    report.duplicates = find_duplicates(root, report.files, check_cancelled=check_cancelled)
+    report.suggestions = suggest(report.files)
+    return report
+
+
+def analyze_build(options, output_dir=None, progress=None, check_cancelled=None):
+    """Analyze the .dist folder of a script's last build"""
+    root = dist_folder(options, output_dir)
+    stem = os.path.splitext(os.path.basename(options['script']))[0]
+    executable = next((name for name in (stem + '.exe', stem + '.bin', stem)
+                       if os.path.isfile(os.path.join(root, name))), None)
+    return analyze(root, executable, progress, check_cancelled)
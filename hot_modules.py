@@ -0,0 +1,342 @@
+"""
+Nuitkalicious - Hot-module accelerator
+Description: Profiles a script's workload under cProfile, ranks the
+project's own modules by cumulative time, compiles the top ones with
+Nuitka's --module mode into extension modules placed next to their sources
+(CPython imports those ahead of the .py) and times the workload again, per
+module and end to end. The program keeps running on the normal interpreter.
+"""
+
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+
+from build_session import BuildSession
+from nuitka_options import build_module_command, interpreter_path
+
+# Runs inside the target interpreter: python -c BOOTSTRAP OUTPUT ROOT -- script args...
+# Time is summed per source file below ROOT; a function's cumulative time only
+# counts calls coming from other files, so a module's internal calls are not
+# counted twice.
+_PROFILE_BOOTSTRAP = r'''
+import cProfile, json, os, runpy, sys, time
+
+output = sys.argv[1]
+root = os.path.join(os.path.normcase(os.path.abspath(sys.argv[2])), '')
+target = sys.argv[sys.argv.index('--') + 1:]
+
+def in_project(path):
+    path = os.path.normcase(os.path.abspath(path))
+    return path.startswith(root) and 'site-packages' not in path and path.endswith('.py')
+
+profiler = cProfile.Profile()
+started = time.perf_counter()
+profiler.enable()
+try:
+    if target[0] == '-m':
+        sys.argv = target[1:]
+        sys.path[0] = os.getcwd()
+        runpy.run_module(target[1], run_name='__main__', alter_sys=True)
+    else:
+        sys.argv = target
+        sys.path[0] = os.path.dirname(os.path.abspath(target[0]))
+        runpy.run_path(target[0], run_name='__main__')
+finally:
+    profiler.disable()
+    wall = time.perf_counter() - started
+    profiler.create_stats()
+    modules = {}
+    for (filename, _line, _name), (_cc, calls, own, _cumulative, callers) in profiler.stats.items():
+        if not in_project(filename):
+            continue
+        path = os.path.abspath(filename)
+        entry = modules.setdefault(path, {'self': 0.0, 'cumulative': 0.0, 'calls': 0})
+        entry['self'] += own
+        entry['calls'] += calls
+        for caller, edge in callers.items():
+            if caller[0] != filename:
+                entry['cumulative'] += edge[3]
+    with open(output, 'w') as f:
+        json.dump({'wall': wall, 'modules': modules}, f)
+'''
+
+_DISABLED_SUFFIX = '.disabled'
+
+
+class HotModuleError(Exception):
+    """Raised when profiling, compiling or timing cannot complete"""
+
+
+class HotModuleCancelled(HotModuleError):
+    """Raised when the accelerator is cancelled"""
+
+
+class HotModule:
+    """A project module and the time the workload spent in it"""
+
+    def __init__(self, path, self_seconds, cumulative_seconds, calls):
+        self.path = path
+        self.self_seconds = self_seconds
+        self.cumulative_seconds = cumulative_seconds
+        self.calls = calls
+        self.extension = None
+        # Workload time saved with only this module compiled
+        self.saved_seconds = None
+
+
+class HotModuleReport:
+    """Profile ranking plus the before/after timings"""
+
+    def __init__(self):
+        self.modules = []
+        self.compiled = []
+        self.skipped = []
+        self.baseline_seconds = None
+        self.accelerated_seconds = None
+        self.build_seconds = 0.0
+
+    @property
+    def speedup(self):
+        if self.baseline_seconds and self.accelerated_seconds:
+            return self.baseline_seconds / self.accelerated_seconds
+        return None
+
+    def lines(self, root=None):
+        def name(module):
+            return os.path.relpath(module.path, root) if root else module.path
+
+        result = []
+        for module in self.compiled:
+            line = f"{name(module)}: {module.cumulative_seconds:.3f}s in profile"
+            if module.saved_seconds is not None:
+                remaining = module.cumulative_seconds - module.saved_seconds
+                factor = f" (~{module.cumulative_seconds / remaining:.1f}x)" \
+                    if module.saved_seconds > 0 and remaining > 0 else ""
+                line += f", {module.saved_seconds:+.3f}s saved when compiled{factor}"
+            result.append(line)
+        for module, reason in self.skipped:
+            result.append(f"{name(module)}: not compiled ({reason})")
+        if self.speedup:
+            result.append(f"Workload: {self.baseline_seconds:.3f}s -> {self.accelerated_seconds:.3f}s "
+                          f"({self.speedup:.2f}x) after {self.build_seconds:.0f}s of compiling")
+        return result
+
+
+def extension_for(module_path, directory=None):
+    """Return the compiled extension Nuitka made for a module, or None"""
+    directory = directory or os.path.dirname(module_path)
+    stem = os.path.splitext(os.path.basename(module_path))[0]
+    for name in sorted(os.listdir(directory)):
+        if name.startswith(stem + '.') and name.endswith(('.so', '.pyd')):
+            return os.path.join(directory, name)
+    return None
+
+
+class HotModuleAccelerator:
+    """Profile, compile the hottest modules in place and measure the gain"""
+
+    def __init__(self, options, cache_manager=None, inventory=None, timeout=600):
+        self.options = options
+        settings = options['hot_modules']
+        self.workload = shlex.split(settings['workload'], posix=os.name != 'nt')
+        self.top_n = max(1, int(settings['top_n']))
+        self.repeat = max(1, int(settings['repeat']))
+        self.timeout = timeout
+        self.cache_manager = cache_manager
+        self.inventory = inventory
+        self.python_path = interpreter_path(options)
+        self.script_path = os.path.abspath(options['script'])
+        self.project_dir = os.path.dirname(self.script_path)
+        stem = os.path.splitext(os.path.basename(self.script_path))[0]
+        self.work_dir = os.path.join(self.project_dir, f'{stem}.hot')
+        self.manifest_path = os.path.join(self.work_dir, 'compiled.json')
+        self.report = HotModuleReport()
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._session = None
+        self._process = None
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            session, process = self._session, self._process
+        if session is not None:
+            session.cancel()
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _check_cancelled(self):
+        if self._cancelled:
+            raise HotModuleCancelled("Hot-module acceleration cancelled")
+
+    def _target(self):
+        if self.workload[:1] == ['-m']:
+            return list(self.workload)
+        return [self.script_path] + self.workload
+
+    def _execute(self, args):
+        self._check_cancelled()
+        start = time.perf_counter()
+        process = subprocess.Popen(args, cwd=self.project_dir, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                                   errors='replace')
+        with self._lock:
+            self._process = process
+        try:
+            _stdout, stderr = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise HotModuleError(f"The workload did not finish within {self.timeout:.0f}s")
+        finally:
+            with self._lock:
+                self._process = None
+        self._check_cancelled()
+        if process.returncode != 0:
+            raise HotModuleError(f"The workload exited with code {process.returncode}:\n{stderr.strip()[-1500:]}")
+        return time.perf_counter() - start
+
+    def _time_workload(self):
+        # Best of several runs; the fastest run is the one least disturbed by the machine
+        return min(self._execute([self.python_path] + self._target()) for _ in range(self.repeat))
+
+    def _manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def compiled_extensions(self):
+        """Return the extension modules this accelerator has placed in the project"""
+        return [path for path in self._manifest() if os.path.exists(path)]
+
+    def _save_manifest(self, paths):
+        os.makedirs(self.work_dir, exist_ok=True)
+        with open(self.manifest_path, 'w') as f:
+            json.dump(sorted(paths), f, indent=1)
+
+    def remove(self):
+        """Delete the compiled modules so the project runs from source again"""
+        removed = []
+        for path in self._manifest():
+            # A disabled copy is left behind if a per-module timing was interrupted
+            for candidate in (path, path + _DISABLED_SUFFIX):
+                if os.path.exists(candidate):
+                    os.remove(candidate)
+                    removed.append(candidate)
+        self._save_manifest([])
+        return removed
+
+    def profile(self):
+        """Run the workload under cProfile and return HotModules, hottest first"""
+        self._check_cancelled()
+        os.makedirs(self.work_dir, exist_ok=True)
+        output = os.path.join(self.work_dir, 'profile.json')
+        self._execute([self.python_path, '-c', _PROFILE_BOOTSTRAP, output, self.project_dir, '--']
+                      + self._target())
+        with open(output, 'r') as f:
+            data = json.load(f)
+        modules = [HotModule(path, entry['self'], entry['cumulative'], entry['calls'])
+                   for path, entry in data['modules'].items()]
+        modules.sort(key=lambda module: module.cumulative_seconds, reverse=True)
+        return modules
+
+    def _compile(self, module, progress, on_output):
+        self._check_cancelled()
+        # Build in a staging folder so cleanup never touches the project's own folders
+        staging = os.path.join(self.work_dir, 'build')
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        cmd = build_module_command(self.options, module.path, staging)
+        session = BuildSession(self.options, cmd=cmd, cache_manager=self.cache_manager,
+                               inventory=self.inventory, output_dir=staging)
+        session.prepare(progress)
+        with self._lock:
+            self._session = session
+        self._check_cancelled()
+        session.start(on_output)
+        result = session.wait()
+        with self._lock:
+            self._session = None
+        session.finish(result.success, progress)
+        self._check_cancelled()
+        self.report.build_seconds += result.elapsed
+        if not result.success:
+            return f"Nuitka failed: {result.describe()}"
+        built = extension_for(module.path, staging)
+        if built is None:
+            return "Nuitka produced no extension module"
+        module.extension = os.path.join(os.path.dirname(module.path), os.path.basename(built))
+        os.replace(built, module.extension)
+        return None
+
+    def run(self, progress=None, on_output=None):
+        """Profile, compile the top modules and time the result; returns the HotModuleReport"""
+        removed = self.remove()
+        if removed and progress:
+            progress(f"Hot modules: removed {len(removed)} earlier compiled module(s)")
+
+        if progress:
+            progress("Hot modules: profiling the workload...")
+        modules = self.profile()
+        self.report.modules = modules
+        candidates = []
+        for module in modules:
+            if len(candidates) >= self.top_n or module.cumulative_seconds <= 0:
+                break
+            if module.path == self.script_path:
+                # Run as __main__ from source, so an extension next to it would never load
+                continue
+            if os.path.basename(module.path) == '__init__.py':
+                self.report.skipped.append((module, "package __init__"))
+                continue
+            candidates.append(module)
+        if not candidates:
+            raise HotModuleError("The workload spent no measurable time in the project's own modules")
+
+        if progress:
+            progress("Hot modules: timing the workload from source...")
+        self.report.baseline_seconds = self._time_workload()
+
+        placed = []
+        try:
+            for module in candidates:
+                if progress:
+                    progress(f"Hot modules: compiling {os.path.relpath(module.path, self.project_dir)}...")
+                reason = self._compile(module, progress, on_output)
+                if reason:
+                    self.report.skipped.append((module, reason))
+                else:
+                    placed.append(module.extension)
+                    self.report.compiled.append(module)
+        finally:
+            self._save_manifest(placed)
+        if not placed:
+            raise HotModuleError("No module could be compiled; see the build log")
+
+        if progress:
+            progress("Hot modules: timing the compiled workload...")
+        self.report.accelerated_seconds = self._time_workload()
+
+        if len(self.report.compiled) > 1:
+            # One compiled module at a time shows what each contributes
+            for module in self.report.compiled:
+                others = [m.extension for m in self.report.compiled if m is not module]
+                if progress:
+                    progress(f"Hot modules: timing {os.path.relpath(module.path, self.project_dir)} alone...")
+                for path in others:
+                    os.replace(path, path + _DISABLED_SUFFIX)
+                try:
+                    module.saved_seconds = self.report.baseline_seconds - self._time_workload()
+                finally:
+                    for path in others:
+                        os.replace(path + _DISABLED_SUFFIX, path)
+        else:
+            module = self.report.compiled[0]
+            module.saved_seconds = self.report.baseline_seconds - self.report.accelerated_seconds
+        return self.report
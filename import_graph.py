@@ -0,0 +1,419 @@
+"""
+Nuitkalicious - Import graph
+Description: Static (AST) import graph of a script, resolved against the
+interpreter that will compile it. Reports the size and estimated compile
+cost of every subtree, derives the --nofollow-import-to / --include-*
+flags the program actually needs, and lists the modules and package
+versions a build depends on so the build cache only misses when one of
+them changes.
+"""
+
+import ast
+import functools
+import json
+import os
+import subprocess
+import threading
+
+from app_paths import app_data_dir
+from nuitka_options import DEFAULT_NOFOLLOW
+
+# Rough single-job throughput of Nuitka's generated C, for relative cost estimates
+SOURCE_BYTES_PER_SECOND = 40 * 1024
+
+# Edge kinds, from "always executed" to "never executed at run time" (typing edges are dropped)
+RUNTIME, OPTIONAL, DYNAMIC, TYPING = 'runtime', 'optional', 'dynamic', 'typing'
+
+# Module kinds
+LOCAL, SITE, STDLIB, BUILTIN, MISSING = 'local', 'site', 'stdlib', 'builtin', 'missing'
+
+_ENV_PROBE = r'''
+import importlib.machinery, json, sys, sysconfig
+from importlib import metadata
+paths = sysconfig.get_paths()
+try:
+    top_level = {name: dists for name, dists in metadata.packages_distributions().items()}
+except AttributeError:
+    top_level = {}
+versions = {}
+for dist in metadata.distributions():
+    try:
+        versions[dist.metadata['Name']] = dist.version
+    except Exception:
+        pass
+print(json.dumps({
+    'stdlib': [paths['stdlib'], paths['platstdlib']],
+    'site': [p for p in sys.path[1:] if p and ('site-packages' in p or 'dist-packages' in p)],
+    'stdlib_names': sorted(getattr(sys, 'stdlib_module_names', ())),
+    'builtins': sorted(sys.builtin_module_names),
+    'extension_suffixes': importlib.machinery.EXTENSION_SUFFIXES,
+    'top_level': top_level,
+    'versions': versions,
+}))
+'''
+
+
+@functools.lru_cache(maxsize=None)
+def interpreter_environment(python_path):
+    """Return the search paths and package metadata of an interpreter"""
+    result = subprocess.run(
+        [python_path, '-c', _ENV_PROBE],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not inspect {python_path}: {result.stderr.strip()[-500:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class ModuleNode:
+    """One module in the graph"""
+
+    def __init__(self, name, path, kind, is_package=False):
+        self.name = name
+        self.path = path
+        self.kind = kind
+        self.is_package = is_package
+        self.size = os.path.getsize(path) if path and os.path.isfile(path) else 0
+        self.is_source = bool(path) and path.endswith('.py')
+        self.imports = {}
+
+    @property
+    def top(self):
+        return self.name.split('.')[0]
+
+
+def _is_type_checking(test):
+    # if TYPE_CHECKING: / if typing.TYPE_CHECKING:
+    if isinstance(test, ast.Name):
+        return test.id == 'TYPE_CHECKING'
+    return isinstance(test, ast.Attribute) and test.attr == 'TYPE_CHECKING'
+
+
+def _catches_import_error(handlers):
+    for handler in handlers:
+        if handler.type is None:
+            return True
+        names = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        for name in names:
+            if isinstance(name, ast.Name) and name.id in ('ImportError', 'ModuleNotFoundError', 'Exception'):
+                return True
+    return False
+
+
+class _ImportVisitor(ast.NodeVisitor):
+    """Collect (module_name, level, names, edge_kind) from one module"""
+
+    def __init__(self):
+        self.found = []
+        self.kind = RUNTIME
+
+    def _with_kind(self, kind, nodes):
+        # Typing beats optional beats runtime
+        previous = self.kind
+        if kind == TYPING or (kind == OPTIONAL and previous == RUNTIME):
+            self.kind = kind
+        for node in nodes:
+            self.visit(node)
+        self.kind = previous
+
+    def visit_If(self, node):
+        if _is_type_checking(node.test):
+            self._with_kind(TYPING, node.body)
+            self._with_kind(self.kind, node.orelse)
+        else:
+            self.generic_visit(node)
+
+    def visit_Try(self, node):
+        kind = OPTIONAL if _catches_import_error(node.handlers) else self.kind
+        self._with_kind(kind, node.body)
+        self._with_kind(self.kind, node.handlers + node.orelse + node.finalbody)
+
+    visit_TryStar = visit_Try
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.found.append((alias.name, 0, (), self.kind))
+
+    def visit_ImportFrom(self, node):
+        self.found.append((node.module or '', node.level, tuple(alias.name for alias in node.names), self.kind))
+
+    def visit_Call(self, node):
+        # importlib.import_module('x') and __import__('x') with a literal name
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else getattr(func, 'id', None)
+        if (name in ('import_module', '__import__') and node.args
+                and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            self.found.append((node.args[0].value, 0, (), DYNAMIC))
+        self.generic_visit(node)
+
+
+class ParseCache:
+    """Per-file import lists, kept on disk and keyed on mtime and size"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), 'import_cache.json')
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(self.path, 'r') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def imports(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry and entry[0] == stamp:
+            return [tuple(item[:2]) + (tuple(item[2]), item[3]) for item in entry[1]]
+        try:
+            with open(path, 'rb') as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            return []
+        visitor = _ImportVisitor()
+        visitor.visit(tree)
+        with self._lock:
+            self._entries[path] = [stamp, [list(item) for item in visitor.found]]
+            self._dirty = True
+        return visitor.found
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(self.path + '.tmp', self.path)
+            self._dirty = False
+
+
+class ImportGraph:
+    """Modules reachable from a script and the import edges between them"""
+
+    ROOT = '__main__'
+
+    def __init__(self, script_path, python_path='python', parse_cache=None):
+        self.script_path = os.path.abspath(script_path)
+        self.script_dir = os.path.dirname(self.script_path)
+        self.env = interpreter_environment(python_path)
+        self.parse_cache = parse_cache or ParseCache()
+        self.stdlib_dirs = [os.path.normcase(os.path.abspath(p)) for p in self.env['stdlib']]
+        self.stdlib_names = set(self.env['stdlib_names'])
+        self.builtins = set(self.env['builtins'])
+        self.nodes = {}
+        self._resolved = {}
+        self._build()
+        self.parse_cache.save()
+
+    # Resolution
+    def _kind_for(self, path, top):
+        if top in self.stdlib_names:
+            return STDLIB
+        norm = os.path.normcase(os.path.abspath(path))
+        # Checked first: a project's own .venv lives below the script directory
+        if 'site-packages' in norm or 'dist-packages' in norm:
+            return SITE
+        if norm.startswith(os.path.normcase(self.script_dir) + os.sep):
+            return LOCAL
+        if any(norm.startswith(d) for d in self.stdlib_dirs):
+            return STDLIB
+        return SITE
+
+    def _find_in(self, directory, leaf):
+        # Return (path, is_package) for a module named leaf inside directory
+        base = os.path.join(directory, leaf)
+        if os.path.isfile(os.path.join(base, '__init__.py')):
+            return os.path.join(base, '__init__.py'), True
+        if os.path.isfile(base + '.py'):
+            return base + '.py', False
+        for suffix in self.env['extension_suffixes']:
+            if os.path.isfile(base + suffix):
+                return base + suffix, False
+        if os.path.isdir(base):
+            # Namespace package
+            return base, True
+        return None, False
+
+    def resolve(self, name):
+        """Return the ModuleNode for a dotted module name (MISSING if not found)"""
+        if name in self._resolved:
+            return self._resolved[name]
+        parts = name.split('.')
+        node = None
+        if len(parts) == 1:
+            if name in self.builtins:
+                node = ModuleNode(name, None, BUILTIN)
+            else:
+                for directory in [self.script_dir] + self.env['site'] + self.env['stdlib']:
+                    path, is_package = self._find_in(directory, name)
+                    if path:
+                        node = ModuleNode(name, path, self._kind_for(path, name), is_package)
+                        break
+        else:
+            parent = self.resolve('.'.join(parts[:-1]))
+            if parent.is_package and parent.path:
+                directory = parent.path if os.path.isdir(parent.path) else os.path.dirname(parent.path)
+                path, is_package = self._find_in(directory, parts[-1])
+                if path:
+                    node = ModuleNode(name, path, parent.kind, is_package)
+        if node is None:
+            node = ModuleNode(name, None, MISSING)
+        self._resolved[name] = node
+        return node
+
+    def _package_of(self, node):
+        if node.name == self.ROOT:
+            return ''
+        return node.name if node.is_package else node.name.rpartition('.')[0]
+
+    def _absolute(self, node, module, level):
+        if not level:
+            return module
+        package = self._package_of(node).split('.') if self._package_of(node) else []
+        base = package[:len(package) - (level - 1)] if level > 1 else package
+        return '.'.join(base + ([module] if module else []))
+
+    def _add_edge(self, source, name, kind):
+        # Importing a.b.c also imports a and a.b
+        parts = name.split('.')
+        for i in range(1, len(parts) + 1):
+            target = self.resolve('.'.join(parts[:i]))
+            if target.kind == MISSING and i > 1:
+                break
+            previous = source.imports.get(target.name)
+            # Keep the strongest reason a module is imported
+            if previous is None or [RUNTIME, DYNAMIC, OPTIONAL, TYPING].index(kind) < \
+                    [RUNTIME, DYNAMIC, OPTIONAL, TYPING].index(previous):
+                source.imports[target.name] = kind
+            yield target
+
+    def _build(self):
+        root = ModuleNode(self.ROOT, self.script_path, LOCAL)
+        self.nodes[self.ROOT] = root
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            # Standard library modules are leaves; Nuitka treats them as a unit anyway.
+            # Build tooling is never followed, so its imports do not matter either.
+            if not node.is_source or node.kind not in (LOCAL, SITE) or node.top in DEFAULT_NOFOLLOW:
+                continue
+            for module, level, names, kind in self.parse_cache.imports(node.path):
+                if kind == TYPING:
+                    # Nuitka treats TYPE_CHECKING as False, so these are never followed
+                    continue
+                absolute = self._absolute(node, module, level)
+                targets = []
+                if absolute:
+                    targets.extend(self._add_edge(node, absolute, kind))
+                for alias in names:
+                    # "from pkg import name" may name a submodule
+                    candidate = f"{absolute}.{alias}" if absolute else alias
+                    if alias != '*' and self.resolve(candidate).kind != MISSING:
+                        targets.extend(self._add_edge(node, candidate, kind))
+                for target in targets:
+                    if target.name not in self.nodes:
+                        self.nodes[target.name] = target
+                        pending.append(target)
+
+    # Queries
+    def reachable(self, start=ROOT, kinds=(RUNTIME, OPTIONAL, DYNAMIC), exclude=()):
+        """Return the names reachable from start over edges of the given kinds
+
+        exclude works like --nofollow-import-to: those modules and their
+        submodules are not entered.
+        """
+        prefixes = tuple(f'{name}.' for name in exclude)
+        seen = {start}
+        pending = [start]
+        while pending:
+            node = self.nodes.get(pending.pop())
+            if node is None:
+                continue
+            for name, kind in node.imports.items():
+                if kind not in kinds or name in seen:
+                    continue
+                if name in exclude or name.startswith(prefixes):
+                    continue
+                seen.add(name)
+                pending.append(name)
+        return seen
+
+    def subtree_stats(self, name):
+        """Return (module_count, total_bytes, estimated_compile_seconds) below a module"""
+        return self.stats(self.reachable(name))
+
+    def stats(self, names):
+        """Return (module_count, total_bytes, estimated_compile_seconds) for a set of modules"""
+        nodes = [self.nodes[n] for n in names if n in self.nodes]
+        total = sum(node.size for node in nodes)
+        compiled = sum(node.size for node in nodes if node.is_source and node.kind in (LOCAL, SITE))
+        return len(nodes), total, compiled / SOURCE_BYTES_PER_SECOND
+
+    def children(self, name):
+        node = self.nodes.get(name)
+        return sorted(node.imports.items()) if node else []
+
+    def optional_packages(self):
+        """Return third-party top-level packages reached only through guarded (try/except) imports"""
+        required = {self.nodes[n].top for n in self.reachable(kinds=(RUNTIME, DYNAMIC))}
+        return sorted({self.nodes[n].top for n in self.reachable()
+                       if self.nodes[n].kind == SITE} - required)
+
+    def suggested_flags(self, exclude_optional=False):
+        """Return the --nofollow-import-to / --include-* flags this program needs
+
+        exclude_optional also drops packages that are only imported inside
+        try/except ImportError, trading those optional features for build time.
+        """
+        runtime = self.reachable()
+        static = self.reachable(kinds=(RUNTIME, OPTIONAL))
+        dynamic = {name for source in runtime for name, kind in self.children(source) if kind == DYNAMIC}
+        flags = []
+
+        # Build tooling the program really reaches
+        for top in DEFAULT_NOFOLLOW:
+            if top in runtime:
+                flags.append(f'--nofollow-import-to={top}')
+
+        if exclude_optional:
+            for top in self.optional_packages():
+                if top not in DEFAULT_NOFOLLOW:
+                    flags.append(f'--nofollow-import-to={top}')
+
+        # Imported by string; Nuitka cannot see these statically
+        for name in sorted(dynamic - static):
+            node = self.nodes[name]
+            if node.kind in (LOCAL, SITE):
+                option = 'include-package' if node.is_package else 'include-module'
+                flags.append(f'--{option}={name}')
+        return flags
+
+    def local_files(self):
+        """Return the local source files the program reaches (the script included)"""
+        return sorted({self.nodes[n].path for n in self.reachable(kinds=(RUNTIME, OPTIONAL, DYNAMIC))
+                       if self.nodes[n].kind == LOCAL and self.nodes[n].path
+                       and os.path.isfile(self.nodes[n].path)})
+
+    def packages(self):
+        """Return sorted [distribution, version] pairs for the third-party code reached"""
+        result = set()
+        for name in self.reachable():
+            node = self.nodes[name]
+            if node.kind != SITE:
+                continue
+            for dist in self.env['top_level'].get(node.top, [node.top]):
+                result.add((dist, self.env['versions'].get(dist, '')))
+        return sorted([list(pair) for pair in result])
+
+    def depends_on(self, path):
+        """True if the program reaches the module stored at path"""
+        path = os.path.abspath(path)
+        return any(self.nodes[n].path == path for n in self.reachable())
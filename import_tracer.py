@@ -0,0 +1,173 @@
+"""
+Nuitkalicious - Runtime import tracer
+Description: Runs a script (or a test command) under the build interpreter
+with an audit hook that records every module imported and every data file
+opened. Traces from several runs are merged per script; modules the static
+import graph reaches but no traced run ever imported become
+--nofollow-import-to suggestions, with the projected saving.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from app_paths import app_data_dir
+from import_graph import LOCAL, SITE
+from nuitka_options import DEFAULT_NOFOLLOW
+
+# Runs inside the traced interpreter: python _trace_bootstrap.py OUTPUT -- script args...
+# (or OUTPUT -- -m module args...). Writes what was used when the process exits.
+_BOOTSTRAP = r'''
+import os, sys
+
+_output = os.path.abspath(sys.argv[1])
+_modules = set()
+_files = set()
+_recording = [True]
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | getattr(os, 'O_APPEND', 0) | getattr(os, 'O_CREAT', 0)
+
+def _hook(event, args):
+    if not _recording[0]:
+        return
+    try:
+        if event == 'import':
+            _modules.add(args[0])
+        elif event == 'open':
+            path, mode, flags = args
+            if not isinstance(path, str):
+                return
+            if isinstance(mode, str) and any(c in mode for c in 'wax+'):
+                return
+            if mode is None and isinstance(flags, int) and flags & _WRITE_FLAGS:
+                return
+            if not path.endswith(('.py', '.pyc', '.pyd', '.so')):
+                _files.add(os.path.abspath(path))
+    except Exception:
+        pass
+
+if hasattr(sys, 'addaudithook'):
+    sys.addaudithook(_hook)
+
+import atexit, json, runpy
+
+def _write():
+    _recording[0] = False
+    _modules.update(sys.modules)
+    files = sorted(p for p in _files if p != _output and os.path.isfile(p))
+    with open(_output, 'w') as f:
+        json.dump({'modules': sorted(_modules), 'files': files}, f)
+
+atexit.register(_write)
+target = sys.argv[sys.argv.index('--') + 1:]
+if target[0] == '-m':
+    sys.argv = target[1:]
+    sys.path[0] = os.getcwd()
+    runpy.run_module(target[1], run_name='__main__', alter_sys=True)
+else:
+    sys.argv = target
+    sys.path[0] = os.path.dirname(os.path.abspath(target[0]))
+    runpy.run_path(target[0], run_name='__main__')
+'''
+
+
+def bootstrap_path():
+    """Write the tracer bootstrap to the app data folder and return its path"""
+    path = os.path.join(app_data_dir('traces'), '_trace_bootstrap.py')
+    try:
+        with open(path, 'r') as f:
+            if f.read() == _BOOTSTRAP:
+                return path
+    except OSError:
+        pass
+    with open(path, 'w') as f:
+        f.write(_BOOTSTRAP)
+    return path
+
+
+def trace_command(python_path, script_path, run_args, output_path):
+    """Return the command for one trace run
+
+    run_args are the script's arguments, or ['-m', module, ...] to trace a
+    command such as a test suite instead of the script itself.
+    """
+    run_args = list(run_args)
+    target = run_args if run_args[:1] == ['-m'] else [os.path.abspath(script_path)] + run_args
+    return [python_path, bootstrap_path(), output_path, '--'] + target
+
+
+class TraceStore:
+    """Merged traces of one script, kept under the app data folder"""
+
+    def __init__(self, script_path, root=None):
+        self.script_path = os.path.abspath(script_path)
+        key = hashlib.sha256(os.path.normcase(self.script_path).encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(root or app_data_dir('traces'), f'{key}.json')
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'script': self.script_path, 'runs': [], 'modules': [], 'files': []}
+
+    def output_path(self):
+        """Return a fresh file for one run to write its trace into"""
+        return f"{self.path[:-5]}-{os.getpid()}-{time.time_ns()}.run.json"
+
+    def merge(self, output_path, run_args, returncode):
+        """Fold one run's trace into the store and return the merged trace"""
+        with open(output_path, 'r') as f:
+            run = json.load(f)
+        os.remove(output_path)
+        trace = self.load()
+        trace['runs'].append({'args': list(run_args), 'returncode': returncode, 'time': time.time(),
+                              'modules': len(run['modules'])})
+        trace['modules'] = sorted(set(trace['modules']) | set(run['modules']))
+        trace['files'] = sorted(set(trace['files']) | set(run['files']))
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(trace, f, indent=1)
+        os.replace(self.path + '.tmp', self.path)
+        return trace
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def unused_modules(graph, modules):
+    """Return the outermost local/third-party modules the graph reaches but no run imported"""
+    used = set(modules)
+    unused = []
+    for name in sorted(graph.reachable()):
+        node = graph.nodes[name]
+        if name == graph.ROOT or name in used or node.kind not in (LOCAL, SITE):
+            continue
+        if node.top in DEFAULT_NOFOLLOW:
+            continue
+        # An unused parent package already covers its submodules
+        parent = name.rpartition('.')[0]
+        if parent and parent not in used:
+            continue
+        unused.append(name)
+    return unused
+
+
+def prune_report(graph, trace):
+    """Return (nofollow_flags, before_stats, after_stats) for a merged trace
+
+    The stats are (module_count, total_bytes, estimated_compile_seconds) as
+    returned by ImportGraph.stats, before and after the flags are applied.
+    """
+    unused = unused_modules(graph, trace['modules'])
+    before = graph.stats(graph.reachable())
+    after = graph.stats(graph.reachable(exclude=unused))
+    return [f'--nofollow-import-to={name}' for name in unused], before, after
+
+
+def data_files(trace, roots):
+    """Return the non-Python files the traced runs read below any of roots"""
+    roots = tuple(os.path.join(os.path.abspath(root), '') for root in roots)
+    return [path for path in trace['files'] if path.startswith(roots)]
@@ -0,0 +1,170 @@
+"""
+Nuitkalicious - Adaptive jobs governor
+Description: "auto" --jobs mode. Picks the starting job count from the core
+count, free memory and the historical per-job peak RSS of C compiler
+processes, then watches the compiler children during the build and pauses
+new ones while memory is short instead of letting the OOM killer fail the
+build.
+"""
+
+import json
+import os
+import threading
+
+import process_tree
+from app_paths import app_data_dir
+
+AUTO = 'auto'
+
+# Compiler front ends, back ends and linkers that scons runs per job
+COMPILER_NAMES = (
+    'gcc', 'g++', 'cc', 'c++', 'cc1', 'cc1plus', 'lto1', 'lto-wrapper', 'collect2',
+    'ld', 'ld.gold', 'ld.bfd', 'ld.lld', 'lld', 'clang', 'clang++', 'clang-cl',
+    'cl', 'link', 'zig',
+)
+
+# Used until there is history; LTO links are far hungrier than plain compiles
+DEFAULT_JOB_RSS = 768 * 1024 ** 2
+DEFAULT_LTO_JOB_RSS = 2 * 1024 ** 3
+HISTORY_SIZE = 50
+
+
+def is_compiler(name):
+    """True for process names that belong to a C compile or link job"""
+    name = os.path.basename(name).lower()
+    if name.endswith('.exe'):
+        name = name[:-4]
+    if name in COMPILER_NAMES:
+        return True
+    # Cross and versioned compilers: x86_64-w64-mingw32-gcc, gcc-12, clang-17
+    for compiler in ('gcc', 'g++', 'clang'):
+        if name.endswith('-' + compiler) or name.startswith(compiler + '-'):
+            return True
+    return False
+
+
+class JobsHistory:
+    """Recent per-job peak RSS measurements, kept separately for LTO builds"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), 'jobs_history.json')
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, peak_job_rss, lto=False):
+        if not peak_job_rss:
+            return
+        data = self._load()
+        key = 'lto' if lto else 'plain'
+        data[key] = (data.get(key, []) + [peak_job_rss])[-HISTORY_SIZE:]
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    def per_job_rss(self, lto=False):
+        """Return a conservative (90th percentile) per-job peak RSS"""
+        samples = sorted(self._load().get('lto' if lto else 'plain', []))
+        if not samples:
+            return DEFAULT_LTO_JOB_RSS if lto else DEFAULT_JOB_RSS
+        return samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+
+
+def suggest_jobs(lto=False, history=None, cores=None, available=None, headroom=0.8):
+    """Return a starting --jobs value that fits both the cores and free memory"""
+    cores = cores or os.cpu_count() or 1
+    if available is None:
+        _total, available = process_tree.memory_status()
+    if not available:
+        return cores
+    per_job = (history or JobsHistory()).per_job_rss(lto)
+    memory_jobs = int(available * headroom // per_job)
+    return max(1, min(cores, memory_jobs))
+
+
+class JobsGovernor:
+    """Watch a build's compiler processes and pause them under memory pressure
+
+    When used memory climbs above high_water the newest running compiler is
+    paused (SIGSTOP, or psutil's suspend on Windows); paused compilers resume
+    oldest-first once usage drops below low_water. At least min_active
+    compilers are always left running so the build keeps making progress.
+    """
+
+    def __init__(self, root_pid, interval=1.0, high_water=0.90, low_water=0.80,
+                 min_active=1, on_event=None):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.high_water = high_water
+        self.low_water = low_water
+        self.min_active = min_active
+        self.on_event = on_event
+        self.peak_job_rss = 0
+        self.pauses = 0
+        self._paused = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not process_tree.supported():
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching and resume anything still paused"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for pid in self._paused:
+            process_tree.resume(pid)
+        self._paused = []
+
+    def _event(self, message):
+        if self.on_event:
+            self.on_event(message)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self._tick():
+                    # The build has exited
+                    return
+            except Exception as e:
+                self._event(f"Jobs governor stopped: {e}")
+                return
+
+    def _tick(self):
+        total, available = process_tree.memory_status()
+        tree = process_tree.process_tree(self.root_pid)
+        if not tree:
+            return False
+        compilers = [p for p in tree if is_compiler(p.name)]
+        for sample in compilers:
+            self.peak_job_rss = max(self.peak_job_rss, sample.rss)
+
+        live = {sample.pid for sample in compilers}
+        self._paused = [pid for pid in self._paused if pid in live]
+        if not total:
+            return True
+        used = 1.0 - available / total
+
+        running = [p for p in compilers if p.pid not in self._paused]
+        if used >= self.high_water and len(running) > self.min_active:
+            # Pause the youngest job: it has done the least work so far
+            newest = max(running, key=lambda p: (p.create_time, p.pid))
+            if process_tree.suspend(newest.pid):
+                self._paused.append(newest.pid)
+                self.pauses += 1
+                self._event(f"Memory at {used:.0%}: paused {newest.name} ({newest.pid}), "
+                            f"{len(self._paused)} job(s) waiting")
+        elif used <= self.low_water and self._paused:
+            pid = self._paused.pop(0)
+            process_tree.resume(pid)
+            self._event(f"Memory at {used:.0%}: resumed job {pid}")
+        return True
@@ -0,0 +1,405 @@
+"""
+Nuitkalicious - Nuitka options
+Description: The option set for a build and the Nuitka command it produces.
+Shared by the GUI and the command-line entry point, so it must never import
+tkinter.
+"""
+
+import copy
+import functools
+import hashlib
+import os
+import subprocess
+
+from jobs_governor import AUTO, suggest_jobs
+from nuitkalicious_resources import PACK_NAME
+from resource_pack import ACCESSOR_MODULE, pack_path
+from tcl_trim import staging_dir
+
+# Advanced option groups, in the order the Advanced tab shows them
+OPTION_GROUPS = {
+    'compilation': ('clang', 'mingw64', 'disable_console_ctrl_handler', 'full_compat', 'static_libpython'),
+    'module': ('follow_stdlib', 'prefer_source', 'include_package_data', 'python_flag_nosite', 'remove_embedded'),
+    'performance': ('disable_ccache', 'high_memory', 'linux_onefile_icon', 'macos_create_app_bundle'),
+    'debug': ('debug', 'unstriped', 'trace_execution', 'disable_dll_depsubprocess_cache',
+              'experimental', 'show_memory', 'show_progress', 'verbose'),
+}
+
+GROUP_FLAGS = {
+    'clang': '--clang',
+    'mingw64': '--mingw64',
+    'disable_console_ctrl_handler': '--disable-console-ctrl-handler',
+    'full_compat': '--full-compat',
+    'static_libpython': '--static-libpython=yes',
+    'follow_stdlib': '--follow-stdlib',
+    'prefer_source': '--prefer-source-code',
+    'include_package_data': '--include-package-data',
+    'python_flag_nosite': '--python-flag=nosite',
+    'remove_embedded': '--remove-embedded',
+    'disable_ccache': '--disable-ccache',
+    'high_memory': '--jobs=maximum',
+    'linux_onefile_icon': '--linux-onefile-icon',
+    'macos_create_app_bundle': '--macos-create-app-bundle',
+    'debug': '--debug',
+    'unstriped': '--unstriped',
+    'trace_execution': '--trace-execution',
+    'disable_dll_depsubprocess_cache': '--disable-dll-dependency-cache',
+    'experimental': '--experimental',
+    'show_memory': '--show-memory',
+    'show_progress': '--show-progress',
+    'verbose': '--verbose',
+}
+
+# How a onefile program unpacks: to a fresh temporary folder on every start, or once into a kept one
+ONEFILE_EXTRACTION = ('temporary', 'cached')
+# Payload compression: Nuitka's default zstd level 22, level 3 or none. Nuitka has no level
+# switch; level 3 comes with --low-memory, which also slows Nuitka and the C compiler down
+ONEFILE_COMPRESSION = {
+    'max': [],
+    'fast': ['--low-memory'],
+    'none': ['--onefile-no-compression'],
+}
+
+# Build tooling that must never end up inside the compiled program
+DEFAULT_NOFOLLOW = ('nuitka', 'ordered_set', 'wheel', 'pip', 'setuptools',
+                    'distutils', 'pkg_resources', 'zstandard')
+# Unnecessary test modules that --include-package=tkinter would otherwise pull in
+TKINTER_TEST_MODULES = ('tkinter.test', 'tkinter.test.support', 'tkinter.test.widget_tests')
+
+DEFAULT_OPTIONS = {
+    'script': '',
+    'use_venv': False,
+    'venv': '',
+    'standalone': False,
+    'onefile': False,
+    'remove_output': False,
+    # Onefile unpacking and compression; a blank extract_dir is {CACHE_DIR}/<script> for cached
+    # extraction and Nuitka's temporary folder otherwise, a blank version the build configuration's hash
+    'onefile_startup': {
+        'extraction': 'temporary',
+        'extract_dir': '',
+        'version': '',
+        'compression': 'max',
+    },
+    'no_console': False,
+    'follow_imports': False,
+    'lto': False,
+    'tkinter': False,
+    'pyqt6': False,
+    # Ship only the Tcl/Tk files the program needs (see tcl_trim); extra encodings and locales to keep
+    'tcl_trim': {
+        'enabled': False,
+        'encodings': [],
+        'locales': [],
+    },
+    # Extra Nuitka plugins to enable, by name
+    'plugins': [],
+    # Ask Nuitka for its XML compilation report (read by compilation_report)
+    'compilation_report': True,
+    'jobs': '1',
+    'icon': '',
+    'resources': [],
+    # Ship the resources as one indexed archive (see resource_pack) instead of a data file each
+    'resource_pack': {
+        'enabled': False,
+        'compress': True,
+    },
+    'optimization_level': 2,
+    # Set by the import analyzer; replaces the default exclusions below when on
+    'analyzed_imports': False,
+    'import_flags': [],
+    # Flags leaving files out of the distribution, from the size analyzer
+    'exclusions': [],
+    'compilation': dict.fromkeys(OPTION_GROUPS['compilation'], False),
+    'module': dict.fromkeys(OPTION_GROUPS['module'], False),
+    'performance': dict.fromkeys(OPTION_GROUPS['performance'], False),
+    'debug': dict.fromkeys(OPTION_GROUPS['debug'], False),
+    'cache': {
+        'enabled': True,
+        'max_gb': 10,
+        'shared_dir': '',
+        'compiler_dir': '',
+        'limits_mb': {'ccache': 5120, 'bytecode': 1024, 'dll-dependencies': 256},
+    },
+    # Build on a RAM disk (dir, or /dev/shm when blank) when the build fits with reserve_mb to spare
+    'ram_staging': {
+        'enabled': False,
+        'dir': '',
+        'reserve_mb': 1024,
+    },
+    # Resource sampling of every build; textfile_dir is a node exporter's textfile collector folder
+    'metrics': {
+        'enabled': True,
+        'interval': 0.5,
+        'json_dir': '',
+        'textfile_dir': '',
+    },
+    # How built programs are run when measuring them; smoke_test measures every
+    # finished build and flags growth past the thresholds as a regression
+    'benchmark': {
+        'startup_args': '',
+        'ready_pattern': '',
+        'timeout': 30,
+        'repeat': 3,
+        'command': '',
+        'smoke_test': False,
+        'startup_threshold_pct': 20,
+        'size_threshold_pct': 10,
+    },
+    # Hot-module acceleration: compile the slowest project modules in place
+    'hot_modules': {
+        'workload': '',
+        'top_n': 3,
+        'repeat': 3,
+    },
+    # Profile-guided optimization: one training command line per entry
+    'pgo': {
+        'training': [],
+        'timeout': 120,
+        'repeat': 3,
+    },
+}
+
+
+def default_options():
+    return copy.deepcopy(DEFAULT_OPTIONS)
+
+
+def merge_options(base, overrides):
+    """Return base updated with overrides, merging nested tables"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_options(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def with_output_dir(cmd, output_dir):
+    """Return a Nuitka command with its --output-dir replaced"""
+    return [f'--output-dir={output_dir}' if arg.startswith('--output-dir=') else arg for arg in cmd]
+
+
+def venv_python(venv_dir):
+    """Return the interpreter inside a virtual environment"""
+    if os.name == 'nt':
+        return os.path.join(venv_dir, 'Scripts', 'python.exe')
+    python = os.path.join(venv_dir, 'bin', 'python')
+    # Some POSIX venvs (e.g. made by distro tooling) only ship python3
+    python3 = os.path.join(venv_dir, 'bin', 'python3')
+    if not os.path.exists(python) and os.path.exists(python3):
+        return python3
+    return python
+
+
+def interpreter_path(options):
+    """Return the Python that runs Nuitka for these options"""
+    if options.get('use_venv') and options.get('venv'):
+        return venv_python(options['venv'])
+    return 'python'
+
+
+_TCL_PROBE = (
+    "import os, tkinter\n"
+    "base = os.path.dirname(os.path.dirname(tkinter.__file__))\n"
+    "print(os.path.join(base, 'tcl'))\n"
+    "print(os.path.join(base, 'tk'))\n"
+    "print(tkinter.Tcl().eval('info patchlevel'))\n"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def tcl_tk_paths(python_path):
+    """Return (tcl_lib, tk_lib, tcl_version) for an interpreter's tkinter"""
+    # Asked of the target interpreter, so this module never loads tkinter itself.
+    # Cached per interpreter: it cannot change while we run, and a probe costs
+    # a full interpreter start.
+    result = subprocess.run(
+        [python_path, '-c', _TCL_PROBE],
+        capture_output=True,
+        text=True,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) < 3:
+        raise RuntimeError(f"Could not locate Tcl/Tk for {python_path}: {result.stderr.strip()}")
+    return lines[0], lines[1], lines[2]
+
+
+def _jobs_flags(options):
+    jobs = str(options.get('jobs', '') or '')
+    if jobs == AUTO:
+        return [f'--jobs={suggest_jobs(lto=bool(options.get("lto")))}']
+    return [f'--jobs={jobs}'] if jobs else []
+
+
+def build_module_command(options, module_path, output_dir):
+    """Return the Nuitka command that compiles one module to an extension module"""
+    cmd = [interpreter_path(options), '-m', 'nuitka', '--module', '--assume-yes-for-downloads',
+           f'--output-dir={output_dir}', '--remove-output']
+    if options.get('lto'):
+        cmd.append('--lto=yes')
+    cmd.extend(_jobs_flags(options))
+    # Only the compiler choice carries over; the rest describes a program build
+    for name in ('clang', 'mingw64'):
+        if options.get('compilation', {}).get(name):
+            cmd.append(GROUP_FLAGS[name])
+    cmd.append(module_path)
+    return cmd
+
+
+def onefile_flags(options, cmd):
+    """Return the unpacking and compression flags of a onefile build; cmd is its command so far"""
+    settings = options.get('onefile_startup', DEFAULT_OPTIONS['onefile_startup'])
+    flags = list(ONEFILE_COMPRESSION[settings['compression']])
+    folder = settings['extract_dir'].rstrip('/\\')
+    if settings['extraction'] == 'cached':
+        # A folder per version: files of another build are never mixed in, and Nuitka checks
+        # each kept file's CRC32 on start, so a rebuild of the same version rewrites what changed.
+        # As for build fingerprints, --jobs and --output-dir do not change what is built
+        version = settings['version'] or hashlib.sha256('\0'.join(
+            arg for arg in cmd + flags if not arg.startswith(('--jobs=', '--output-dir='))
+        ).encode('utf-8')).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(options['script']))[0]
+        flags.append(f"--onefile-tempdir-spec={folder or '{CACHE_DIR}/' + stem}/{version}")
+        flags.append('--onefile-cache-mode=cached')
+    elif folder:
+        flags.append(f'--onefile-tempdir-spec={folder}/onefile_{{PID}}_{{TIME}}')
+    return flags
+
+
+def build_nuitka_command(options, tcl_info=None):
+    """Return the Nuitka argument list for an option set
+
+    tcl_info is an optional (tcl_lib, tk_lib, tcl_version) tuple; when
+    Tkinter support is on and it is not given, the interpreter is asked.
+    """
+    cmd = []
+    python = interpreter_path(options)
+
+    # Add optimization level directly to python command
+    opt_level = int(options.get('optimization_level', 2))
+    if opt_level >= 2:
+        cmd.extend([python, '-OO', '-m', 'nuitka'])
+    elif opt_level == 1:
+        cmd.extend([python, '-O', '-m', 'nuitka'])
+    else:
+        cmd.extend([python, '-m', 'nuitka'])
+
+    # Add automatic yes for downloads
+    cmd.append('--assume-yes-for-downloads')
+
+    # Get the directory of the selected Python script
+    script_path = options.get('script', '')
+    if script_path:
+        script_dir = os.path.dirname(script_path)
+        # Set output directory and working directory
+        cmd.append(f'--output-dir={script_dir}')
+
+    # Add all the options
+    if options.get('onefile'):
+        # For onefile, we need both flags
+        cmd.append('--standalone')
+        cmd.append('--onefile')
+    elif options.get('standalone'):
+        cmd.append('--standalone')
+    if options.get('remove_output'):
+        cmd.append('--remove-output')
+    if options.get('no_console'):
+        # Updated console option for newer Nuitka versions
+        cmd.append('--windows-console-mode=disable')
+    if options.get('follow_imports'):
+        cmd.append('--follow-imports')
+    if options.get('tkinter'):
+        cmd.append('--enable-plugin=tk-inter')
+    if options.get('pyqt6'):
+        cmd.append('--enable-plugin=pyqt6')
+    for plugin in options.get('plugins', []):
+        if f'--enable-plugin={plugin}' not in cmd:
+            cmd.append(f'--enable-plugin={plugin}')
+    if options.get('lto'):
+        cmd.append('--lto=yes')
+    cmd.extend(_jobs_flags(options))
+
+    # Add icon both as Windows icon and as a data file
+    icon_path = options.get('icon')
+    if icon_path:
+        icon_basename = os.path.basename(icon_path)
+        cmd.append(f'--windows-icon-from-ico={icon_path}')
+        cmd.append(f'--include-data-files={icon_path}={icon_basename}')
+
+    # Add resource files
+    resources = [path for path in options.get('resources', []) if not path.lower().endswith('.ico')]
+    if options.get('resource_pack', {}).get('enabled') and resources:
+        # One archive plus its reader; prepare_pack() builds it before the build runs
+        cmd.append(f'--include-data-file={pack_path(script_path)}={PACK_NAME}')
+        cmd.append(f'--include-module={ACCESSOR_MODULE}')
+    else:
+        for res_file in options.get('resources', []):
+            target_path = os.path.basename(res_file)
+            if not res_file.lower().endswith('.ico'):  # Skip .ico files as they're handled above
+                cmd.append(f'--include-data-file={res_file}={target_path}')
+
+    # Add advanced options in the order the Advanced tab lists them
+    for group, names in OPTION_GROUPS.items():
+        values = options.get(group, {})
+        for name in names:
+            if values.get(name):
+                cmd.append(GROUP_FLAGS[name])
+
+    analyzed = options.get('analyzed_imports')
+    if analyzed:
+        # Only the follow/include flags the import graph showed this program needs
+        cmd.extend(options.get('import_flags', []))
+    else:
+        # Add Nuitka exclusion patterns to prevent it from being included in the build
+        for module in DEFAULT_NOFOLLOW:
+            cmd.append(f'--nofollow-import-to={module}')
+    cmd.extend(flag for flag in options.get('exclusions', []) if flag not in cmd)
+
+    # Add cleanup flags (caches are kept and bounded by the cache manager)
+    cmd.append('--remove-output')
+
+    # Include Tcl/Tk files only if Tkinter support is enabled
+    if options.get('tkinter') and options.get('tcl_trim', {}).get('enabled'):
+        # The tk-inter plugin ships the trimmed copy prepare_tcl_trim() staged instead of the full libraries
+        staged = staging_dir(script_path)
+        cmd.append('--include-package=tkinter')
+        cmd.append('--include-package=_tkinter')
+        cmd.append(f"--tcl-library-dir={os.path.join(staged, 'tcl')}")
+        cmd.append(f"--tk-library-dir={os.path.join(staged, 'tk')}")
+        cmd.append('--enable-plugin=tk-inter')
+        cmd.extend(f'--nofollow-import-to={module}' for module in TKINTER_TEST_MODULES)
+    elif options.get('tkinter'):
+        tcl_lib, tk_lib, tcl_version = tcl_info or tcl_tk_paths(python)
+        short_version = tcl_version.rsplit(".", 1)[0]
+
+        if os.path.exists(tcl_lib):
+            cmd.append('--include-package=tkinter')
+            cmd.append('--include-package=_tkinter')
+            cmd.append(f'--include-data-dir={tcl_lib}=tcl')
+            cmd.append(f'--include-data-dir={tk_lib}=tk')
+
+            # Include specific version folders
+            tcl_version_dir = os.path.join(tcl_lib, f'tcl{short_version}')
+            tk_version_dir = os.path.join(tk_lib, f'tk{short_version}')
+
+            if os.path.exists(tcl_version_dir):
+                cmd.append(f'--include-data-dir={tcl_version_dir}=tcl{short_version}')
+            if os.path.exists(tk_version_dir):
+                cmd.append(f'--include-data-dir={tk_version_dir}=tk{short_version}')
+
+        # Add plugin options for tkinter
+        cmd.append('--enable-plugin=tk-inter')
+
+        # Exclude unnecessary test modules
+        cmd.extend(f'--nofollow-import-to={module}' for module in TKINTER_TEST_MODULES)
+
+    # Add the script path as the last argument (quoted by format_command when shown)
+    cmd.append(script_path)
+    if options.get('onefile'):
+        # Last, as the cached folder's default version is a hash of everything else
+        cmd[-1:-1] = onefile_flags(options, cmd)
+
+    return cmd
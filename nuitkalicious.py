@@ -5,19 +5,38 @@ Version: 1.4.2
 Description: GUI application to simplify the use of Nuitka compiler for Python
 """
 
+import time
+_STARTED = time.perf_counter()  # measured by --benchmark-startup
+
 import tkinter as tk
 
-from tkinter import ttk, filedialog, scrolledtext, messagebox
+from tkinter import ttk, filedialog, scrolledtext, messagebox, simpledialog
 import subprocess
 import os
+import shlex
+import sys
+
+from task_executor import TaskExecutor, run_process
+from build_runner import format_command, venv_environment
+from build_queue import BuildQueue
+from jobs_governor import AUTO
+from nuitka_options import (ONEFILE_COMPRESSION, ONEFILE_EXTRACTION, OPTION_GROUPS, build_nuitka_command,
+                            default_options, venv_python)
+from venv_inventory import VenvInventory, probe_interpreter
+from venv_pool import VenvPool
+
+
+def set_app_user_model_id():
+    # Windows taskbar icon support; ctypes is only loaded where it is needed
+    if os.name != 'nt':
+        return
+    try:
+        from ctypes import windll
+        my_appid = 'com.asteng88.nuitkalicious.nuitkalicious.1.4.2'
+        windll.shell32.SetCurrentProcessExplicitAppUserModelID(my_appid)
+    except (ImportError, AttributeError, OSError):
+        pass
 
-# Windows taskbar icon support
-try:
-    from ctypes import windll
-    my_appid = 'com.asteng88.nuitkalicious.nuitkalicious.1.4.2'
-    windll.shell32.SetCurrentProcessExplicitAppUserModelID(my_appid)
-except ImportError:
-    pass
 
 class Nuitkalicious:
     # Main application class for Nuitkalicious
@@ -40,6 +59,16 @@ class Nuitkalicious:
         self.exe_folder = None
         self.icon_path = None
         self.venv_active = True
+        self.build_session = None
+        self.import_flags = []
+        # Plugins enabled from the compilation report, on top of the Tkinter/PyQt6 checkboxes
+        self.extra_plugins = []
+        # Exclusion flags applied from the distribution analyzer
+        self.exclusions = []
+        self.pgo_training = []
+        self.pgo_training_text = None
+        # Only set from project files; blank means the app data folder
+        self.metrics_json_dir = ''
 
     def _setup_main_window(self, root):
         """Setup the main application window"""
@@ -47,6 +76,13 @@ class Nuitkalicious:
         self.root.title("Nuitkalicious - Nuitka GUI - Version 1.4.2")
         self.root.geometry("700x700")
         self._setup_app_icon()
+        # Blocking subprocess and filesystem work runs here, off the Tk thread
+        self.tasks = TaskExecutor(self.root)
+        self.venv_inventory = VenvInventory()
+        self.venv_pool = VenvPool()
+        self.build_queue = BuildQueue(on_update=self._on_queue_update)
+        self.queue_tick_pending = False
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def _setup_app_icon(self):
         """Setup application icon"""
@@ -63,6 +99,14 @@ class Nuitkalicious:
         """Setup the main UI components"""
         # Create notebook for tabs
         self.notebook = ttk.Notebook(self.root)
+
+        # Project files are shared with command-line builds (nuitkalicious_cli.py)
+        menubar = tk.Menu(self.root)
+        project_menu = tk.Menu(menubar, tearoff=0)
+        project_menu.add_command(label="Load Project...", command=self.load_project_file)
+        project_menu.add_command(label="Save Project...", command=self.save_project_file)
+        menubar.add_cascade(label="Project", menu=project_menu)
+        self.root.config(menu=menubar)
         self.notebook.pack(expand=True, fill='both', padx=5, pady=5)
         
         # Setup basic options tab
@@ -71,12 +115,73 @@ class Nuitkalicious:
         self.setup_basic_options()
         self.setup_output_panel(self.basic_frame)
         
-        # Setup advanced options tab
+        # Setup advanced options tab (widgets are built on first selection)
         self.advanced_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.advanced_frame, text='Advanced Options')
-        self.setup_advanced_options()
+        self._init_advanced_variables()
+        self.advanced_built = False
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+        # Setup build queue tab
+        self.queue_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.queue_frame, text='Build Queue')
+        self.setup_queue_tab()
 
     # Group 1: UI Setup Methods
+    def _init_advanced_variables(self):
+        # Advanced settings feed every command, so their variables exist before the tab is built
+        defaults = default_options()
+        self.compilation_vars = {name: tk.BooleanVar() for name in OPTION_GROUPS['compilation']}
+        self.module_vars = {name: tk.BooleanVar() for name in OPTION_GROUPS['module']}
+        self.perf_vars = {name: tk.BooleanVar() for name in OPTION_GROUPS['performance']}
+        self.debug_vars = {name: tk.BooleanVar() for name in OPTION_GROUPS['debug']}
+        self.optimization_level = tk.StringVar(value=str(defaults['optimization_level']))
+        self.cache_max_gb = tk.StringVar(value=str(defaults['cache']['max_gb']))
+        self.cache_shared_dir = tk.StringVar()
+        self.compiler_cache_dir = tk.StringVar()
+        self.compiler_cache_limits = {name: tk.StringVar(value=str(limit_mb))
+                                      for name, limit_mb in defaults['cache']['limits_mb'].items()}
+        self.wheelhouse_dir = tk.StringVar()
+        self.offline_install_var = tk.BooleanVar()
+        self.analyzed_imports_var = tk.BooleanVar()
+        self.compilation_report_var = tk.BooleanVar(value=defaults['compilation_report'])
+        self.resource_pack_var = tk.BooleanVar(value=defaults['resource_pack']['enabled'])
+        self.tcl_trim_var = tk.BooleanVar(value=defaults['tcl_trim']['enabled'])
+        self.tcl_trim_encodings = tk.StringVar()
+        self.tcl_trim_locales = tk.StringVar()
+        onefile_startup = defaults['onefile_startup']
+        self.onefile_extraction = tk.StringVar(value=onefile_startup['extraction'])
+        self.onefile_extract_dir = tk.StringVar(value=onefile_startup['extract_dir'])
+        self.onefile_version = tk.StringVar(value=onefile_startup['version'])
+        self.onefile_compression = tk.StringVar(value=onefile_startup['compression'])
+        self.resource_compress_var = tk.BooleanVar(value=defaults['resource_pack']['compress'])
+        self.hot_workload = tk.StringVar(value=defaults['hot_modules']['workload'])
+        self.hot_top_n = tk.StringVar(value=str(defaults['hot_modules']['top_n']))
+        self.hot_repeat = tk.StringVar(value=str(defaults['hot_modules']['repeat']))
+        self.pgo_timeout = tk.StringVar(value=str(defaults['pgo']['timeout']))
+        self.pgo_repeat = tk.StringVar(value=str(defaults['pgo']['repeat']))
+        benchmark = defaults['benchmark']
+        self.bench_startup_args = tk.StringVar(value=benchmark['startup_args'])
+        self.bench_ready_pattern = tk.StringVar(value=benchmark['ready_pattern'])
+        self.bench_command = tk.StringVar(value=benchmark['command'])
+        self.bench_timeout = tk.StringVar(value=str(benchmark['timeout']))
+        self.bench_repeat = tk.StringVar(value=str(benchmark['repeat']))
+        self.ram_staging_var = tk.BooleanVar(value=defaults['ram_staging']['enabled'])
+        self.ram_staging_dir = tk.StringVar(value=defaults['ram_staging']['dir'])
+        self.ram_reserve_mb = tk.StringVar(value=str(defaults['ram_staging']['reserve_mb']))
+        self.metrics_var = tk.BooleanVar(value=defaults['metrics']['enabled'])
+        self.metrics_interval = tk.StringVar(value=str(defaults['metrics']['interval']))
+        self.metrics_textfile_dir = tk.StringVar(value=defaults['metrics']['textfile_dir'])
+        self.smoke_test_var = tk.BooleanVar(value=benchmark['smoke_test'])
+        self.startup_threshold = tk.StringVar(value=str(benchmark['startup_threshold_pct']))
+        self.size_threshold = tk.StringVar(value=str(benchmark['size_threshold_pct']))
+
+    def on_tab_changed(self, _event=None):
+        # The Advanced tab is built the first time it is shown
+        if not self.advanced_built and self.notebook.select() == str(self.advanced_frame):
+            self.advanced_built = True
+            self.setup_advanced_options()
+
     def setup_basic_options(self):
         # Initialize BooleanVar variables first
         self.standalone_var = tk.BooleanVar()
@@ -145,7 +250,12 @@ class Nuitkalicious:
         jobs_frame.pack(fill='x', pady=5)
         ttk.Label(jobs_frame, text="Jobs:").pack(side='left')
         self.jobs_var = tk.StringVar(value="1")
-        ttk.Spinbox(jobs_frame, from_=1, to=16, textvariable=self.jobs_var, width=5).pack(side='left', padx=5)
+        # "auto" sizes --jobs from cores and free memory and throttles under memory pressure
+        job_choices = (AUTO,) + tuple(str(n) for n in range(1, max(16, os.cpu_count() or 1) + 1))
+        ttk.Spinbox(jobs_frame, values=job_choices, textvariable=self.jobs_var, width=5).pack(side='left', padx=5)
+        
+        self.build_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(right_column, text="Use Build Cache", variable=self.build_cache_var).pack(anchor='w')
         
         # Virtual environment option
         venv_frame = ttk.LabelFrame(self.basic_frame, text="Virtual Environment (venv)", padding=5)
@@ -165,6 +275,9 @@ class Nuitkalicious:
         self.venv_browse_button = ttk.Button(button_frame, text="Browse", 
                                        command=self.browse_venv, state='disabled')
         self.venv_browse_button.pack(side='left', padx=2)
+
+        ttk.Button(button_frame, text="Find venvs",
+                   command=self.scan_venvs).pack(side='left', padx=2)
         
         self.uninstall_button = ttk.Button(button_frame, text="Uninstall Nuitka", 
                                       command=self.uninstall_nuitka, state='disabled')
@@ -193,6 +306,10 @@ class Nuitkalicious:
         
         ttk.Button(button_frame, text="Add Files", command=self.add_resources).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Remove Selected", command=self.remove_resource).pack(side='left')
+        ttk.Checkbutton(button_frame, text="Compress",
+                        variable=self.resource_compress_var).pack(side='right')
+        ttk.Checkbutton(button_frame, text="Pack Into One Archive",
+                        variable=self.resource_pack_var).pack(side='right', padx=5)
         
         # Create a frame for the action buttons
         action_frame = ttk.Frame(self.basic_frame)
@@ -210,9 +327,15 @@ class Nuitkalicious:
         self.open_exe_button = ttk.Button(action_frame, text="Open Executable Folder", 
                                         command=self.open_exe_folder, state='disabled')
         self.open_exe_button.pack(side='left', padx=5)
+
+        ttk.Button(action_frame, text="Analyze Distribution...",
+                   command=self.analyze_distribution).pack(side='left', padx=5)
         
         # Add Clear All button
         ttk.Button(action_frame, text="Clear All", command=self.clear_all).pack(side='left', padx=5)
+
+        # Cancel whatever is running in the background
+        ttk.Button(action_frame, text="Cancel", command=self.cancel_tasks).pack(side='left', padx=5)
         
     def setup_output_panel(self, parent):
         status_frame = ttk.LabelFrame(parent, text="Status", padding=5)
@@ -220,9 +343,47 @@ class Nuitkalicious:
         
         self.status_label = ttk.Label(status_frame, text="Ready")
         self.status_label.pack(fill='x', padx=5, pady=5)
+
+        # Filled from the build history while Nuitka runs
+        self.build_progress = ttk.Progressbar(status_frame, mode='determinate', maximum=1.0)
+        self.build_progress.pack(fill='x', padx=5)
+        self.build_eta_label = ttk.Label(status_frame, text="")
+        self.build_eta_label.pack(fill='x', padx=5)
+        # Live memory (blue) and CPU (orange) of the build's process tree
+        self.metrics_chart = tk.Canvas(status_frame, height=40, highlightthickness=0)
+        self.metrics_chart.pack(fill='x', padx=5, pady=(2, 0))
+        self.build_progress_ticking = False
         
-        # Keep command preview for compatibility
-        self.command_preview = scrolledtext.ScrolledText(parent, height=0)  # Hidden but keeps references working
+        # Build output is streamed here; hidden until the user asks for it
+        self.command_preview = scrolledtext.ScrolledText(parent, height=0)
+        self.build_log_visible = False
+        log_buttons = ttk.Frame(status_frame)
+        log_buttons.pack(anchor='e', padx=5)
+        ttk.Button(log_buttons, text="Build History...",
+                   command=self.show_build_history).pack(side='left', padx=2)
+        ttk.Button(log_buttons, text="Compare Builds...",
+                   command=self.compare_builds).pack(side='left', padx=2)
+        ttk.Button(log_buttons, text="Show/Hide Build Log",
+                   command=self.toggle_build_log).pack(side='left')
+
+    def toggle_build_log(self):
+        if self.build_log_visible:
+            self.command_preview.pack_forget()
+        else:
+            self.command_preview.config(height=12)
+            self.command_preview.pack(fill='both', expand=True, padx=5, pady=5)
+        self.build_log_visible = not self.build_log_visible
+
+    def append_build_log(self, text, max_lines=20000):
+        """Append build output to the log, keeping it to a bounded number of lines"""
+        at_end = self.command_preview.yview()[1] >= 0.999
+        self.command_preview.insert('end', text)
+        line_count = int(self.command_preview.index('end-1c').split('.')[0])
+        if line_count > max_lines:
+            self.command_preview.delete('1.0', f"{line_count - max_lines}.0")
+        # Only follow the output if the user has not scrolled back
+        if at_end:
+            self.command_preview.see('end')
 
     def setup_advanced_options(self):
         # Setup the advanced options tab
@@ -261,14 +422,6 @@ class Nuitkalicious:
         compile_frame.pack(fill='x', pady=5)
         option_frames.append(compile_frame)
 
-        self.compilation_vars = {
-            'clang': tk.BooleanVar(),
-            'mingw64': tk.BooleanVar(),
-            'disable_console_ctrl_handler': tk.BooleanVar(),
-            'full_compat': tk.BooleanVar(),
-            'static_libpython': tk.BooleanVar()
-        }
-
         for name, var in self.compilation_vars.items():
             ttk.Checkbutton(compile_frame, text=name.replace('_', ' ').title(), 
                            variable=var).pack(anchor='w')
@@ -277,30 +430,58 @@ class Nuitkalicious:
         module_frame.pack(fill='x', pady=5)
         option_frames.append(module_frame)
 
-        self.module_vars = {
-            'follow_stdlib': tk.BooleanVar(),
-            'prefer_source': tk.BooleanVar(),
-            'include_package_data': tk.BooleanVar(),
-            'python_flag_nosite': tk.BooleanVar(),
-            'remove_embedded': tk.BooleanVar()
-        }
-
         for name, var in self.module_vars.items():
             ttk.Checkbutton(module_frame, text=name.replace('_', ' ').title(), 
                            variable=var).pack(anchor='w')
 
+        # Follow flags derived from the script's import graph (sized on its own)
+        imports_frame = ttk.LabelFrame(left_column, text="Import Analysis", padding=5)
+        imports_frame.pack(fill='x', pady=5)
+        ttk.Button(imports_frame, text="Analyze Imports...",
+                   command=self.analyze_imports).pack(fill='x', pady=1)
+        ttk.Button(imports_frame, text="Trace Run...",
+                   command=self.trace_run).pack(fill='x', pady=1)
+        ttk.Checkbutton(imports_frame, text="Use Analyzed Import Flags",
+                        variable=self.analyzed_imports_var).pack(anchor='w')
+        ttk.Checkbutton(imports_frame, text="Write Compilation Report",
+                        variable=self.compilation_report_var).pack(anchor='w')
+        ttk.Button(imports_frame, text="Compilation Report...",
+                   command=self.show_compilation_report).pack(fill='x', pady=1)
+
+        # Compile only the slowest project modules, for apps that keep running on CPython
+        hot_frame = ttk.LabelFrame(left_column, text="Hot-Module Accelerator", padding=5)
+        hot_frame.pack(fill='x', pady=5)
+        ttk.Label(hot_frame, text="Workload arguments:").pack(anchor='w')
+        ttk.Entry(hot_frame, textvariable=self.hot_workload).pack(fill='x')
+        for label, variable, upper in (("Modules to compile:", self.hot_top_n, 50),
+                                       ("Timing repeats:", self.hot_repeat, 20)):
+            row = ttk.Frame(hot_frame)
+            row.pack(fill='x')
+            ttk.Label(row, text=label).pack(side='left')
+            ttk.Spinbox(row, from_=1, to=upper, width=5, textvariable=variable).pack(side='right')
+        ttk.Button(hot_frame, text="Accelerate Hot Modules",
+                   command=self.accelerate_hot_modules).pack(fill='x', pady=1)
+        ttk.Button(hot_frame, text="Remove Compiled Modules",
+                   command=self.remove_hot_modules).pack(fill='x', pady=1)
+
+        # Ship only the Tcl/Tk files a tkinter program uses
+        tcl_frame = ttk.LabelFrame(left_column, text="Tcl/Tk Trimming", padding=5)
+        tcl_frame.pack(fill='x', pady=5)
+        ttk.Checkbutton(tcl_frame, text="Trim Tcl/Tk Payload", variable=self.tcl_trim_var).pack(anchor='w')
+        for label, variable in (("Extra encodings:", self.tcl_trim_encodings),
+                                ("Extra locales:", self.tcl_trim_locales)):
+            row = ttk.Frame(tcl_frame)
+            row.pack(fill='x')
+            ttk.Label(row, text=label).pack(side='left')
+            ttk.Entry(row, textvariable=variable, width=16).pack(side='right')
+        ttk.Button(tcl_frame, text="Trace Tk Run...", command=self.trace_tcl_run).pack(fill='x', pady=1)
+        ttk.Button(tcl_frame, text="Trim Report...", command=self.show_tcl_trim).pack(fill='x', pady=1)
+
         # Column 2: Performance and Optimization Options
         perf_frame = ttk.LabelFrame(middle_column, text="Performance Options", padding=5)
         perf_frame.pack(fill='x', pady=5)
         option_frames.append(perf_frame)
 
-        self.perf_vars = {
-            'disable_ccache': tk.BooleanVar(),
-            'high_memory': tk.BooleanVar(),
-            'linux_onefile_icon': tk.BooleanVar(),
-            'macos_create_app_bundle': tk.BooleanVar()
-        }
-
         for name, var in self.perf_vars.items():
             ttk.Checkbutton(perf_frame, text=name.replace('_', ' '). title(), 
                            variable=var).pack(anchor='w')
@@ -309,31 +490,153 @@ class Nuitkalicious:
         optim_frame.pack(fill='x', pady=5)
         option_frames.append(optim_frame)
 
-        self.optimization_level = tk.StringVar(value="2")
         ttk.Label(optim_frame, text="Optimization Level:").pack(side='left')
         ttk.Spinbox(optim_frame, from_=0, to=3, width=5, 
                     textvariable=self.optimization_level).pack(side='left', padx=5)
 
+        # Installs from a local wheelhouse, for air-gapped machines (sized on its own)
+        offline_frame = ttk.LabelFrame(middle_column, text="Offline Installs", padding=5)
+        offline_frame.pack(fill='x', pady=5)
+        ttk.Checkbutton(offline_frame, text="Install From Wheelhouse Only",
+                        variable=self.offline_install_var).pack(anchor='w')
+        ttk.Label(offline_frame, text="Wheelhouse (blank = default):").pack(anchor='w')
+        ttk.Entry(offline_frame, textvariable=self.wheelhouse_dir).pack(fill='x')
+        ttk.Button(offline_frame, text="Fill Wheelhouse",
+                   command=self.fill_wheelhouse).pack(fill='x', pady=1)
+        ttk.Button(offline_frame, text="New venv From Pool...",
+                   command=self.create_pooled_venv).pack(fill='x', pady=1)
+
+        # Profile-guided optimization (sized on its own)
+        pgo_frame = ttk.LabelFrame(middle_column, text="Profile-Guided Optimization", padding=5)
+        pgo_frame.pack(fill='x', pady=5)
+        ttk.Label(pgo_frame, text="Training arguments (one run per line):").pack(anchor='w')
+        self.pgo_training_text = tk.Text(pgo_frame, height=3, width=30)
+        self.pgo_training_text.insert('1.0', '\n'.join(self.pgo_training))
+        self.pgo_training_text.pack(fill='x')
+        for label, variable, upper in (("Timeout per run (s):", self.pgo_timeout, 3600),
+                                       ("Benchmark repeats:", self.pgo_repeat, 20)):
+            row = ttk.Frame(pgo_frame)
+            row.pack(fill='x')
+            ttk.Label(row, text=label).pack(side='left')
+            ttk.Spinbox(row, from_=1, to=upper, width=6, textvariable=variable).pack(side='right')
+        ttk.Button(pgo_frame, text="Build With PGO",
+                   command=self.build_with_pgo).pack(fill='x', pady=1)
+
+        # How onefile programs unpack at start-up (sized on its own)
+        onefile_frame = ttk.LabelFrame(middle_column, text="Onefile Startup", padding=5)
+        onefile_frame.pack(fill='x', pady=5)
+        for label, variable, values in (("Unpacking:", self.onefile_extraction, ONEFILE_EXTRACTION),
+                                        ("Compression:", self.onefile_compression, list(ONEFILE_COMPRESSION))):
+            row = ttk.Frame(onefile_frame)
+            row.pack(fill='x')
+            ttk.Label(row, text=label).pack(side='left')
+            ttk.Combobox(row, textvariable=variable, values=values, state='readonly',
+                         width=10).pack(side='right')
+        ttk.Label(onefile_frame, text="fast = zstd 3 via --low-memory (slower build)").pack(anchor='w')
+        ttk.Label(onefile_frame, text="Unpack folder (blank = default):").pack(anchor='w')
+        ttk.Entry(onefile_frame, textvariable=self.onefile_extract_dir).pack(fill='x')
+        ttk.Label(onefile_frame, text="Cache version (blank = build hash):").pack(anchor='w')
+        ttk.Entry(onefile_frame, textvariable=self.onefile_version).pack(fill='x')
+        ttk.Button(onefile_frame, text="Benchmark Onefile Startup...",
+                   command=self.benchmark_onefile).pack(fill='x', pady=1)
+
         # Column 3: Debug Options
         debug_frame = ttk.LabelFrame(right_column, text="Debug Options", padding=5)
         debug_frame.pack(fill='x', pady=5)
         option_frames.append(debug_frame)
 
-        self.debug_vars = {
-            'debug': tk.BooleanVar(),
-            'unstriped': tk.BooleanVar(),
-            'trace_execution': tk.BooleanVar(),
-            'disable_dll_depsubprocess_cache': tk.BooleanVar(),  # This was mismatched
-            'experimental': tk.BooleanVar(),
-            'show_memory': tk.BooleanVar(),
-            'show_progress': tk.BooleanVar(),
-            'verbose': tk.BooleanVar(),
-        }
-
         for name, var in self.debug_vars.items():
             ttk.Checkbutton(debug_frame, text=name.replace('_', ' '). title(), 
                            variable=var).pack(anchor='w')
 
+        # Build cache settings (kept out of option_frames so it sizes itself)
+        cache_frame = ttk.LabelFrame(right_column, text="Build Cache", padding=5)
+        cache_frame.pack(fill='x', pady=5)
+
+        size_frame = ttk.Frame(cache_frame)
+        size_frame.pack(fill='x')
+        ttk.Label(size_frame, text="Max Size (GB):").pack(side='left')
+        ttk.Spinbox(size_frame, from_=1, to=500, width=5,
+                    textvariable=self.cache_max_gb).pack(side='left', padx=5)
+
+        ttk.Label(cache_frame, text="Shared Directory:").pack(anchor='w')
+        ttk.Entry(cache_frame, textvariable=self.cache_shared_dir).pack(fill='x')
+        ttk.Button(cache_frame, text="Browse",
+                   command=self.browse_cache_shared_dir).pack(anchor='e', pady=2)
+
+        # Persistent ccache / bytecode / DLL dependency caches
+        compiler_cache_frame = ttk.LabelFrame(right_column, text="Compiler Caches", padding=5)
+        compiler_cache_frame.pack(fill='x', pady=5)
+
+        ttk.Label(compiler_cache_frame, text="Location (blank = default):").pack(anchor='w')
+        ttk.Entry(compiler_cache_frame, textvariable=self.compiler_cache_dir).pack(fill='x')
+
+        for name in self.compiler_cache_limits:
+            limit_frame = ttk.Frame(compiler_cache_frame)
+            limit_frame.pack(fill='x')
+            ttk.Label(limit_frame, text=f"{name.replace('-', ' ').title()} (MB):").pack(side='left')
+            ttk.Spinbox(limit_frame, from_=0, to=100000, increment=256, width=7,
+                        textvariable=self.compiler_cache_limits[name]).pack(side='right')
+
+        ttk.Button(compiler_cache_frame, text="Clear This Venv",
+                   command=lambda: self.invalidate_compiler_caches('venv')).pack(fill='x', pady=1)
+        ttk.Button(compiler_cache_frame, text="Clear This Nuitka Version",
+                   command=lambda: self.invalidate_compiler_caches('nuitka')).pack(fill='x', pady=1)
+        ttk.Button(compiler_cache_frame, text="Clear All Caches",
+                   command=lambda: self.invalidate_compiler_caches('all')).pack(fill='x', pady=1)
+
+        # Nuitka's build tree on a RAM disk instead of next to the script
+        ram_frame = ttk.LabelFrame(right_column, text="RAM-Disk Staging", padding=5)
+        ram_frame.pack(fill='x', pady=5)
+        ttk.Checkbutton(ram_frame, text="Build On RAM Disk", variable=self.ram_staging_var).pack(anchor='w')
+        ttk.Label(ram_frame, text="RAM disk folder (blank = /dev/shm):").pack(anchor='w')
+        ttk.Entry(ram_frame, textvariable=self.ram_staging_dir).pack(fill='x')
+        row = ttk.Frame(ram_frame)
+        row.pack(fill='x')
+        ttk.Label(row, text="Keep free (MB):").pack(side='left')
+        ttk.Spinbox(row, from_=0, to=100000, increment=256, width=7,
+                    textvariable=self.ram_reserve_mb).pack(side='right')
+
+        # Resource sampling of every build, for capacity planning
+        metrics_frame = ttk.LabelFrame(right_column, text="Build Metrics", padding=5)
+        metrics_frame.pack(fill='x', pady=5)
+        ttk.Checkbutton(metrics_frame, text="Sample Build Resources",
+                        variable=self.metrics_var).pack(anchor='w')
+        row = ttk.Frame(metrics_frame)
+        row.pack(fill='x')
+        ttk.Label(row, text="Sample interval (s):").pack(side='left')
+        ttk.Spinbox(row, from_=0.1, to=10, increment=0.1, width=6,
+                    textvariable=self.metrics_interval).pack(side='right')
+        ttk.Label(metrics_frame, text="Prometheus textfile folder:").pack(anchor='w')
+        ttk.Entry(metrics_frame, textvariable=self.metrics_textfile_dir).pack(fill='x')
+
+        # How built programs are measured, and the option-matrix explorer that uses it
+        bench_frame = ttk.LabelFrame(right_column, text="Benchmark", padding=5)
+        bench_frame.pack(fill='x', pady=5)
+        for label, variable in (("Startup arguments:", self.bench_startup_args),
+                                ("Ready pattern (blank = exit):", self.bench_ready_pattern),
+                                ("Benchmark command ({exe} = program):", self.bench_command)):
+            ttk.Label(bench_frame, text=label).pack(anchor='w')
+            ttk.Entry(bench_frame, textvariable=variable).pack(fill='x')
+        for label, variable, upper in (("Timeout per run (s):", self.bench_timeout, 3600),
+                                       ("Repeats:", self.bench_repeat, 20)):
+            row = ttk.Frame(bench_frame)
+            row.pack(fill='x')
+            ttk.Label(row, text=label).pack(side='left')
+            ttk.Spinbox(row, from_=1, to=upper, width=6, textvariable=variable).pack(side='right')
+        ttk.Checkbutton(bench_frame, text="Smoke Test After Each Build",
+                        variable=self.smoke_test_var).pack(anchor='w')
+        for label, variable in (("Startup regression (%):", self.startup_threshold),
+                                ("Size regression (%):", self.size_threshold)):
+            row = ttk.Frame(bench_frame)
+            row.pack(fill='x')
+            ttk.Label(row, text=label).pack(side='left')
+            ttk.Spinbox(row, from_=1, to=1000, width=6, textvariable=variable).pack(side='right')
+        ttk.Button(bench_frame, text="Accept Last Build As Baseline",
+                   command=self.accept_smoke_baseline).pack(fill='x', pady=1)
+        ttk.Button(bench_frame, text="Explore Option Matrix...",
+                   command=self.explore_option_matrix).pack(fill='x', pady=1)
+
         # Wait for all frames to be drawn
         self.root.update_idletasks()
 
@@ -351,6 +654,46 @@ class Nuitkalicious:
         canvas.pack(side="left", fill="both", expand=True, padx=5, pady=5)
         scrollbar.pack(side="right", fill="y")
 
+    def setup_queue_tab(self):
+        # Setup the build queue tab
+        controls = ttk.Frame(self.queue_frame)
+        controls.pack(fill='x', padx=5, pady=5)
+
+        ttk.Button(controls, text="Add Current Script",
+                   command=lambda: self.enqueue_scripts([self.script_path.get()])).pack(side='left', padx=2)
+        ttk.Button(controls, text="Add Scripts...", command=self.browse_queue_scripts).pack(side='left', padx=2)
+
+        ttk.Label(controls, text="Priority:").pack(side='left', padx=(10, 0))
+        self.queue_priority = tk.StringVar(value="0")
+        ttk.Spinbox(controls, from_=-10, to=10, width=4,
+                    textvariable=self.queue_priority).pack(side='left', padx=2)
+
+        ttk.Label(controls, text="Parallel Builds:").pack(side='left', padx=(10, 0))
+        self.queue_parallel = tk.StringVar(value=str(self.build_queue.max_parallel))
+        ttk.Spinbox(controls, from_=1, to=os.cpu_count() or 1, width=4, textvariable=self.queue_parallel,
+                    command=self.update_queue_parallel).pack(side='left', padx=2)
+
+        columns = ('script', 'priority', 'status', 'jobs', 'time')
+        self.queue_tree = ttk.Treeview(self.queue_frame, columns=columns, show='headings', height=12)
+        for column, heading, width in (('script', 'Script', 260), ('priority', 'Priority', 60),
+                                       ('status', 'Status', 90), ('jobs', 'Jobs', 50), ('time', 'Time', 80)):
+            self.queue_tree.heading(column, text=heading)
+            self.queue_tree.column(column, width=width, anchor='w' if column == 'script' else 'center')
+        self.queue_tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+        item_buttons = ttk.Frame(self.queue_frame)
+        item_buttons.pack(fill='x', padx=5, pady=5)
+        ttk.Button(item_buttons, text="Raise Priority",
+                   command=lambda: self.change_queue_priority(1)).pack(side='left', padx=2)
+        ttk.Button(item_buttons, text="Lower Priority",
+                   command=lambda: self.change_queue_priority(-1)).pack(side='left', padx=2)
+        ttk.Button(item_buttons, text="Cancel Selected", command=self.cancel_queue_items).pack(side='left', padx=2)
+        ttk.Button(item_buttons, text="Show Log", command=self.show_queue_log).pack(side='left', padx=2)
+        ttk.Button(item_buttons, text="Clear Finished", command=self.clear_finished_queue).pack(side='left', padx=2)
+
+        self.queue_summary = ttk.Label(self.queue_frame, text="Queue empty")
+        self.queue_summary.pack(fill='x', padx=5, pady=5)
+
     # Group 2: Event Handlers
     def clear_all(self):
         # Reset all fields and checkboxes to their default states
@@ -440,6 +783,303 @@ class Nuitkalicious:
                 # Immediately check for Nuitka when selecting venv
                 self.check_nuitka_installed(self.get_venv_python())
                 
+    def scan_venvs(self):
+        # Find and probe every venv under a project folder, in parallel
+        script = self.script_path.get()
+        root_dir = filedialog.askdirectory(title="Select Project Folder to Search for venvs",
+                                           initialdir=os.path.dirname(script) if script else None)
+        if not root_dir:
+            return
+        self.status_label.config(text=f"Searching {root_dir} for virtual environments...")
+
+        def worker(task):
+            return self.venv_inventory.scan(root_dir)
+
+        self.tasks.submit(worker, name='scan-venvs', on_done=self.show_venv_inventory,
+                          on_error=lambda e: self.status_label.config(text=f"Error searching for venvs: {str(e)}"))
+
+    def show_venv_inventory(self, infos):
+        if not infos:
+            self.status_label.config(text="No virtual environments found")
+            return
+        self.status_label.config(text=f"Found {len(infos)} virtual environment(s)")
+
+        window = tk.Toplevel(self.root)
+        window.title("Virtual Environments")
+        columns = ('path', 'python', 'nuitka', 'plugins')
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=min(len(infos), 12))
+        for column, heading, width in (('path', 'Location', 280), ('python', 'Python', 70),
+                                       ('nuitka', 'Nuitka', 90), ('plugins', 'Plugin Packages', 200)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor='w')
+        for index, info in enumerate(infos):
+            nuitka = info.nuitka_version or ('probe failed' if info.error else 'not installed')
+            tree.insert('', 'end', iid=str(index), values=(
+                info.path, info.python_version or '?', nuitka, ', '.join(sorted(info.plugins))))
+        tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+        def use_selected():
+            selection = tree.selection()
+            if not selection:
+                return
+            self.venv_path.set(infos[int(selection[0])].path)
+            self.use_venv_var.set(True)
+            self.toggle_venv_controls()
+            window.destroy()
+
+        ttk.Button(window, text="Use Selected", command=use_selected).pack(pady=5)
+
+    def analyze_imports(self):
+        from import_graph import ImportGraph
+
+        # Build the static import graph against the interpreter that will compile the script
+        script = self.script_path.get()
+        if not script or not os.path.isfile(script):
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        python_path = self.get_venv_python()
+        self.status_label.config(text=f"Analyzing imports of {os.path.basename(script)}...")
+
+        def worker(task):
+            return ImportGraph(script, python_path)
+
+        def error(e):
+            self.status_label.config(text=f"Error analyzing imports: {str(e)}")
+            messagebox.showerror("Error", f"Failed to analyze imports: {str(e)}")
+
+        self.tasks.submit(worker, name='analyze-imports', on_done=self.show_import_graph, on_error=error)
+
+    def show_import_graph(self, graph):
+        count, total, seconds = graph.subtree_stats(graph.ROOT)
+        self.status_label.config(text=f"{count} modules reachable, {total / 1024 / 1024:.1f} MB, "
+                                      f"~{seconds:.0f}s to compile")
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Imports of {os.path.basename(graph.script_path)}")
+        columns = ('kind', 'edge', 'modules', 'size', 'cost')
+        tree = ttk.Treeview(window, columns=columns, height=18)
+        tree.heading('#0', text="Module")
+        tree.column('#0', width=260)
+        for column, heading, width in (('kind', 'Kind', 60), ('edge', 'Import', 70), ('modules', 'Modules', 70),
+                                       ('size', 'Size (KB)', 80), ('cost', 'Est. Compile (s)', 100)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor='e' if column in ('modules', 'size', 'cost') else 'w')
+        tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+        def insert(parent, name, edge):
+            node = graph.nodes.get(name)
+            count, total, seconds = graph.subtree_stats(name)
+            item = tree.insert(parent, 'end', text=name, values=(
+                node.kind if node else '?', edge, count, f"{total / 1024:.0f}", f"{seconds:.1f}"))
+            if graph.children(name):
+                # Placeholder until the row is opened; large graphs are filled in lazily
+                tree.insert(item, 'end', text='...')
+            return item
+
+        def on_open(_event):
+            item = tree.focus()
+            children = tree.get_children(item)
+            if len(children) == 1 and tree.item(children[0], 'text') == '...':
+                tree.delete(children[0])
+                for name, edge in graph.children(tree.item(item, 'text')):
+                    insert(item, name, edge)
+
+        tree.bind('<<TreeviewOpen>>', on_open)
+        root_item = insert('', graph.ROOT, '')
+        tree.item(root_item, open=True)
+        tree.focus(root_item)
+        on_open(None)
+
+        exclude_optional = tk.BooleanVar()
+        optional = graph.optional_packages()
+        ttk.Checkbutton(window, text=f"Exclude optional imports ({', '.join(optional) or 'none'})",
+                        variable=exclude_optional,
+                        command=lambda: show_flags()).pack(anchor='w', padx=5)
+
+        flags_text = tk.Text(window, height=5, width=80)
+        flags_text.pack(fill='x', padx=5, pady=5)
+
+        def show_flags():
+            flags_text.delete('1.0', 'end')
+            flags_text.insert('1.0', '\n'.join(graph.suggested_flags(exclude_optional.get())))
+
+        def use_flags():
+            self.import_flags = graph.suggested_flags(exclude_optional.get())
+            self.analyzed_imports_var.set(True)
+            self.status_label.config(text=f"Using {len(self.import_flags)} analyzed import flag(s)")
+            window.destroy()
+
+        show_flags()
+        ttk.Button(window, text="Use These Flags", command=use_flags).pack(pady=5)
+
+    def trace_run(self):
+        from import_graph import ImportGraph
+        from import_tracer import TraceStore, trace_command
+
+        # Run the script (or e.g. its test suite) and record which modules it really imports
+        script = self.script_path.get()
+        if not script or not os.path.isfile(script):
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        run = simpledialog.askstring(
+            "Trace Run", "Arguments for this run (blank for none, or -m pytest tests to trace a test suite).\n"
+                         "Each run is merged with the earlier runs of this script.", parent=self.root)
+        if run is None:
+            return
+        try:
+            run_args = shlex.split(run, posix=os.name != 'nt')
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid arguments: {str(e)}")
+            return
+        python_path = self.get_venv_python()
+        store = TraceStore(script)
+        self.status_label.config(text=f"Tracing {os.path.basename(script)} {run}...")
+
+        def worker(task):
+            graph = ImportGraph(script, python_path)
+            output_path = store.output_path()
+            returncode, _output = run_process(task, trace_command(python_path, script, run_args, output_path),
+                                              cwd=os.path.dirname(os.path.abspath(script)))
+            if not os.path.isfile(output_path):
+                raise RuntimeError(f"The traced run exited with code {returncode} without writing a trace")
+            trace = store.merge(output_path, run_args, returncode)
+            return graph, store, trace
+
+        def progress(message, _fraction):
+            self.status_label.config(text=f"Tracing {os.path.basename(script)}...\n{message}")
+
+        def error(e):
+            self.status_label.config(text=f"Error tracing imports: {str(e)}")
+            messagebox.showerror("Error", f"Trace run failed: {str(e)}")
+
+        self.tasks.submit(worker, name='trace-run', on_done=lambda result: self.show_trace_report(*result),
+                          on_progress=progress, on_error=error,
+                          on_cancelled=lambda: self.status_label.config(text="Trace run cancelled"))
+
+    def trace_tcl_run(self):
+        from tcl_trim import TclTraceStore, prepare_tcl_trim, trace_command as tcl_trace_command
+
+        # Run the tkinter program and record which Tcl packages, encodings and locales it uses
+        script = self.script_path.get()
+        if not script or not os.path.isfile(script):
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        run = simpledialog.askstring(
+            "Trace Tk Run", "Arguments for this run (blank for none). Use the program as usual, then close it.\n"
+                            "Each run is merged with the earlier runs of this script.", parent=self.root)
+        if run is None:
+            return
+        try:
+            run_args = shlex.split(run, posix=os.name != 'nt')
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid arguments: {str(e)}")
+            return
+        options = self.collect_options()
+        python_path = self.get_venv_python()
+        store = TclTraceStore(script)
+        self.status_label.config(text=f"Tracing Tcl/Tk use of {os.path.basename(script)}...")
+
+        def worker(task):
+            output_path = store.output_path()
+            returncode, _output = run_process(task, tcl_trace_command(python_path, script, run_args, output_path),
+                                              cwd=os.path.dirname(os.path.abspath(script)))
+            if not os.path.isfile(output_path):
+                raise RuntimeError(f"The traced run exited with code {returncode} without writing a trace")
+            store.merge(output_path)
+            return prepare_tcl_trim(options, python_path, task.report_progress, measure=True)
+
+        def error(e):
+            self.status_label.config(text=f"Error tracing Tcl/Tk: {str(e)}")
+            messagebox.showerror("Error", f"Trace run failed: {str(e)}")
+
+        self.tasks.submit(worker, name='trace-tcl', on_done=self.show_tcl_trim_report, on_error=error,
+                          on_progress=lambda message, _fraction: self.status_label.config(text=message),
+                          on_cancelled=lambda: self.status_label.config(text="Trace run cancelled"))
+
+    def show_tcl_trim(self):
+        from tcl_trim import prepare_tcl_trim
+
+        if not self.script_path.get():
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        options = self.collect_options()
+        python_path = self.get_venv_python()
+
+        def worker(task):
+            return prepare_tcl_trim(options, python_path, task.report_progress, measure=True)
+
+        def error(e):
+            self.status_label.config(text="Tcl/Tk trimming failed")
+            messagebox.showerror("Tcl/Tk Trimming", str(e))
+
+        self.tasks.submit(worker, name='tcl-trim', on_done=self.show_tcl_trim_report, on_error=error,
+                          on_progress=lambda message, _fraction: self.status_label.config(text=message))
+
+    def show_tcl_trim_report(self, report):
+        from tcl_trim import TclTraceStore
+
+        lines = report.lines()
+        self.status_label.config(text=lines[0])
+        window = tk.Toplevel(self.root)
+        window.title("Tcl/Tk Trimming")
+        text = tk.Text(window, height=len(lines) + 1, width=100, wrap='word')
+        text.insert('1.0', '\n'.join(lines))
+        text.pack(fill='both', expand=True, padx=5, pady=5)
+
+        def clear_traces():
+            TclTraceStore(self.script_path.get()).clear()
+            self.status_label.config(text="Tcl/Tk trace runs cleared")
+            window.destroy()
+
+        ttk.Button(window, text="Clear Trace Runs", command=clear_traces).pack(pady=5)
+
+    def show_trace_report(self, graph, store, trace):
+        from import_tracer import data_files, prune_report
+
+        flags, before, after = prune_report(graph, trace)
+        failed = sum(1 for run in trace['runs'] if run['returncode'] != 0)
+        self.status_label.config(text=f"Merged {len(trace['runs'])} trace run(s); "
+                                      f"{len(flags)} module subtree(s) never imported")
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Trace of {os.path.basename(graph.script_path)}")
+        summary = (f"{len(trace['runs'])} run(s) merged, {len(trace['modules'])} modules imported"
+                   + (f" ({failed} run(s) exited with an error)" if failed else "") + "\n"
+                   f"Compiled modules: {before[0]} -> {after[0]} (-{before[0] - after[0]})\n"
+                   f"Module size: {before[1] / 1024:.0f} KB -> {after[1] / 1024:.0f} KB "
+                   f"(-{(before[1] - after[1]) / 1024:.0f} KB, ~{before[2] - after[2]:.0f}s less compiling)")
+        ttk.Label(window, text=summary, justify='left').pack(anchor='w', padx=5, pady=5)
+
+        ttk.Label(window, text="Never imported by a traced run:").pack(anchor='w', padx=5)
+        flags_text = tk.Text(window, height=8, width=80)
+        flags_text.insert('1.0', '\n'.join(flags) or "(every reachable module was used)")
+        flags_text.pack(fill='both', expand=True, padx=5)
+
+        files = data_files(trace, [os.path.dirname(graph.script_path)] + graph.env['site'])
+        ttk.Label(window, text=f"Data files read ({len(files)}):").pack(anchor='w', padx=5)
+        files_text = tk.Text(window, height=4, width=80)
+        files_text.insert('1.0', '\n'.join(files))
+        files_text.pack(fill='x', padx=5)
+
+        def apply_flags():
+            # The static suggestions still apply; traced nofollows come on top
+            combined = graph.suggested_flags()
+            combined.extend(flag for flag in flags if flag not in combined)
+            self.import_flags = combined
+            self.analyzed_imports_var.set(True)
+            self.status_label.config(text=f"Using {len(combined)} analyzed import flag(s)")
+            window.destroy()
+
+        def clear_traces():
+            store.clear()
+            self.status_label.config(text="Trace runs cleared")
+            window.destroy()
+
+        buttons = ttk.Frame(window)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Apply Flags", command=apply_flags).pack(side='left', padx=2)
+        ttk.Button(buttons, text="Clear Traces", command=clear_traces).pack(side='left', padx=2)
+
     def add_resources(self):
         files = filedialog.askopenfilenames(
             title="Select Resource Files",
@@ -478,6 +1118,48 @@ class Nuitkalicious:
         self.icon_path = None
         self.icon_label.config(text="No icon selected")
 
+    def browse_cache_shared_dir(self):
+        shared_dir = filedialog.askdirectory(title="Select Shared Build Cache Directory")
+        if shared_dir:
+            self.cache_shared_dir.set(shared_dir)
+
+    def load_project_file(self):
+        from project_config import ProjectError, load_project
+
+        project_file = filedialog.askopenfilename(
+            title="Load Project",
+            filetypes=(("Project files", "*.toml"), ("All files", "*.*"))
+        )
+        if not project_file:
+            return
+        try:
+            self.apply_options(load_project(project_file))
+        except ProjectError as e:
+            messagebox.showerror("Project Error", str(e))
+            return
+        self.status_label.config(text=f"Loaded project {os.path.basename(project_file)}")
+
+    def save_project_file(self):
+        from project_config import save_project
+
+        # Default to nuitkalicious.toml next to the script; pyproject.toml is updated in place
+        script = self.script_path.get()
+        project_file = filedialog.asksaveasfilename(
+            title="Save Project",
+            initialdir=os.path.dirname(script) if script else None,
+            initialfile='nuitkalicious.toml',
+            defaultextension='.toml',
+            filetypes=(("Project files", "*.toml"), ("All files", "*.*"))
+        )
+        if not project_file:
+            return
+        try:
+            save_project(project_file, self.collect_options())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Project Error", f"Could not save project: {str(e)}")
+            return
+        self.status_label.config(text=f"Saved project {os.path.basename(project_file)}")
+
     def handle_standalone_change(self):
         # Handle standalone checkbox changes
         if not self.standalone_var.get() and self.onefile_var.get():
@@ -502,83 +1184,108 @@ class Nuitkalicious:
             # as user might want standalone without onefile
 
     # Group 3: Nuitka Operations
-    def check_nuitka_installed(self, python_path):
-        # Check if Nuitka is installed in the virtual environment
-        try:
-            # First try pip list approach
-            cmd = f'"{python_path}" -m pip list'
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            
-            if 'nuitka' in result.stdout.lower():
-                # Extract version from pip list output
-                for line in result.stdout.split('\n'):
-                    if 'nuitka' in line.lower():
-                        version = line.split()[1]
-                        self.status_label.config(text=f"Found Nuitka {version}")
-                        self.uninstall_button.config(state='normal')
-                        return True
-            
-            # Fallback to direct module import check
-            result = subprocess.run(
-                [python_path, "-m", "nuitka", "--version"],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-            )
-            
-            if result.returncode == 0:
-                version = result.stdout.strip()
+    def current_venv(self):
+        # The selected venv directory, or None when building with the system Python
+        if self.use_venv_var.get() and self.venv_path.get():
+            return self.venv_path.get()
+        return None
+
+    def _probe_nuitka(self, task, python_path, venv_dir=None):
+        # Worker: return the Nuitka version installed for python_path, or None
+        if venv_dir:
+            # Cached until the venv's site-packages or pyvenv.cfg changes
+            info = self.venv_inventory.probe(venv_dir)
+            if info.error:
+                raise RuntimeError(info.error)
+            return info.nuitka_version or None
+        _python_version, nuitka_version, _plugins = probe_interpreter(python_path)
+        return nuitka_version or None
+
+    def _probe_versions(self, python_path, venv_dir=None):
+        from build_cache import probe_versions
+
+        # Worker: return (python_version, nuitka_version), using the inventory for venvs
+        if venv_dir:
+            info = self.venv_inventory.probe(venv_dir)
+            return info.python_version, info.nuitka_version
+        return probe_versions(python_path)
+
+    def check_nuitka_installed(self, python_path, on_result=None):
+        # Check if Nuitka is installed in the virtual environment (in the background)
+        # on_result receives True/False, or None if the check failed or was cancelled
+        self.status_label.config(text="Checking for Nuitka...")
+
+        def done(version):
+            if version:
                 self.status_label.config(text=f"Found Nuitka {version}")
                 self.uninstall_button.config(state='normal')
-                return True
-            
-            self.status_label.config(text="Nuitka not found in environment")
-            self.uninstall_button.config(state='disabled')
-            return False
-            
-        except Exception as e:
+            else:
+                self.status_label.config(text="Nuitka not found in environment")
+                self.uninstall_button.config(state='disabled')
+            if on_result:
+                on_result(bool(version))
+
+        def error(e):
             self.status_label.config(text=f"Error checking Nuitka: {str(e)}")
             self.uninstall_button.config(state='disabled')
-            return False
+            if on_result:
+                on_result(None)
+
+        def cancelled():
+            self.status_label.config(text="Nuitka check cancelled")
+            if on_result:
+                on_result(None)
+
+        return self.tasks.submit(self._probe_nuitka, python_path, self.current_venv(), name='check-nuitka',
+                                 on_done=done, on_error=error, on_cancelled=cancelled)
+
+    def install_nuitka(self, python_path, on_finished=None):
+        # Install Nuitka in the virtual environment (in the background)
+        # on_finished receives True once Nuitka is installed, False otherwise
+        venv_dir = self.current_venv()
+        if self.offline_install_var.get():
+            # No index access: Nuitka and its helpers come from the wheelhouse
+            args = self.get_wheelhouse().install_args(python_path)
+        else:
+            args = [python_path, '-m', 'pip', 'install', 'nuitka']
+        self.status_label.config(text="Installing Nuitka... Please wait while it is being installed.")
 
-    def install_nuitka(self, python_path):
-        # Install Nuitka in the virtual environment
-        try:
-            # Update status and force GUI refresh
-            self.status_label.config(text="Installing Nuitka... Please wait while it is being installed.")
-            self.root.update_idletasks()  # Force GUI update
-            
-            cmd = f'"{python_path}" -m pip install nuitka'
-            process = subprocess.run(
-                cmd, 
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            
-            if process.returncode == 0:
+        def worker(task):
+            return run_process(task, args)
+
+        def progress(message, _fraction):
+            self.status_label.config(text=f"Installing Nuitka...\n{message}")
+
+        def done(result):
+            returncode, output = result
+            if venv_dir:
+                self.venv_inventory.invalidate(venv_dir)
+            if returncode == 0:
                 self.status_label.config(text="Nuitka installed successfully!")
                 if hasattr(self, 'uninstall_button') and self.uninstall_button:
                     self.uninstall_button.config(state='normal')
                 messagebox.showinfo("Success", "Nuitka has been successfully installed!")
-                return True
             else:
-                error_msg = f"Failed to install Nuitka:\n{process.stderr}"
+                error_msg = f"Failed to install Nuitka:\n{output[-2000:]}"
                 self.status_label.config(text="Failed to install Nuitka")
                 messagebox.showerror("Installation Error", error_msg)
-                return False
-                
-        except Exception as e:
+            if on_finished:
+                on_finished(returncode == 0)
+
+        def error(e):
             error_msg = f"Error installing Nuitka: {str(e)}"
             self.status_label.config(text="Failed to install Nuitka")
             messagebox.showerror("Installation Error", error_msg)
-            return False
+            if on_finished:
+                on_finished(False)
+
+        def cancelled():
+            self.status_label.config(text="Nuitka installation cancelled")
+            if on_finished:
+                on_finished(False)
+
+        return self.tasks.submit(worker, name='install-nuitka', on_done=done, on_error=error,
+                                 on_progress=progress, on_cancelled=cancelled)
 
     def uninstall_nuitka(self):
         # Uninstall Nuitka from the virtual environment
@@ -588,220 +1295,296 @@ class Nuitkalicious:
         if not messagebox.askyesno("Confirm Uninstall", 
                                   "Are you sure you want to uninstall Nuitka from this virtual environment?"):
             return
-            
-        try:
-            python_path = self.get_venv_python()
-            self.status_label.config(text="Uninstalling Nuitka...")
-            
-            cmd = f'"{python_path}" -m pip uninstall nuitka -y'
-            process = subprocess.Popen(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-            
-            # Monitor the uninstallation progress
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.status_label.config(text=f"Uninstalling...\n{output.strip()}")
-                    self.root.update()
-            
-            if process.returncode == 0:
+
+        python_path = self.get_venv_python()
+        venv_dir = self.current_venv()
+        self.status_label.config(text="Uninstalling Nuitka...")
+
+        def worker(task):
+            return run_process(task, [python_path, '-m', 'pip', 'uninstall', 'nuitka', '-y'])
+
+        def progress(message, _fraction):
+            # Show the uninstallation progress
+            self.status_label.config(text=f"Uninstalling...\n{message}")
+
+        def done(result):
+            returncode, _output = result
+            if venv_dir:
+                self.venv_inventory.invalidate(venv_dir)
+            if returncode == 0:
                 self.status_label.config(text="Nuitka has been uninstalled")
                 self.uninstall_button.config(state='disabled')
                 messagebox.showinfo("Success", "Nuitka has been successfully uninstalled!")
             else:
                 self.status_label.config(text="Failed to uninstall Nuitka")
                 messagebox.showerror("Error", "Failed to uninstall Nuitka")
-                
-        except Exception as e:
+
+        def error(e):
             self.status_label.config(text=f"Error uninstalling Nuitka: {str(e)}")
             messagebox.showerror("Error", f"Error uninstalling Nuitka: {str(e)}")
 
-    # Group 4: Command Building and Execution
+        self.tasks.submit(worker, name='uninstall-nuitka', on_done=done, on_error=error,
+                          on_progress=progress,
+                          on_cancelled=lambda: self.status_label.config(text="Uninstall cancelled"))
 
-    def get_tcl_tk_paths(self):
-        """Get correct Tcl/Tk paths and version info"""
-        
-        tcl_lib = os.path.join(os.path.dirname(os.path.dirname(tk.__file__)), 'tcl')
-        tk_lib = os.path.join(os.path.dirname(os.path.dirname(tk.__file__)), 'tk')
-        
-        # Find exact Tcl version
-        tcl_version = tk.Tcl().eval('info patchlevel')
-        return tcl_lib, tk_lib, tcl_version
+    def get_wheelhouse(self):
+        from wheelhouse import Wheelhouse
 
-    def build_command(self):
-        cmd = []
-        
-        # Use venv Python if selected, otherwise system Python
-        if self.use_venv_var.get() and self.venv_path.get():
-            venv_python = self.get_venv_python()
-            # Add optimization level directly to python command
-            opt_level = int(self.optimization_level.get())
-            if opt_level >= 2:
-                cmd.append(f'"{venv_python}" -OO -m nuitka')
-            elif opt_level == 1:
-                cmd.append(f'"{venv_python}" -O -m nuitka')
-            else:
-                cmd.append(f'"{venv_python}" -m nuitka')
-        else:
-            # Use system Python when no venv is selected
-            opt_level = int(self.optimization_level.get())
-            if opt_level >= 2:
-                cmd.append('python -OO -m nuitka')
-            elif opt_level == 1:
-                cmd.append('python -O -m nuitka')
-            else:
-                cmd.append('python -m nuitka')
+        return Wheelhouse(self.wheelhouse_dir.get().strip() or None)
 
-        # Add automatic yes for downloads
-        cmd.append('--assume-yes-for-downloads')
+    def fill_wheelhouse(self):
+        from wheelhouse import find_requirements_file
 
-        # Get the directory of the selected Python script
-        script_path = self.script_path.get()
-        if script_path:
-            script_dir = os.path.dirname(script_path)
-            # Set output directory and working directory
-            cmd.append(f'--output-dir="{script_dir}"')
+        # Fetch wheels for Nuitka and the script's requirements.txt (the one step that needs the index)
+        wheelhouse = self.get_wheelhouse()
+        args = wheelhouse.fill_args(self.get_venv_python(),
+                                    requirements_file=find_requirements_file(self.script_path.get()))
+        self.status_label.config(text="Filling wheelhouse...")
 
-        # Add all the options
-        if self.onefile_var.get():
-            # For onefile, we need both flags
-            cmd.append('--standalone')
-            cmd.append('--onefile')
-        elif self.standalone_var.get():
-            cmd.append('--standalone')
-        if self.remove_output_var.get():
-            cmd.append('--remove-output')
-        if self.no_console_var.get():
-            # Updated console option for newer Nuitka versions
-            cmd.append('--windows-console-mode=disable')
-        if self.follow_imports_var.get():
-            cmd.append('--follow-imports')
-        if self.tkinter_var.get():
-            cmd.append('--enable-plugin=tk-inter')
-        if self.pyqt6_var.get():
-            cmd.append('--enable-plugin=pyqt6')
-        if self.lto_var.get():  # Updated LTO option to include value
-            cmd.append('--lto=yes')
-        if self.jobs_var.get():
-            cmd.append(f'--jobs={self.jobs_var.get()}')
-            
-        # Add icon both as Windows icon and as a data file
-        if self.icon_path:
-            icon_basename = os.path.basename(self.icon_path)
-            cmd.append(f'--windows-icon-from-ico="{self.icon_path}"')
-            cmd.append(f'--include-data-files="{self.icon_path}"="{icon_basename}"')
-            
-        # Add resource files to command with proper quoting
-        for res_file in self.resource_files:
-            target_path = os.path.basename(res_file)
-            if not res_file.lower().endswith('.ico'):  # Skip .ico files as they're handled above
-                cmd.append(f'--include-data-file="{res_file}"="{target_path}"')
-
-        # Add advanced options
-        # Compilation options
-        if self.compilation_vars['clang'].get():
-            cmd.append('--clang')
-        if self.compilation_vars['mingw64'].get():
-            cmd.append('--mingw64')
-        if self.compilation_vars['disable_console_ctrl_handler'].get():
-            cmd.append('--disable-console-ctrl-handler')
-        if self.compilation_vars['full_compat'].get():
-            cmd.append('--full-compat')
-        if self.compilation_vars['static_libpython'].get():
-            cmd.append('--static-libpython=yes')
-
-        # Module options
-        if self.module_vars['follow_stdlib'].get():
-            cmd.append('--follow-stdlib')
-        if self.module_vars['prefer_source'].get():
-            cmd.append('--prefer-source-code')
-        if self.module_vars['include_package_data'].get():
-            cmd.append('--include-package-data')
-        if self.module_vars['python_flag_nosite'].get():
-            cmd.append('--python-flag=nosite')
-        if self.module_vars['remove_embedded'].get():
-            cmd.append('--remove-embedded')
-
-        # Performance options
-        if self.perf_vars['disable_ccache'].get():
-            cmd.append('--disable-ccache')
-        if self.perf_vars['high_memory'].get():
-            cmd.append('--jobs=maximum')
-        if self.perf_vars['linux_onefile_icon'].get():
-            cmd.append('--linux-onefile-icon')
-        if self.perf_vars['macos_create_app_bundle'].get():
-            cmd.append('--macos-create-app-bundle')
-
-        # Debug options
-        if self.debug_vars['debug'].get():
-            cmd.append('--debug')
-        if self.debug_vars['unstriped'].get():
-            cmd.append('--unstriped')
-        if self.debug_vars['trace_execution'].get():
-            cmd.append('--trace-execution')
-        if self.debug_vars['disable_dll_depsubprocess_cache'].get():  # Updated to match the key name
-            cmd.append('--disable-dll-dependency-cache')
-        if self.debug_vars['experimental'].get():
-            cmd.append('--experimental')
-        if self.debug_vars['show_memory'].get():
-            cmd.append('--show-memory')
-        if self.debug_vars['show_progress'].get():
-            cmd.append('--show-progress')
-        if self.debug_vars['verbose'].get():
-            cmd.append('--verbose')
-
-        # Add Nuitka exclusion patterns to prevent it from being included in the build
-        cmd.append('--nofollow-import-to=nuitka')
-        cmd.append('--nofollow-import-to=ordered_set')
-        cmd.append('--nofollow-import-to=wheel')
-        cmd.append('--nofollow-import-to=pip')
-        cmd.append('--nofollow-import-to=setuptools')
-        cmd.append('--nofollow-import-to=distutils')
-        cmd.append('--nofollow-import-to=pkg_resources')
-        cmd.append('--nofollow-import-to=zstandard')
-        
-        # Add cleanup flags
-        cmd.append('--remove-output')
-        cmd.append('--clean-cache=all')
+        def worker(task):
+            return run_process(task, args)
 
-        # Include Tcl/Tk files only if Tkinter support is enabled
-        if self.tkinter_var.get():
-            tcl_lib, tk_lib, tcl_version = self.get_tcl_tk_paths()
-            
-            if os.path.exists(tcl_lib):
-                cmd.append(f'--include-package=tkinter')
-                cmd.append(f'--include-package=_tkinter')
-                cmd.append(f'--include-data-dir={tcl_lib}=tcl')
-                cmd.append(f'--include-data-dir={tk_lib}=tk')
-                
-                # Include specific version folders
-                tcl_version_dir = os.path.join(tcl_lib, f'tcl{tcl_version.rsplit(".", 1)[0]}')
-                tk_version_dir = os.path.join(tk_lib, f'tk{tcl_version.rsplit(".", 1)[0]}')
-                
-                if os.path.exists(tcl_version_dir):
-                    cmd.append(f'--include-data-dir={tcl_version_dir}=tcl{tcl_version.rsplit(".", 1)[0]}')
-                if os.path.exists(tk_version_dir):
-                    cmd.append(f'--include-data-dir={tk_version_dir}=tk{tcl_version.rsplit(".", 1)[0]}')
+        def done(result):
+            returncode, output = result
+            if returncode == 0:
+                self.status_label.config(
+                    text=f"Wheelhouse ready: {len(wheelhouse.wheels())} wheel(s) in {wheelhouse.root}")
+            else:
+                self.status_label.config(text="Failed to fill wheelhouse")
+                messagebox.showerror("Wheelhouse Error", f"Failed to fill wheelhouse:\n{output[-2000:]}")
+
+        self.tasks.submit(worker, name='fill-wheelhouse', on_done=done,
+                          on_progress=lambda message, _fraction: self.status_label.config(
+                              text=f"Filling wheelhouse...\n{message}"),
+                          on_error=lambda e: self.status_label.config(text=f"Error filling wheelhouse: {str(e)}"),
+                          on_cancelled=lambda: self.status_label.config(text="Wheelhouse fill cancelled"))
+
+    def create_pooled_venv(self):
+        from wheelhouse import find_requirements_file
+
+        # Clone a ready venv (Nuitka plus requirements) from the pool instead of building one
+        script = self.script_path.get()
+        parent = filedialog.askdirectory(title="Select Folder for the New .venv",
+                                         initialdir=os.path.dirname(script) if script else None)
+        if not parent:
+            return
+        dest = os.path.join(parent, '.venv')
+        if os.path.exists(dest):
+            messagebox.showwarning("venv Exists", f"{dest} already exists.")
+            return
+        wheelhouse = self.get_wheelhouse()
+        requirements_file = find_requirements_file(script)
+        self.status_label.config(text="Preparing venv from pool...")
 
-            # Add plugin options for tkinter
-            cmd.append('--enable-plugin=tk-inter')
+        def worker(task):
+            return self.venv_pool.checkout(dest, wheelhouse, lambda args: run_process(task, args),
+                                           base_python='python', requirements_file=requirements_file,
+                                           log=task.report_progress)
 
-            # Exclude unnecessary test modules
-            cmd.append('--nofollow-import-to=tkinter.test')
-            cmd.append('--nofollow-import-to=tkinter.test.support')
-            cmd.append('--nofollow-import-to=tkinter.test.widget_tests')
+        def done(venv_dir):
+            self.venv_path.set(venv_dir)
+            self.use_venv_var.set(True)
+            self.toggle_venv_controls()
+            self.status_label.config(text=f"Created {venv_dir} from the venv pool")
+
+        def error(e):
+            self.status_label.config(text="Failed to create venv from pool")
+            messagebox.showerror("venv Pool Error", str(e))
+
+        self.tasks.submit(worker, name='pooled-venv', on_done=done, on_error=error,
+                          on_progress=lambda message, _fraction: self.status_label.config(
+                              text=f"Preparing venv from pool...\n{message}"),
+                          on_cancelled=lambda: self.status_label.config(text="venv creation cancelled"))
+
+    def cancel_tasks(self):
+        """Cancel every running background task"""
+        running = self.tasks.running()
+        if not running:
+            self.status_label.config(text="Nothing to cancel")
+            return
+        self.tasks.cancel_all()
+        self.status_label.config(text=f"Cancelling {len(running)} task(s)...")
 
-        # Add the script path as the last argument with proper quoting
-        cmd.append(f'"{script_path}"')
+    # Group 4: Command Building and Execution
 
-        return cmd
+    def collect_options(self):
+        """Return the current settings as an option set (see nuitka_options)"""
+        def number(value, default):
+            try:
+                value = float(value)
+            except ValueError:
+                return default
+            return int(value) if value.is_integer() else value
+
+        return {
+            'script': self.script_path.get(),
+            'use_venv': self.use_venv_var.get(),
+            'venv': self.venv_path.get(),
+            'standalone': self.standalone_var.get(),
+            'onefile': self.onefile_var.get(),
+            'remove_output': self.remove_output_var.get(),
+            'no_console': self.no_console_var.get(),
+            'follow_imports': self.follow_imports_var.get(),
+            'lto': self.lto_var.get(),
+            'tkinter': self.tkinter_var.get(),
+            'pyqt6': self.pyqt6_var.get(),
+            'jobs': self.jobs_var.get(),
+            'icon': self.icon_path or '',
+            'resources': list(self.resource_files),
+            'onefile_startup': {
+                'extraction': self.onefile_extraction.get(),
+                'extract_dir': self.onefile_extract_dir.get().strip(),
+                'version': self.onefile_version.get().strip(),
+                'compression': self.onefile_compression.get(),
+            },
+            'tcl_trim': {
+                'enabled': self.tcl_trim_var.get(),
+                'encodings': self.tcl_trim_encodings.get().split(),
+                'locales': self.tcl_trim_locales.get().split(),
+            },
+            'resource_pack': {
+                'enabled': self.resource_pack_var.get(),
+                'compress': self.resource_compress_var.get(),
+            },
+            'optimization_level': int(self.optimization_level.get()),
+            'analyzed_imports': self.analyzed_imports_var.get(),
+            'import_flags': list(self.import_flags),
+            'plugins': list(self.extra_plugins),
+            'exclusions': list(self.exclusions),
+            'compilation_report': self.compilation_report_var.get(),
+            'compilation': {name: var.get() for name, var in self.compilation_vars.items()},
+            'module': {name: var.get() for name, var in self.module_vars.items()},
+            'performance': {name: var.get() for name, var in self.perf_vars.items()},
+            'debug': {name: var.get() for name, var in self.debug_vars.items()},
+            'hot_modules': {
+                'workload': self.hot_workload.get().strip(),
+                'top_n': int(number(self.hot_top_n.get(), 3)),
+                'repeat': int(number(self.hot_repeat.get(), 3)),
+            },
+            'ram_staging': {
+                'enabled': self.ram_staging_var.get(),
+                'dir': self.ram_staging_dir.get().strip(),
+                'reserve_mb': number(self.ram_reserve_mb.get(), 1024),
+            },
+            'metrics': {
+                'enabled': self.metrics_var.get(),
+                'interval': number(self.metrics_interval.get(), 0.5),
+                'json_dir': self.metrics_json_dir,
+                'textfile_dir': self.metrics_textfile_dir.get().strip(),
+            },
+            'benchmark': {
+                'startup_args': self.bench_startup_args.get().strip(),
+                'ready_pattern': self.bench_ready_pattern.get(),
+                'timeout': number(self.bench_timeout.get(), 30),
+                'repeat': int(number(self.bench_repeat.get(), 3)),
+                'command': self.bench_command.get().strip(),
+                'smoke_test': self.smoke_test_var.get(),
+                'startup_threshold_pct': number(self.startup_threshold.get(), 20),
+                'size_threshold_pct': number(self.size_threshold.get(), 10),
+            },
+            'pgo': {
+                'training': self.get_pgo_training(),
+                'timeout': number(self.pgo_timeout.get(), 120),
+                'repeat': int(number(self.pgo_repeat.get(), 3)),
+            },
+            'cache': {
+                'enabled': self.build_cache_var.get(),
+                'max_gb': number(self.cache_max_gb.get(), 10),
+                'shared_dir': self.cache_shared_dir.get().strip(),
+                'compiler_dir': self.compiler_cache_dir.get().strip(),
+                'limits_mb': {name: number(var.get(), 0) for name, var in self.compiler_cache_limits.items()},
+            },
+        }
+
+    def apply_options(self, options):
+        """Load an option set (e.g. from a project file) into the UI"""
+        self.script_path.set(options['script'])
+        self.venv_path.set(options['venv'])
+        self.use_venv_var.set(options['use_venv'])
+        self.standalone_var.set(options['standalone'])
+        self.onefile_var.set(options['onefile'])
+        self.remove_output_var.set(options['remove_output'])
+        self.no_console_var.set(options['no_console'])
+        self.follow_imports_var.set(options['follow_imports'])
+        self.lto_var.set(options['lto'])
+        self.tkinter_var.set(options['tkinter'])
+        self.pyqt6_var.set(options['pyqt6'])
+        self.jobs_var.set(str(options['jobs']))
+        self.optimization_level.set(str(options['optimization_level']))
+        self.analyzed_imports_var.set(options['analyzed_imports'])
+        self.import_flags = list(options['import_flags'])
+        self.extra_plugins = list(options['plugins'])
+        self.exclusions = list(options['exclusions'])
+        self.compilation_report_var.set(options['compilation_report'])
+
+        self.icon_path = options['icon'] or None
+        self.icon_label.config(text=os.path.basename(self.icon_path) if self.icon_path else "No icon selected")
+        self.resource_files = list(options['resources'])
+        self.resource_pack_var.set(options['resource_pack']['enabled'])
+        self.tcl_trim_var.set(options['tcl_trim']['enabled'])
+        self.tcl_trim_encodings.set(' '.join(options['tcl_trim']['encodings']))
+        self.tcl_trim_locales.set(' '.join(options['tcl_trim']['locales']))
+        self.onefile_extraction.set(options['onefile_startup']['extraction'])
+        self.onefile_extract_dir.set(options['onefile_startup']['extract_dir'])
+        self.onefile_version.set(options['onefile_startup']['version'])
+        self.onefile_compression.set(options['onefile_startup']['compression'])
+        self.resource_compress_var.set(options['resource_pack']['compress'])
+        self.resource_listbox.delete(0, 'end')
+        for file in self.resource_files:
+            self.resource_listbox.insert('end', os.path.basename(file))
+
+        for group, variables in (('compilation', self.compilation_vars), ('module', self.module_vars),
+                                 ('performance', self.perf_vars), ('debug', self.debug_vars)):
+            for name, var in variables.items():
+                var.set(options[group].get(name, False))
+
+        self.hot_workload.set(options['hot_modules']['workload'])
+        self.hot_top_n.set(str(options['hot_modules']['top_n']))
+        self.hot_repeat.set(str(options['hot_modules']['repeat']))
+        self.pgo_training = list(options['pgo']['training'])
+        if self.pgo_training_text is not None:
+            self.pgo_training_text.delete('1.0', 'end')
+            self.pgo_training_text.insert('1.0', '\n'.join(self.pgo_training))
+        self.pgo_timeout.set(str(options['pgo']['timeout']))
+        self.pgo_repeat.set(str(options['pgo']['repeat']))
+        self.ram_staging_var.set(options['ram_staging']['enabled'])
+        self.ram_staging_dir.set(options['ram_staging']['dir'])
+        self.ram_reserve_mb.set(str(options['ram_staging']['reserve_mb']))
+        metrics = options['metrics']
+        self.metrics_var.set(metrics['enabled'])
+        self.metrics_interval.set(str(metrics['interval']))
+        self.metrics_json_dir = metrics['json_dir']
+        self.metrics_textfile_dir.set(metrics['textfile_dir'])
+        benchmark = options['benchmark']
+        self.bench_startup_args.set(benchmark['startup_args'])
+        self.bench_ready_pattern.set(benchmark['ready_pattern'])
+        self.bench_command.set(benchmark['command'])
+        self.bench_timeout.set(str(benchmark['timeout']))
+        self.bench_repeat.set(str(benchmark['repeat']))
+        self.smoke_test_var.set(benchmark['smoke_test'])
+        self.startup_threshold.set(str(benchmark['startup_threshold_pct']))
+        self.size_threshold.set(str(benchmark['size_threshold_pct']))
+
+        cache = options['cache']
+        self.build_cache_var.set(cache['enabled'])
+        self.cache_max_gb.set(str(cache['max_gb']))
+        self.cache_shared_dir.set(cache['shared_dir'])
+        self.compiler_cache_dir.set(cache['compiler_dir'])
+        for name, var in self.compiler_cache_limits.items():
+            if name in cache['limits_mb']:
+                var.set(str(cache['limits_mb'][name]))
+
+        # Bring the dependent controls in line with the loaded values
+        self.handle_onefile_change()
+        self.toggle_venv_controls()
+
+    def build_command(self, script_path=None):
+        # Returns the argument list; use format_command() for a copyable command line
+        # script_path overrides the selected script (used by the build queue)
+        options = self.collect_options()
+        if script_path:
+            options['script'] = script_path
+        return build_nuitka_command(options)
 
     def compile(self):
         if self.use_venv_var.get() and not os.path.exists(self.venv_path.get()):
@@ -815,18 +1598,35 @@ class Nuitkalicious:
 
         # Reset button state
         self.open_exe_button.config(state='disabled')
+        self.compile_button.config(state='disabled')
         
-        # Check Nuitka installation
+        # Check Nuitka installation in the background, then carry on from the callback
         python_path = self.get_venv_python()
-        if not self.check_nuitka_installed(python_path):
+        self.check_nuitka_installed(
+            python_path, on_result=lambda found: self._compile_after_check(found, python_path))
+
+    def _compile_after_check(self, found, python_path):
+        if found is None:
+            # The check failed or was cancelled and the status already says so
+            self.compile_button.config(state='normal')
+            return
+
+        if not found:
             if self.use_venv_var.get():
                 # For venv, offer to install
                 if not messagebox.askyesno("Nuitka Not Found", 
                     "Nuitka is not installed in the selected virtual environment. Would you like to install it?"):
                     self.status_label.config(text="Compilation cancelled - Nuitka not installed")
+                    self.compile_button.config(state='normal')
                     return
-                if not self.install_nuitka(python_path):
-                    return
+
+                def installed(success):
+                    if success:
+                        self._prepare_compile()
+                    else:
+                        self.compile_button.config(state='normal')
+
+                self.install_nuitka(python_path, on_finished=installed)
             else:
                 # For system Python, just show error
                 messagebox.showerror("Nuitka Not Found", 
@@ -835,143 +1635,719 @@ class Nuitkalicious:
                     "1. Install Nuitka in your system Python using 'pip install nuitka'\n" +
                     "2. Use a virtual environment (recommended)")
                 self.status_label.config(text="Compilation cancelled - Nuitka not installed")
-                return
+                self.compile_button.config(state='normal')
+            return
+
+        self._prepare_compile()
+
+    def _prepare_compile(self):
+        from build_session import BuildSession, build_cache_for, cache_manager_for
 
         # Update status
         self.status_label.config(text="Starting compilation...")
-        
-        # Store the exe folder path
-        script_dir = os.path.dirname(self.script_path.get())
-        self.exe_folder = script_dir
-
-        # Build the command with additional flags to reduce false positives
-        cmd = self.build_command()
-        cmd.extend([
-            '--disable-ccache',    # Disable ccache to prevent some detection issues
-            '--remove-output',     # Clean up build artifacts
-            '--clean-cache=all'    # Clean Nuitka cache
-        ])
-        
-        command = ' '.join(cmd)
 
-        # Create activation command based on OS
-        if os.name == 'nt':  # Windows
-            activate_cmd = f"cd /d {self.venv_path.get()}\\Scripts && activate && "
-        else:  # Unix-like
-            activate_cmd = f"source {self.venv_path.get()}/bin/activate && "
+        # Snapshot everything the worker needs - workers never read Tk variables
+        options = self.collect_options()
+        self.exe_folder = os.path.dirname(options['script'])
+        session = BuildSession(options,
+                               build_cache=build_cache_for(options) if options['cache']['enabled'] else None,
+                               cache_manager=cache_manager_for(options),
+                               inventory=self.venv_inventory)
 
-        # Combine activation with the Nuitka command
-        full_command = f"{activate_cmd}{command}"
+        def worker(task):
+            return session.prepare(task.report_progress)
 
-        try:
-            if os.name == 'nt':  # Windows
-                # Create status flag file
-                status_file = os.path.join(os.environ['TEMP'], 'nuitka_status.txt')
-                if os.path.exists(status_file):
-                    os.remove(status_file)
-                    
-                batch_file = os.path.join(os.environ['TEMP'], 'nuitka_compile.bat')
-                with open(batch_file, 'w') as f:
-                    f.write('@echo off\n')
-                    
-                    # Only include venv activation if using venv
-                    if self.use_venv_var.get() and self.venv_path.get():
-                        f.write('echo Activating virtual environment...\n')
-                        f.write(f'cd /d "{self.venv_path.get()}\\Scripts"\n')
-                        f.write('call activate\n')
-                        
-                        # Add cleanup of Nuitka cache before compilation
-                        f.write('echo Cleaning Nuitka cache...\n')
-                        f.write('python -m nuitka --clean-cache=all\n')
-                        
-                        f.write('python -c "import sys; print(f\'(venv) Python version {sys.version.split()[0]} confirmed\')" \n')
-                        f.write('echo.\n')
-                    
-                    f.write('echo Running Nuitka compilation...\n')
-                    f.write(f'cd /d "{script_dir}"\n')
-                    f.write(f'{command}\n')
-                    
-                    # Add post-compilation cleanup
-                    f.write('echo Cleaning up build artifacts...\n')
-                    f.write('if exist build rmdir /s /q build\n')
-                    f.write('if exist *.build rmdir /s /q *.build\n')
-                    f.write('if exist __pycache__ rmdir /s /q __pycache__\n')
-                    
-                    f.write('if %ERRORLEVEL% EQU 0 (\n')
-                    f.write('    echo Compilation successful!\n')
-                    f.write(f'    echo SUCCESS > "{status_file}"\n')
-                    f.write('    timeout /t 2 >nul\n')
-                    f.write('    exit\n')
-                    f.write(') else (\n')
-                    f.write('    echo Compilation failed!\n')
-                    f.write(f'    echo FAILED > "{status_file}"\n')
-                    f.write('    pause\n')
-                    f.write(')\n')
-
-                # Run the batch file in a new terminal
-                subprocess.Popen(['start', 'cmd', '/c', batch_file], shell=True)
-
-                # Start monitoring the status file
-                self.monitor_compilation(status_file)
-
-            else:  # Unix-like systems
-                terminal_cmd = f'''
-                    gnome-terminal -- bash -c '{full_command}; 
-                    if [ $? -eq 0 ]; then 
-                        echo "Compilation successful!"; 
-                        sleep 2; 
-                    else 
-                        echo "Compilation failed!"; 
-                        read -p "Press Enter to continue..."; 
-                    fi'
-                '''
-                subprocess.Popen(['bash', '-c', terminal_cmd])
-
-            # Enable the open exe button after compilation
+        def error(e):
+            messagebox.showerror("Compilation Error", f"Error starting compilation: {str(e)}")
+            self.status_label.config(text="Compilation failed to start")
+            self.compile_button.config(state='normal')
+
+        def cancelled():
+            self.status_label.config(text="Compilation cancelled")
+            self.compile_button.config(state='normal')
+
+        self.tasks.submit(worker, name='prepare-build',
+                          on_done=lambda restored: self._launch_compile(session, restored),
+                          on_error=error, on_cancelled=cancelled,
+                          on_progress=lambda message, _fraction: self.status_label.config(text=message))
+
+    def _launch_compile(self, session, restored):
+        if restored:
+            self.status_label.config(
+                text=f"Restored unchanged build from cache in {session.elapsed:.1f}s ({session.cache_key[:12]})")
             self.open_exe_button.config(state='normal')
-            
-        except Exception as e:
+            self.compile_button.config(state='normal')
+            return
+
+        self.build_session = session
+        status = "Compiling..."
+        if session.warnings:
+            status += '\n' + '\n'.join(session.warnings)
+        self.status_label.config(text=status)
+
+        self.command_preview.delete('1.0', 'end')
+        self.append_build_log(f"$ {format_command(session.cmd)}\n\n")
+
+        def worker(task):
+            def on_output(stream, line):
+                if stream == 'stdout':
+                    task.report_progress(line)
+                else:
+                    task.report_progress(f"[{stream}] {line}")
+
+            task.on_cancel(session.cancel)
+            task.check_cancelled()
+            session.start(on_output)
+            return session.wait()
+
+        def done(result):
+            self.append_build_log(f"\nNuitka finished: {result.describe()}\n")
+            if result.success:
+                self.status_label.config(text=f"Compilation successful! ({result.describe()})")
+                self.open_exe_button.config(state='normal')
+            else:
+                self.status_label.config(text=f"Compilation failed! ({result.describe()})")
+                self.open_exe_button.config(state='disabled')
+            # Cache outputs and clean up build artifacts in the background
+            self.finish_build(result.success, result.describe())
+
+        def error(e):
             messagebox.showerror("Compilation Error", f"Error starting compilation: {str(e)}")
             self.status_label.config(text="Compilation failed to start")
+            self.finish_build(False)
+
+        def cancelled():
+            self.append_build_log("\nCompilation cancelled\n")
+            self.finish_build(False, 'cancelled')
+
+        self.tasks.submit(worker, name='compile', on_done=done, on_error=error,
+                          on_cancelled=cancelled,
+                          on_progress=lambda line, _fraction: self.append_build_log(line + '\n'))
+        if not self.build_progress_ticking:
+            self.build_progress_ticking = True
+            self._tick_build_progress()
+
+    def _tick_build_progress(self):
+        from build_history import format_duration
+
+        # Runs every half second while a build is running; predictions come from the build history
+        session = self.build_session
+        if session is None or (session.runner is not None and session.runner.result is not None):
+            self.build_progress_ticking = False
+            self.build_progress.stop()
+            self.build_progress.config(mode='determinate', value=0)
+            self.build_eta_label.config(text="")
+            return
+        fraction, remaining, label, slow = session.progress()
+        elapsed = session.tracker.elapsed() if session.tracker else 0.0
+        text = f"{label}: {format_duration(elapsed)} elapsed"
+        if fraction is None:
+            # No earlier build to compare with: just show that it is alive
+            if str(self.build_progress.cget('mode')) != 'indeterminate':
+                self.build_progress.config(mode='indeterminate')
+                self.build_progress.start(20)
+            text += " (no build history yet for an estimate)"
+        else:
+            self.build_progress.config(mode='determinate', value=fraction)
+            text += f", about {format_duration(remaining)} left"
+        if slow:
+            text += " - slower than usual for this configuration"
+        if session.sampler is not None:
+            series = session.sampler.snapshot()
+            if series:
+                _seconds, rss, cores, count = series[-1]
+                text += f"\n{rss / 1024 ** 2:.0f} MB, {cores:.1f} cores, {count} processes"
+            self.draw_metrics_chart(series)
+        self.build_eta_label.config(text=text)
+        self.root.after(500, self._tick_build_progress)
+
+    def draw_metrics_chart(self, series):
+        # Memory (blue) and CPU cores (orange), each scaled to its own peak
+        canvas = self.metrics_chart
+        canvas.delete('all')
+        if len(series) < 2:
+            return
+        width, height = canvas.winfo_width(), int(canvas.cget('height'))
+        duration = series[-1][0] or 1.0
+        for index, color in ((1, '#3070c0'), (2, '#e08020')):
+            peak = max(point[index] for point in series) or 1
+            coords = []
+            for point in series:
+                coords += [point[0] / duration * (width - 2) + 1, height - 2 - point[index] / peak * (height - 4)]
+            canvas.create_line(*coords, fill=color, width=1)
+
+    def show_compilation_report(self):
+        from build_history import format_duration
+        from compilation_report import ReportError, load_summary, nofollow_flags
+
+        script = self.script_path.get()
+        if not script:
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        try:
+            modules, info = load_summary(script)
+        except ReportError as e:
+            messagebox.showerror("Compilation Report", str(e))
+            return
+        modules.sort(key=lambda module: module.total_seconds, reverse=True)
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Compilation Report of {os.path.basename(script)}")
+        c_compile = info.get('c_compile_seconds')
+        ttk.Label(window, text=f"{len(modules)} modules"
+                               + (f", C compile {format_duration(c_compile)} shared out by C size" if c_compile else "")
+                               + ". Click a heading to sort.").pack(anchor='w', padx=5, pady=5)
+
+        def kilobytes(module):
+            return None if module.c_bytes is None else module.c_bytes / 1024
+
+        columns = {
+            'module': ("Module", 220, lambda m: m.name),
+            'kind': ("Kind", 110, lambda m: m.kind),
+            'python': ("Python (s)", 80, lambda m: m.python_seconds),
+            'csize': ("C (KB)", 70, kilobytes),
+            'ccompile': ("C Compile (s, est.)", 110, lambda m: m.c_seconds),
+            'total': ("Total (s)", 70, lambda m: m.total_seconds),
+            'reason': ("Included Because", 260, lambda m: m.inclusion()),
+        }
+        tree = ttk.Treeview(window, columns=list(columns), show='headings', height=min(len(modules), 20))
+        for index, module in enumerate(modules):
+            values = [column[2](module) for column in columns.values()]
+            tree.insert('', 'end', iid=str(index),
+                        values=['' if value is None else f"{value:.2f}" if isinstance(value, float) else value
+                                for value in values])
+        self._sortable_headings(tree, columns, modules, ('module', 'kind', 'reason'))
+        tree.pack(fill='both', expand=True, padx=5)
+
+        def selected():
+            return [modules[int(iid)] for iid in tree.selection()]
+
+        def dont_follow():
+            names = [module.name for module in selected()]
+            if not names:
+                return
+            self.import_flags = nofollow_flags(self.import_flags, self.analyzed_imports_var.get(), names)
+            self.analyzed_imports_var.set(True)
+            self.status_label.config(text=f"Not following {', '.join(names)} in the next build")
+
+        def enable_plugin():
+            plugins = sorted({module.plugin() for module in selected()} - {None})
+            if not plugins:
+                messagebox.showinfo("Compilation Report", "No Nuitka plugin is known for the selected modules")
+                return
+            for plugin in plugins:
+                if plugin == 'tk-inter':
+                    self.tkinter_var.set(True)
+                elif plugin == 'pyqt6':
+                    self.pyqt6_var.set(True)
+                elif plugin not in self.extra_plugins:
+                    self.extra_plugins.append(plugin)
+            self.status_label.config(text=f"Enabled plugin(s): {', '.join(plugins)}")
+
+        buttons = ttk.Frame(window)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Don't Follow Selected", command=dont_follow).pack(side='left', padx=2)
+        ttk.Button(buttons, text="Enable Plugin For Selected", command=enable_plugin).pack(side='left', padx=2)
+
+    def compare_builds(self):
+        from build_manifest import ManifestDiff, ManifestStore, describe_entry
+
+        script = self.script_path.get()
+        if not script:
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        store = ManifestStore(script)
+        entries = store.entries()
+        if len(entries) < 2:
+            self.status_label.config(text="Compare needs two successful builds of this script")
+            return
 
-    def cleanup_build_artifacts(self):
-        """Clean up build artifacts after compilation"""
-        if self.exe_folder:
+        window = tk.Toplevel(self.root)
+        window.title(f"Compare Builds of {os.path.basename(script)}")
+        labels = [describe_entry(entry) for entry in entries]
+        picks = ttk.Frame(window)
+        picks.pack(fill='x', padx=5, pady=5)
+        old_var = tk.StringVar(value=labels[1])
+        new_var = tk.StringVar(value=labels[0])
+        for text, variable in (("From:", old_var), ("To:", new_var)):
+            ttk.Label(picks, text=text).pack(side='left')
+            ttk.Combobox(picks, textvariable=variable, values=labels, state='readonly', width=45).pack(
+                side='left', padx=(2, 8))
+        output = scrolledtext.ScrolledText(window, height=30, width=110)
+
+        def compare():
             try:
-                # Clean up common build artifacts
-                artifacts = ['build', '*.build', '__pycache__']
-                for artifact in artifacts:
-                    artifact_path = os.path.join(self.exe_folder, artifact)
-                    if '*' in artifact:
-                        # Handle wildcard patterns
-                        import glob
-                        for path in glob.glob(artifact_path):
-                            if os.path.isdir(path):
-                                import shutil
-                                shutil.rmtree(path)
-                    else:
-                        if os.path.exists(artifact_path):
-                            import shutil
-                            shutil.rmtree(artifact_path)
-                
-                # Clean Nuitka cache
-                python_path = self.get_venv_python()
-                subprocess.run([python_path, '-m', 'nuitka', '--clean-cache=all'], 
-                             capture_output=True, text=True)
-                
-                self.status_label.config(text="Build artifacts cleaned up")
-                return True
-                
-            except Exception as e:
-                self.status_label.config(text=f"Error cleaning up: {str(e)}")
-                return False
-        return False
+                old = store.load(entries[labels.index(old_var.get())]['id'])
+                new = store.load(entries[labels.index(new_var.get())]['id'])
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Compare Builds", f"Could not read the build manifest: {str(e)}")
+                return
+            output.delete('1.0', 'end')
+            output.insert('1.0', '\n'.join(ManifestDiff(old, new).lines(limit=50)))
+
+        ttk.Button(picks, text="Compare", command=compare).pack(side='left')
+        output.pack(fill='both', expand=True, padx=5, pady=5)
+        compare()
+
+    def show_build_history(self):
+        from build_history import BuildHistory, PHASE_LABELS, format_duration
+
+        script = self.script_path.get()
+        try:
+            builds = BuildHistory().recent(script or None)
+        except Exception as e:
+            messagebox.showerror("Build History", f"Could not read the build history: {str(e)}")
+            return
+        if not builds:
+            self.status_label.config(text="No builds recorded yet")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Build History of {os.path.basename(script)}" if script else "Build History")
+        phases = list(PHASE_LABELS)
+        columns = ('started', 'status', 'elapsed', 'size', 'hits') + tuple(phases)
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=min(len(builds), 16))
+        for column, heading, width in (('started', 'Started', 130), ('status', 'Status', 80),
+                                       ('elapsed', 'Total', 60), ('size', 'Size (MB)', 70),
+                                       ('hits', 'Cache Hits', 70)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor='w')
+        for phase in phases:
+            tree.heading(phase, text=PHASE_LABELS[phase])
+            tree.column(phase, width=90, anchor='e')
+        for build in builds:
+            if build['cancelled']:
+                status = 'cancelled'
+            else:
+                status = 'ok' if build['returncode'] == 0 else f"exit {build['returncode']}"
+            size = f"{build['output_size'] / 1024 ** 2:.1f}" if build['output_size'] else ''
+            tree.insert('', 'end', values=(
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(build['started'])), status,
+                format_duration(build['elapsed']), size,
+                '' if build['cache_hits'] is None else build['cache_hits'],
+                *(format_duration(build['phases'][phase]) if phase in build['phases'] else ''
+                  for phase in phases)))
+        tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+    def get_pgo_training(self):
+        # The text box only exists once the Advanced tab has been opened
+        if self.pgo_training_text is not None:
+            self.pgo_training = [line.strip() for line in self.pgo_training_text.get('1.0', 'end').splitlines()
+                                 if line.strip()]
+        return list(self.pgo_training)
+
+    def build_with_pgo(self):
+        from build_session import cache_manager_for
+        from pgo import PgoCancelled, PgoError, PgoPipeline
+
+        # Baseline, instrumented build, training runs, optimized build, then a timing comparison
+        if not self.script_path.get():
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        options = self.collect_options()
+        try:
+            pipeline = PgoPipeline(options, cache_manager=cache_manager_for(options),
+                                   inventory=self.venv_inventory)
+        except (PgoError, ValueError) as e:
+            messagebox.showerror("PGO Error", str(e))
+            return
+        self.compile_button.config(state='disabled')
+        self.status_label.config(text="PGO: starting...")
+        self.append_build_log(f"\nProfile-guided build of {os.path.basename(options['script'])}\n")
+
+        def worker(task):
+            def on_output(stream, line):
+                task.report_progress(line if stream == 'stdout' else f"[{stream}] {line}")
+
+            task.on_cancel(pipeline.cancel)
+            try:
+                return pipeline.run(task.report_progress, on_output)
+            except PgoCancelled:
+                task.check_cancelled()
+                raise
+
+        def progress(line, _fraction):
+            self.append_build_log(line + '\n')
+            if line.startswith('PGO: '):
+                self.status_label.config(text=line)
+
+        def done(report):
+            self.compile_button.config(state='normal')
+            self.open_exe_button.config(state='normal')
+            self.exe_folder = os.path.dirname(report.executable)
+            self.append_build_log('\n'.join(report.lines()) + '\n')
+            speedup = f"{report.speedup:.2f}x faster" if report.speedup else "no timing comparison"
+            self.status_label.config(text=f"PGO build finished: {speedup}, "
+                                          f"{report.extra_build_seconds:.0f}s extra build time")
+            messagebox.showinfo("PGO Build", '\n'.join(report.lines()))
+
+        def error(e):
+            self.compile_button.config(state='normal')
+            self.status_label.config(text="PGO build failed")
+            messagebox.showerror("PGO Error", str(e))
+
+        def cancelled():
+            self.compile_button.config(state='normal')
+            self.status_label.config(text="PGO build cancelled")
+
+        self.tasks.submit(worker, name='pgo-build', on_done=done, on_error=error,
+                          on_progress=progress, on_cancelled=cancelled)
+
+    def accelerate_hot_modules(self):
+        from build_session import cache_manager_for
+        from hot_modules import HotModuleAccelerator, HotModuleCancelled
+
+        # Profile the workload, compile the hottest project modules in place and time the result
+        if not self.script_path.get():
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        options = self.collect_options()
+        try:
+            accelerator = HotModuleAccelerator(options, cache_manager=cache_manager_for(options),
+                                               inventory=self.venv_inventory)
+        except ValueError as e:
+            messagebox.showerror("Hot-Module Error", f"Invalid workload arguments: {str(e)}")
+            return
+        self.status_label.config(text="Hot modules: starting...")
+
+        def worker(task):
+            def on_output(stream, line):
+                task.report_progress(line if stream == 'stdout' else f"[{stream}] {line}")
+
+            task.on_cancel(accelerator.cancel)
+            try:
+                return accelerator.run(task.report_progress, on_output)
+            except HotModuleCancelled:
+                task.check_cancelled()
+                raise
+
+        def progress(line, _fraction):
+            self.append_build_log(line + '\n')
+            if line.startswith('Hot modules: '):
+                self.status_label.config(text=line)
+
+        def done(report):
+            lines = report.lines(accelerator.project_dir)
+            self.append_build_log('\n'.join(lines) + '\n')
+            self.status_label.config(text=f"Compiled {len(report.compiled)} hot module(s): "
+                                          f"{report.speedup:.2f}x on the workload")
+            messagebox.showinfo("Hot-Module Accelerator", '\n'.join(lines))
+
+        def error(e):
+            self.status_label.config(text="Hot-module acceleration failed")
+            messagebox.showerror("Hot-Module Error", str(e))
+
+        self.tasks.submit(worker, name='hot-modules', on_done=done, on_error=error, on_progress=progress,
+                          on_cancelled=lambda: self.status_label.config(text="Hot-module acceleration cancelled"))
+
+    def remove_hot_modules(self):
+        from hot_modules import HotModuleAccelerator
+
+        if not self.script_path.get():
+            return
+        try:
+            removed = HotModuleAccelerator(self.collect_options()).remove()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Hot-Module Error", f"Could not remove compiled modules: {str(e)}")
+            return
+        self.status_label.config(text=f"Removed {len(removed)} compiled module(s); the project runs from source")
+
+    def accept_smoke_baseline(self):
+        from smoke_benchmark import BaselineStore
+
+        # Compare future builds with the last smoke-tested one, e.g. after an intended change
+        if not self.script_path.get():
+            return
+        accepted = BaselineStore(self.script_path.get()).accept_last()
+        if accepted is None:
+            self.status_label.config(text="No smoke-tested build to accept yet")
+            return
+        self.status_label.config(text=f"Baseline set: {accepted['metrics']['warm_start'] * 1000:.0f} ms startup, "
+                                      f"{accepted['metrics']['size'] / 1024 ** 2:.1f} MB")
+
+    def explore_option_matrix(self):
+        from option_matrix import AXES, describe_values
+
+        # Pick the options to vary; every combination is built on top of the current settings
+        if not self.script_path.get():
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        if self.use_venv_var.get() and not os.path.exists(self.venv_path.get()):
+            messagebox.showwarning("Virtual Environment Required",
+                "Please select a valid virtual environment directory.")
+            return
+        options = self.collect_options()
+
+        window = tk.Toplevel(self.root)
+        window.title("Explore Option Matrix")
+        ttk.Label(window, text="Vary:").pack(anchor='w', padx=5, pady=(5, 0))
+        axis_vars = {axis: tk.BooleanVar(value=axis in ('lto', 'mode')) for axis in AXES}
+        count_label = ttk.Label(window)
+
+        def update_count(*_args):
+            count = 1
+            for axis, var in axis_vars.items():
+                if var.get():
+                    count *= len(AXES[axis])
+            count_label.config(text=f"{count} configuration(s) to build")
+
+        for axis, var in axis_vars.items():
+            values = ' / '.join(describe_values({axis: value}) for value in AXES[axis])
+            ttk.Checkbutton(window, text=f"{axis.replace('_', ' ').title()} ({values})", variable=var,
+                            command=update_count).pack(anchor='w', padx=10)
+        update_count()
+        count_label.pack(anchor='w', padx=5, pady=5)
+
+        row = ttk.Frame(window)
+        row.pack(fill='x', padx=5)
+        ttk.Label(row, text="Parallel builds:").pack(side='left')
+        parallel = tk.StringVar(value=str(self.build_queue.max_parallel))
+        ttk.Spinbox(row, from_=1, to=os.cpu_count() or 1, width=4, textvariable=parallel).pack(side='left', padx=5)
+
+        def start():
+            axes = [axis for axis, var in axis_vars.items() if var.get()]
+            if not axes:
+                messagebox.showwarning("Nothing To Vary", "Tick at least one option to vary.", parent=window)
+                return
+            try:
+                max_parallel = max(1, int(parallel.get()))
+            except ValueError:
+                max_parallel = None
+            window.destroy()
+            self.run_option_matrix(options, axes, max_parallel)
+
+        ttk.Button(window, text="Start", command=start).pack(pady=5)
+
+    def benchmark_onefile(self):
+        from onefile_benchmark import OnefileBenchmark
+
+        # Build the program once per unpacking mode and compression level, then time each
+        if not self.script_path.get():
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        if self.use_venv_var.get() and not os.path.exists(self.venv_path.get()):
+            messagebox.showwarning("Virtual Environment Required",
+                "Please select a valid virtual environment directory.")
+            return
+        count = len(ONEFILE_EXTRACTION) * len(ONEFILE_COMPRESSION)
+        if not messagebox.askyesno("Benchmark Onefile Startup",
+                                   f"Build the program as onefile {count} times (each unpacking mode with each "
+                                   f"compression level) and measure cold and warm start-up of each?"):
+            return
+        options = self.collect_options()
+        self.run_option_matrix(options, ['onefile_extraction', 'onefile_compression'], None,
+                               make_matrix=lambda env: OnefileBenchmark(options, env=env))
+
+    def run_option_matrix(self, options, axes, max_parallel, make_matrix=None):
+        from build_session import cache_manager_for
+        from option_matrix import MatrixCancelled, OptionMatrix
+
+        python_path = self.get_venv_python()
+        venv_dir = options['venv'] if options['use_venv'] and options['venv'] else None
+        cache_manager = cache_manager_for(options)
+        self.status_label.config(text="Matrix: starting...")
+        self.append_build_log(f"\nOption matrix for {os.path.basename(options['script'])}: varying "
+                              f"{', '.join(axes)}\n")
+
+        def worker(task):
+            # Every configuration shares the venv, so one probe picks the cache scope
+            _python_version, nuitka_version = self._probe_versions(python_path, venv_dir)
+            env = venv_environment(venv_dir)
+            env.update(cache_manager.environment(cache_manager.scope_for(nuitka_version, venv_dir)))
+            if make_matrix:
+                matrix = make_matrix(env)
+            else:
+                matrix = OptionMatrix(options, axes, max_parallel=max_parallel, env=env)
+            task.on_cancel(matrix.cancel)
+            try:
+                return matrix.run(task.report_progress)
+            except MatrixCancelled:
+                task.check_cancelled()
+                raise
+
+        def progress(line, _fraction):
+            self.append_build_log(line + '\n')
+            self.status_label.config(text=line)
+
+        def done(results):
+            best = sum(1 for result in results if result.pareto)
+            self.status_label.config(text=f"Explored {len(results)} configuration(s); {best} on the Pareto front")
+            self.show_matrix_results(results)
+
+        def error(e):
+            self.status_label.config(text="Option matrix failed")
+            messagebox.showerror("Option Matrix Error", str(e))
+
+        self.tasks.submit(worker, name='option-matrix', on_done=done, on_error=error, on_progress=progress,
+                          on_cancelled=lambda: self.status_label.config(text="Option matrix cancelled"))
+
+    @staticmethod
+    def _sortable_headings(tree, columns, items, text_columns):
+        """Sort tree rows (iids are indexes into items) when a heading is clicked
+
+        columns maps a column to (heading, width, value of an item); None values sort last.
+        """
+        sort_state = {}
+
+        def sort_by(name):
+            descending = sort_state[name] = not sort_state.get(name, True)
+            key = columns[name][2]
+            measured = [i for i in range(len(items)) if key(items[i]) is not None]
+            missing = [i for i in range(len(items)) if key(items[i]) is None]
+            measured.sort(key=lambda i: key(items[i]), reverse=descending)
+            for position, i in enumerate(measured + missing):
+                tree.move(str(i), '', position)
+
+        for name, (heading, width, _key) in columns.items():
+            tree.heading(name, text=heading, command=lambda name=name: sort_by(name))
+            tree.column(name, width=width, anchor='w' if name in text_columns else 'e')
+
+    def show_matrix_results(self, results):
+        window = tk.Toplevel(self.root)
+        window.title("Option Matrix Results")
+        ttk.Label(window, text="Highlighted rows are Pareto-optimal: nothing else beats them on every number. "
+                               "Click a heading to sort.").pack(anchor='w', padx=5, pady=5)
+
+        def number(value, scale):
+            return None if value is None else value * scale
+
+        # (heading, width, value of a result; None sorts last and shows blank)
+        columns = {
+            'config': ("Configuration", 220, lambda r: r.label),
+            'size': ("Size (MB)", 80, lambda r: number(r.metrics and r.metrics.size, 1 / 1024 ** 2)),
+            'cold': ("Cold (ms)", 80, lambda r: number(r.metrics and r.metrics.cold_start, 1000)),
+            'warm': ("Warm (ms)", 80, lambda r: number(r.metrics and r.metrics.warm_start, 1000)),
+            'rss': ("Peak RSS (MB)", 90, lambda r: number(r.metrics and r.metrics.peak_rss, 1 / 1024 ** 2)),
+            'bench': ("Benchmark (s)", 90, lambda r: r.metrics and r.metrics.benchmark),
+            'build': ("Build (s)", 70, lambda r: r.build_seconds),
+            'error': ("Error", 200, lambda r: r.error or ''),
+        }
+        if any(result.metrics and result.metrics.unpacked is not None for result in results):
+            # Onefile benchmarks: what unpacking leaves on disk once the program exits
+            columns['unpacked'] = ("Unpacked (MB)", 90,
+                                   lambda r: number(r.metrics and r.metrics.unpacked, 1 / 1024 ** 2))
+            columns['error'] = columns.pop('error')
+        tree = ttk.Treeview(window, columns=list(columns), show='headings', height=min(len(results), 16))
+        tree.tag_configure('pareto', background='#d4f0d4')
+
+        def shown(value):
+            if value is None:
+                return ''
+            return f"{value:.1f}" if isinstance(value, float) else value
+
+        for index, result in enumerate(results):
+            tree.insert('', 'end', iid=str(index), tags=('pareto',) if result.pareto else (),
+                        values=[shown(column[2](result)) for column in columns.values()])
+        self._sortable_headings(tree, columns, results, ('config', 'error'))
+        tree.pack(fill='both', expand=True, padx=5)
+
+        def apply_selected():
+            selection = tree.selection()
+            if not selection:
+                return
+            result = results[int(selection[0])]
+            self.apply_options(result.options)
+            self.status_label.config(text=f"Applied {result.label}")
+            window.destroy()
+
+        ttk.Button(window, text="Apply Selected", command=apply_selected).pack(pady=5)
+
+    def get_cache_manager(self):
+        """Create the compiler cache manager from the current settings"""
+        from build_session import cache_manager_for
+
+        return cache_manager_for(self.collect_options())
+
+    def finish_build(self, success, detail=None):
+        """Cache the outputs, collect cache statistics and clean up once a build ends"""
+        from benchmark import kill_tree
+        from smoke_benchmark import SmokeTestError, run_smoke_test
+
+        session, self.build_session = self.build_session, None
+        if detail == 'cancelled':
+            headline = "Compilation cancelled"
+        else:
+            headline = "Compilation successful!" if success else "Compilation failed!"
+            if detail:
+                headline = f"{headline} ({detail})"
+
+        def worker(task):
+            if session is None:
+                return [], None
+            notes = session.finish(success, lambda message: task.report_progress(f"{headline}\n{message}"),
+                                   task.check_cancelled)
+            if not success or not session.options['benchmark']['smoke_test']:
+                return notes, None
+            # Check that the program starts and has not grown slower or bigger
+            task.report_progress(f"{headline}\nSmoke test: running the program...")
+            processes = []
+            # The whole tree: a onefile binary forks the real program
+            task.on_cancel(lambda: processes and kill_tree(processes[-1]))
+            try:
+                smoke = run_smoke_test(session.options, session.output_dir, session.cmd,
+                                       check_cancelled=task.check_cancelled, on_start=processes.append)
+            except SmokeTestError as e:
+                return notes + [str(e)], None
+            return notes, smoke
+
+        def done(outcome):
+            notes, smoke = outcome
+            lines = [headline] + (smoke.lines() if smoke else []) + notes
+            self.status_label.config(text='\n'.join(lines))
+            self.compile_button.config(state='normal')
+            if smoke:
+                self.append_build_log('\n'.join(smoke.lines()) + '\n')
+                if smoke.failed or smoke.regressed:
+                    messagebox.showwarning("Build Regression" if smoke.regressed else "Smoke Test Failed",
+                                           '\n'.join(smoke.lines()))
+
+        def error(e):
+            self.status_label.config(text=f"{headline}\nError cleaning up: {str(e)}")
+            self.compile_button.config(state='normal')
+
+        self.tasks.submit(worker, name='finish-build', on_done=done, on_error=error,
+                          on_progress=lambda message, _fraction: self.status_label.config(text=message),
+                          on_cancelled=lambda: self.compile_button.config(state='normal'))
+
+    def invalidate_compiler_caches(self, which):
+        """Clear the compiler caches for this venv, this Nuitka version or everything"""
+        from cache_manager import SYSTEM_SCOPE
+
+        labels = {'venv': 'this virtual environment',
+                  'nuitka': "this environment's Nuitka version",
+                  'all': 'all environments'}
+        if not messagebox.askyesno("Clear Caches", f"Clear the compiler caches for {labels[which]}?"):
+            return
+        cache_manager = self.get_cache_manager()
+        venv_dir = self.venv_path.get() if self.use_venv_var.get() and self.venv_path.get() else None
+        python_path = self.get_venv_python()
+
+        def worker(task):
+            if which == 'venv':
+                # An empty venv path means the system interpreter's scope
+                return cache_manager.invalidate(venv_path=venv_dir or SYSTEM_SCOPE)
+            if which == 'nuitka':
+                _python_version, nuitka_version = self._probe_versions(python_path, venv_dir)
+                return cache_manager.invalidate(nuitka_version=nuitka_version or 'unknown')
+            return cache_manager.invalidate()
+
+        self.status_label.config(text="Clearing compiler caches...")
+        self.tasks.submit(
+            worker, name='invalidate-caches',
+            on_done=lambda removed: self.status_label.config(text=f"Cleared {len(removed)} cache scope(s)"),
+            on_error=lambda e: self.status_label.config(text=f"Error clearing caches: {str(e)}"))
 
     # Group 5: Utility Methods
+    def on_close(self):
+        """Stop background tasks and close the window"""
+        self.build_queue.cancel_all()
+        self.tasks.shutdown()
+        self.root.destroy()
+
     def get_venv_python(self):
         # Get the python executable path for the selected venv
         if self.use_venv_var.get() and self.venv_path.get():
-            return os.path.join(self.venv_path.get(), 'Scripts', 'python.exe')
+            return venv_python(self.venv_path.get())
         return 'python'
 
     def run_in_venv(self, command):
@@ -993,7 +2369,7 @@ class Nuitkalicious:
         try:
             # Build the command
             cmd = self.build_command()
-            command = ' '.join(cmd)
+            command = format_command(cmd)
             
             # Copy to clipboard
             self.root.clipboard_clear()
@@ -1011,6 +2387,88 @@ class Nuitkalicious:
             self.status_label.config(text="Failed to create command")
             messagebox.showerror("Error", error_msg)
 
+    def analyze_distribution(self):
+        from dist_analyzer import analyze_build
+
+        # Walking and hashing a big .dist folder takes seconds, so it runs as a task
+        if not self.script_path.get():
+            messagebox.showerror("Error", "Please select a Python file first")
+            return
+        options = self.collect_options()
+
+        def worker(task):
+            return analyze_build(options, progress=task.report_progress, check_cancelled=task.check_cancelled)
+
+        def error(e):
+            self.status_label.config(text="Distribution analysis failed")
+            messagebox.showerror("Distribution Analyzer", str(e))
+
+        self.tasks.submit(worker, name='analyze-dist', on_done=self.show_dist_report, on_error=error,
+                          on_cancelled=lambda: self.status_label.config(text="Distribution analysis cancelled"),
+                          on_progress=lambda message, _fraction: self.status_label.config(text=message))
+
+    def show_dist_report(self, report):
+        mb = 1024 ** 2
+        self.status_label.config(text=f"{os.path.basename(report.root)}: {len(report.files)} files, "
+                                      f"{report.total / mb:.1f} MB")
+        window = tk.Toplevel(self.root)
+        window.title(f"Distribution of {os.path.basename(report.root)}")
+        kinds = ', '.join(f"{category} {size / mb:.1f} MB" for category, size in report.by_category.items() if size)
+        ttk.Label(window, text=f"{len(report.files)} files, {report.total / mb:.1f} MB: {kinds}").pack(
+            anchor='w', padx=5, pady=5)
+
+        tables = ttk.Frame(window)
+        tables.pack(fill='both', expand=True, padx=5)
+        packages = ttk.Treeview(tables, columns=('package', 'size'), show='headings', height=12)
+        packages.heading('package', text="Package")
+        packages.heading('size', text="Size (MB)")
+        packages.column('package', width=200)
+        packages.column('size', width=80, anchor='e')
+        for package, size in sorted(report.by_package.items(), key=lambda item: item[1], reverse=True):
+            packages.insert('', 'end', values=(package, f"{size / mb:.2f}"))
+        packages.pack(side='left', fill='both', expand=True)
+
+        duplicates = ttk.Treeview(tables, columns=('copies', 'size', 'paths'), show='headings', height=12)
+        for column, heading, width in (('copies', "Copies", 60), ('size', "Each (KB)", 70),
+                                       ('paths', f"Duplicates ({report.duplicate_bytes / mb:.1f} MB wasted)", 320)):
+            duplicates.heading(column, text=heading)
+            duplicates.column(column, width=width, anchor='w' if column == 'paths' else 'e')
+        for size, paths in report.duplicates:
+            duplicates.insert('', 'end', values=(len(paths), f"{size / 1024:.0f}", ', '.join(paths)))
+        duplicates.pack(side='left', fill='both', expand=True, padx=(5, 0))
+
+        ttk.Label(window, text="Suggested exclusions (select and apply; they take effect on the next build):").pack(
+            anchor='w', padx=5, pady=(5, 0))
+        suggestions = ttk.Treeview(window, columns=('what', 'files', 'savings', 'flags'), show='headings',
+                                   height=min(max(len(report.suggestions), 1), 10))
+        for column, heading, width in (('what', "What", 260), ('files', "Files", 60),
+                                       ('savings', "Saves (MB)", 80), ('flags', "Flags", 360)):
+            suggestions.heading(column, text=heading)
+            suggestions.column(column, width=width, anchor='e' if column in ('files', 'savings') else 'w')
+        for index, suggestion in enumerate(report.suggestions):
+            suggestions.insert('', 'end', iid=str(index), values=(
+                f"{suggestion.title}: {suggestion.item}", suggestion.files, f"{suggestion.savings / mb:.2f}",
+                ' '.join(suggestion.flags)))
+        suggestions.pack(fill='both', expand=True, padx=5)
+
+        def apply_selected():
+            picked = [report.suggestions[int(iid)] for iid in suggestions.selection()]
+            for suggestion in picked:
+                self.exclusions.extend(flag for flag in suggestion.flags if flag not in self.exclusions)
+            if picked:
+                saved = sum(suggestion.savings for suggestion in picked)
+                self.status_label.config(text=f"{len(self.exclusions)} exclusion flag(s) in use, "
+                                              f"about {saved / mb:.1f} MB less on the next build")
+
+        def clear_exclusions():
+            self.exclusions = []
+            self.status_label.config(text="Exclusion flags cleared")
+
+        buttons = ttk.Frame(window)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Apply Selected", command=apply_selected).pack(side='left', padx=2)
+        ttk.Button(buttons, text="Clear Exclusions", command=clear_exclusions).pack(side='left', padx=2)
+
     def open_exe_folder(self):
         """Open the folder containing the compiled executable"""
         if not self.exe_folder or not os.path.exists(self.exe_folder):
@@ -1032,45 +2490,171 @@ class Nuitkalicious:
             self.status_label.config(text="Failed to open folder")
             messagebox.showerror("Error", error_msg)
 
-    def monitor_compilation(self, status_file):
-        """Monitor the compilation status file and update UI accordingly"""
-        def check_status():
-            if not os.path.exists(status_file):
-                # Keep checking if file doesn't exist yet
-                self.root.after(1000, check_status)
-                return
-            
-            try:
-                with open(status_file, 'r') as f:
-                    status = f.read().strip()
-                
-                if status == "SUCCESS":
-                    self.status_label.config(text="Compilation successful!")
-                    self.open_exe_button.config(state='normal')
-                    # Clean up the status file
-                    os.remove(status_file)
-                    # Clean up build artifacts
-                    self.cleanup_build_artifacts()
-                elif status == "FAILED":
-                    self.status_label.config(text="Compilation failed!")
-                    self.open_exe_button.config(state='disabled')
-                    # Clean up the status file
-                    os.remove(status_file)
-                    # Clean up build artifacts
-                    self.cleanup_build_artifacts()
-                else:
-                    # Keep checking if status is not final
-                    self.root.after(1000, check_status)
-            except Exception as e:
-                self.status_label.config(text=f"Error monitoring compilation: {str(e)}")
-                if os.path.exists(status_file):
-                    os.remove(status_file)
-        
-        # Start the monitoring loop
-        self.root.after(1000, check_status)
+    # Group 6: Build Queue
+    def browse_queue_scripts(self):
+        filenames = filedialog.askopenfilenames(
+            title="Select Python Scripts to Queue",
+            filetypes=(("Python files", "*.py"), ("All files", "*.*"))
+        )
+        if filenames:
+            self.enqueue_scripts(list(filenames))
+
+    def enqueue_scripts(self, script_paths):
+        """Queue builds of script_paths, each with a snapshot of the current options"""
+        from build_session import prepare_build_inputs
+
+        script_paths = [path for path in script_paths if path]
+        if not script_paths:
+            messagebox.showwarning("Script Required", "Please select a Python script to queue.")
+            return
+        if self.use_venv_var.get() and not os.path.exists(self.venv_path.get()):
+            messagebox.showwarning("Virtual Environment Required", 
+                "Please select a valid virtual environment directory.")
+            return
+
+        try:
+            priority = int(self.queue_priority.get())
+        except ValueError:
+            priority = 0
+        builds = [(path, self.build_command(path)) for path in script_paths]
+        options = self.collect_options()
+        python_path = self.get_venv_python()
+        venv_dir = self.venv_path.get() if self.use_venv_var.get() and self.venv_path.get() else None
+        cache_manager = self.get_cache_manager()
+
+        def worker(task):
+            for path, args in builds:
+                prepare_build_inputs(dict(options, script=path), args, check_cancelled=task.check_cancelled)
+            # Every item in the batch shares the venv, so one probe picks the cache scope
+            _python_version, nuitka_version = self._probe_versions(python_path, venv_dir)
+            env = venv_environment(venv_dir)
+            env.update(cache_manager.environment(cache_manager.scope_for(nuitka_version, venv_dir)))
+            return env
+
+        def done(env):
+            # Add the whole batch before scheduling so cores are split evenly
+            for path, args in builds:
+                self.build_queue.add(path, args, priority=priority, env=env, start=False)
+            self.build_queue.schedule()
+            self.status_label.config(text=f"Queued {len(builds)} build(s)")
+
+        self.tasks.submit(worker, name='enqueue', on_done=done,
+                          on_error=lambda e: self.status_label.config(text=f"Could not queue builds: {str(e)}"))
+
+    def _on_queue_update(self, item):
+        # Called from scheduler threads; hand over to the Tk thread
+        self.tasks.call_in_main(self.refresh_queue_item, item)
+
+    def refresh_queue_item(self, item):
+        iid = str(item.id)
+        values = (item.script_path, item.priority, item.status, item.jobs or '',
+                  f"{item.elapsed():.0f}s" if item.started else '')
+        if item.id not in self.build_queue.items:
+            if self.queue_tree.exists(iid):
+                self.queue_tree.delete(iid)
+        elif self.queue_tree.exists(iid):
+            self.queue_tree.item(iid, values=values)
+        else:
+            self.queue_tree.insert('', 'end', iid=iid, values=values)
+        self.refresh_queue_summary()
+
+    def refresh_queue_summary(self):
+        counts = self.build_queue.counts()
+        self.queue_summary.config(
+            text=f"Running {counts['running']}, queued {counts['queued']}, "
+                 f"succeeded {counts['succeeded']}, failed {counts['failed']}, "
+                 f"cancelled {counts['cancelled']} | "
+                 f"Throughput: {self.build_queue.throughput():.1f} builds/hour | "
+                 f"{self.build_queue.total_cores} cores")
+        # Keep the elapsed times of running builds ticking
+        if counts['running'] and not self.queue_tick_pending:
+            self.queue_tick_pending = True
+            self.root.after(1000, self._tick_queue)
+
+    def _tick_queue(self):
+        self.queue_tick_pending = False
+        for item in list(self.build_queue.items.values()):
+            if item.status == 'running':
+                self.refresh_queue_item(item)
+        self.refresh_queue_summary()
+
+    def selected_queue_items(self):
+        return [self.build_queue.items[int(iid)] for iid in self.queue_tree.selection()
+                if int(iid) in self.build_queue.items]
+
+    def change_queue_priority(self, delta):
+        for item in self.selected_queue_items():
+            self.build_queue.set_priority(item.id, item.priority + delta)
+
+    def cancel_queue_items(self):
+        for item in self.selected_queue_items():
+            self.build_queue.cancel(item.id)
+
+    def clear_finished_queue(self):
+        finished = [item for item in self.build_queue.items.values()
+                    if item.status in ('succeeded', 'failed', 'cancelled')]
+        self.build_queue.remove_finished()
+        for item in finished:
+            self.refresh_queue_item(item)
+
+    def update_queue_parallel(self):
+        try:
+            self.build_queue.set_max_parallel(int(self.queue_parallel.get()))
+        except ValueError:
+            pass
+
+    def show_queue_log(self):
+        items = self.selected_queue_items()
+        if not items:
+            return
+        item = items[0]
+        self.command_preview.delete('1.0', 'end')
+        self.append_build_log(f"{item.script_path} ({item.status})\n\n" + '\n'.join(item.log) + '\n')
+        if not self.build_log_visible:
+            self.toggle_build_log()
+        self.notebook.select(self.basic_frame)
+
+def benchmark_startup(max_ms=None):
+    """Time imports, window construction and first paint; returns an exit code"""
+    imported = time.perf_counter()
+    set_app_user_model_id()
+    root = tk.Tk()
+    app = Nuitkalicious(root)
+    built = time.perf_counter()
+    # Let Tk map the window and draw it once
+    root.update()
+    painted = time.perf_counter()
+    # The Advanced tab is built lazily, so time its first opening separately
+    app.notebook.select(app.advanced_frame)
+    root.update()
+    advanced = time.perf_counter()
+    app.on_close()
+
+    first_paint_ms = (painted - _STARTED) * 1000
+    print(f"Imports:            {(imported - _STARTED) * 1000:7.1f} ms")
+    print(f"Window construction:{(built - imported) * 1000:7.1f} ms")
+    print(f"Time to first paint:{first_paint_ms:7.1f} ms")
+    print(f"First Advanced tab: {(advanced - painted) * 1000:7.1f} ms")
+    if max_ms is not None and first_paint_ms > max_ms:
+        print(f"Startup budget exceeded: {first_paint_ms:.1f} ms > {max_ms:.1f} ms")
+        return 1
+    return 0
+
 
 # This stays outside the class
 if __name__ == '__main__':
+    # Only pay for argparse when there are arguments to parse
+    if len(sys.argv) > 1:
+        import argparse
+        parser = argparse.ArgumentParser(description="Nuitkalicious - a GUI for Nuitka")
+        parser.add_argument('--benchmark-startup', action='store_true',
+                            help="report import time and time-to-first-paint, then exit")
+        parser.add_argument('--max-startup-ms', type=float,
+                            help="with --benchmark-startup, exit 1 if first paint takes longer")
+        args = parser.parse_args()
+        if args.benchmark_startup:
+            sys.exit(benchmark_startup(args.max_startup_ms))
+    set_app_user_model_id()
     root = tk.Tk()
     app = Nuitkalicious(root)
     root.mainloop()
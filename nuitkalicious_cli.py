@@ -0,0 +1,791 @@
+"""
+Nuitkalicious - Command line
+Description: Headless builds from a project file (nuitkalicious.toml or
+pyproject.toml [tool.nuitkalicious]) with the same command, caches and runner
+as the GUI. Never imports tkinter, so it starts quickly and runs on CI
+machines without a display.
+
+Usage:
+    python nuitkalicious_cli.py build [project] [--no-cache] [--jobs N] [--ram-dir DIR | --no-ram-staging]
+    python nuitkalicious_cli.py smoke [project] [--accept] [--clear]
+    python nuitkalicious_cli.py history [project] [--all] [--limit N]
+    python nuitkalicious_cli.py diff [project] [--list] [--old N] [--new N] [--limit N]
+    python nuitkalicious_cli.py report [project] [--sort time|csize|name] [--limit N]
+                                       [--nofollow MODULE]... [--enable-plugin NAME]...
+    python nuitkalicious_cli.py analyze [project] [--top N] [--apply N]...
+    python nuitkalicious_cli.py pgo [project]
+    python nuitkalicious_cli.py accelerate [project] [--remove]
+    python nuitkalicious_cli.py explore [project] --vary AXIS... [--parallel N] [--apply N]
+    python nuitkalicious_cli.py onefile [project] [--compression LEVEL...] [--parallel N] [--apply N]
+    python nuitkalicious_cli.py pack [project]
+    python nuitkalicious_cli.py command [project]
+    python nuitkalicious_cli.py init script.py [--output nuitkalicious.toml]
+    python nuitkalicious_cli.py imports [project] [--exclude-optional] [--apply]
+    python nuitkalicious_cli.py trace [project] [--run="ARGS"]... [--clear] [--apply]
+    python nuitkalicious_cli.py tcltrim [project] [--run="ARGS"]... [--clear] [--no-timing]
+    python nuitkalicious_cli.py venvs [root] [--refresh]
+    python nuitkalicious_cli.py wheelhouse [--requirements FILE] [--dir DIR]
+    python nuitkalicious_cli.py venv DEST [--requirements FILE] [--wheelhouse DIR]
+"""
+
+import argparse
+import os
+import sys
+
+
+def _load(args):
+    from project_config import ProjectError, find_project_file, load_project
+
+    path = args.project or find_project_file(os.getcwd())
+    if not path:
+        raise ProjectError("No nuitkalicious.toml or [tool.nuitkalicious] table found")
+    options = load_project(path)
+    if getattr(args, 'jobs', None):
+        options['jobs'] = args.jobs
+    if getattr(args, 'no_cache', False):
+        options['cache']['enabled'] = False
+    if getattr(args, 'ram_dir', None):
+        options['ram_staging'].update(enabled=True, dir=args.ram_dir)
+    if getattr(args, 'no_ram_staging', False):
+        options['ram_staging']['enabled'] = False
+    if not options['script']:
+        raise ProjectError(f"{path} does not name a script")
+    return options
+
+
+def cmd_command(args):
+    """Print the Nuitka command a project produces"""
+    from build_runner import format_command
+    from nuitka_options import build_nuitka_command
+
+    print(format_command(build_nuitka_command(_load(args))))
+    return 0
+
+
+def cmd_build(args):
+    """Build a project, streaming Nuitka's output"""
+    from build_runner import format_command
+    from build_session import BuildSession, build_cache_for, cache_manager_for
+    from venv_inventory import VenvInventory
+
+    options = _load(args)
+    session = BuildSession(
+        options,
+        build_cache=build_cache_for(options) if options['cache']['enabled'] else None,
+        cache_manager=cache_manager_for(options),
+        inventory=VenvInventory())
+
+    def progress(message):
+        print(f"[nuitkalicious] {message}", flush=True)
+
+    restored = session.prepare(progress)
+    for warning in session.warnings:
+        progress(warning)
+    if restored:
+        progress(f"Restored unchanged build from cache in {session.elapsed:.1f}s ({session.cache_key[:12]})")
+        return 0
+
+    def on_output(stream, line):
+        if stream == 'stderr':
+            print(line, file=sys.stderr, flush=True)
+        elif stream in ('jobs', 'phase'):
+            progress(f"[{stream}] {line}")
+        else:
+            print(line, flush=True)
+
+    progress(f"$ {format_command(session.cmd)}")
+    session.start(on_output)
+    try:
+        result = session.wait()
+    except KeyboardInterrupt:
+        progress("Cancelling...")
+        session.cancel()
+        result = session.wait()
+
+    progress(f"Nuitka finished: {result.describe()}")
+    for note in session.finish(result.success, progress):
+        progress(note)
+    if result.cancelled:
+        return 130
+    if not result.success:
+        return result.returncode or 1
+    if options['benchmark']['smoke_test']:
+        return _smoke(options, session.output_dir, session.cmd, progress)
+    return 0
+
+
+# Exit code of a build that works but regressed, or whose program does not start
+SMOKE_FAILED = 3
+
+
+def _smoke(options, output_dir, cmd, progress):
+    from smoke_benchmark import SmokeTestError, run_smoke_test
+
+    progress("Smoke test: running the program...")
+    try:
+        smoke = run_smoke_test(options, output_dir, cmd)
+    except SmokeTestError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    for line in smoke.lines():
+        progress(line)
+    return SMOKE_FAILED if smoke.failed or smoke.regressed else 0
+
+
+def cmd_smoke(args):
+    """Smoke test the last build against the stored baseline, or manage the baseline"""
+    from nuitka_options import build_nuitka_command
+    from smoke_benchmark import BaselineStore
+
+    options = _load(args)
+    store = BaselineStore(options['script'])
+    if args.clear:
+        store.clear()
+        print("Baseline and history cleared")
+        return 0
+    if args.accept:
+        accepted = store.accept_last()
+        if accepted is None:
+            print("nuitkalicious: no smoke-tested build to accept", file=sys.stderr)
+            return 1
+        print(f"Baseline set: {accepted['metrics']['warm_start'] * 1000:.0f} ms startup, "
+              f"{accepted['metrics']['size'] / 1024 ** 2:.1f} MB")
+        return 0
+
+    def progress(message):
+        print(f"[nuitkalicious] {message}", flush=True)
+
+    return _smoke(options, os.path.dirname(options['script']), build_nuitka_command(options), progress)
+
+
+def cmd_pack(args):
+    """Build or update the resource pack without building"""
+    from resource_pack import PackError, prepare_pack
+
+    options = _load(args)
+    if not options['resource_pack']['enabled']:
+        print("nuitkalicious: resource packing is off; set enabled = true in [resource_pack]", file=sys.stderr)
+        return 1
+    try:
+        result = prepare_pack(options)
+    except PackError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    print(result.describe() if result else "No resource files to pack")
+    return 0
+
+
+def cmd_history(args):
+    """List recorded builds with their phase durations"""
+    import time
+
+    from build_history import PHASE_LABELS, BuildHistory, format_duration
+
+    script = None if args.all else _load(args)['script']
+    builds = BuildHistory().recent(script, args.limit)
+    if not builds:
+        print("No builds recorded")
+        return 0
+    phases = list(PHASE_LABELS)
+    header = f"{'started':<16} {'status':<9} {'total':>7} {'size MB':>8} {'hits':>5} " + \
+        ' '.join(f"{name.replace('_', ' '):>12}" for name in phases)
+    print(header + ('  script' if args.all else ''))
+    for build in reversed(builds):
+        if build['cancelled']:
+            status = 'cancelled'
+        else:
+            status = 'ok' if build['returncode'] == 0 else f"exit {build['returncode']}"
+        size = f"{build['output_size'] / 1024 ** 2:.1f}" if build['output_size'] else '-'
+        hits = '-' if build['cache_hits'] is None else build['cache_hits']
+        cells = ' '.join(f"{format_duration(build['phases'][name]) if name in build['phases'] else '-':>12}"
+                         for name in phases)
+        line = (f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(build['started'])):<16} {status:<9} "
+                f"{format_duration(build['elapsed']):>7} {size:>8} {hits:>5} {cells}")
+        print(line + (f"  {build['script']}" if args.all else ''))
+    return 0
+
+
+def cmd_diff(args):
+    """Explain what changed between two recorded builds"""
+    from build_manifest import ManifestDiff, ManifestStore, describe_entry
+
+    store = ManifestStore(_load(args)['script'])
+    entries = store.entries()
+    if args.list:
+        for number, entry in enumerate(entries, 1):
+            print(f"{number:>3}. {describe_entry(entry)}")
+        return 0
+    for number in (args.old, args.new):
+        if not 1 <= number <= len(entries):
+            print(f"nuitkalicious: no build {number}; {len(entries)} recorded (see diff --list)", file=sys.stderr)
+            return 1
+    old, new = entries[args.old - 1], entries[args.new - 1]
+    print(f"From {describe_entry(old)}\n  to {describe_entry(new)}")
+    print('\n'.join(ManifestDiff(store.load(old['id']), store.load(new['id'])).lines(args.limit)))
+    return 0
+
+
+def cmd_report(args):
+    """List what each module cost the last reported build; optionally act on it"""
+    from compilation_report import ReportError, load_summary, nofollow_flags
+    from project_config import find_project_file, save_project
+
+    options = _load(args)
+    try:
+        modules, info = load_summary(options['script'])
+    except ReportError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    sort_keys = {
+        'time': lambda module: -module.total_seconds,
+        'csize': lambda module: -(module.c_bytes or 0),
+        'name': lambda module: module.name,
+    }
+    modules.sort(key=sort_keys[args.sort])
+    c_compile = info.get('c_compile_seconds')
+    print(f"{len(modules)} modules" + (f", C compile {c_compile:.1f}s shared out by C size" if c_compile else ""))
+    print(f"{'module':<40} {'python s':>9} {'C KB':>8} {'C s est.':>9} {'total s':>8}  included because")
+    for module in modules[:args.limit]:
+        c_kb = '-' if module.c_bytes is None else f"{module.c_bytes / 1024:.0f}"
+        c_seconds = '-' if module.c_seconds is None else f"{module.c_seconds:.2f}"
+        plugin = f" [plugin: {module.plugin()}]" if module.plugin() else ""
+        print(f"{module.name:<40} {module.python_seconds:>9.2f} {c_kb:>8} {c_seconds:>9} "
+              f"{module.total_seconds:>8.2f}  {module.inclusion()}{plugin}")
+
+    if args.nofollow or args.enable_plugin:
+        path = args.project or find_project_file(os.getcwd())
+        if args.nofollow:
+            options['import_flags'] = nofollow_flags(options['import_flags'], options['analyzed_imports'],
+                                                     args.nofollow)
+            options['analyzed_imports'] = True
+        for plugin in args.enable_plugin or []:
+            # The two plugins with their own checkboxes keep using them
+            if plugin == 'tk-inter':
+                options['tkinter'] = True
+            elif plugin == 'pyqt6':
+                options['pyqt6'] = True
+            elif plugin not in options['plugins']:
+                options['plugins'].append(plugin)
+        save_project(path, options)
+        print(f"Saved to {path}")
+    return 0
+
+
+def cmd_analyze(args):
+    """Break down the size of the last standalone build and suggest exclusions"""
+    from dist_analyzer import AnalyzerError, analyze_build
+    from project_config import find_project_file, save_project
+
+    options = _load(args)
+    try:
+        report = analyze_build(options, progress=lambda message: print(f"[nuitkalicious] {message}", flush=True))
+    except (AnalyzerError, OSError) as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    print('\n'.join(report.lines(args.top)))
+    if args.apply:
+        for number in args.apply:
+            if not 1 <= number <= len(report.suggestions):
+                print(f"nuitkalicious: no suggestion {number}", file=sys.stderr)
+                return 1
+            flags = report.suggestions[number - 1].flags
+            options['exclusions'].extend(flag for flag in flags if flag not in options['exclusions'])
+        path = args.project or find_project_file(os.getcwd())
+        save_project(path, options)
+        print(f"Saved {len(options['exclusions'])} exclusion flag(s) to {path}")
+    return 0
+
+
+def cmd_pgo(args):
+    """Build with profile-guided optimization and report the speedup"""
+    from build_session import cache_manager_for
+    from pgo import PgoCancelled, PgoError, PgoPipeline
+    from venv_inventory import VenvInventory
+
+    options = _load(args)
+
+    def progress(message):
+        print(f"[nuitkalicious] {message}", flush=True)
+
+    def on_output(stream, line):
+        print(line, file=sys.stderr if stream == 'stderr' else sys.stdout, flush=True)
+
+    try:
+        pipeline = PgoPipeline(options, cache_manager=cache_manager_for(options), inventory=VenvInventory())
+        try:
+            report = pipeline.run(progress, on_output)
+        except KeyboardInterrupt:
+            progress("Cancelling...")
+            pipeline.cancel()
+            return 130
+    except PgoCancelled:
+        return 130
+    except (OSError, PgoError) as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    for line in report.lines():
+        progress(line)
+    progress(f"PGO build: {report.executable}")
+    return 0
+
+
+def cmd_accelerate(args):
+    """Compile a project's hottest modules to extension modules next to their sources"""
+    from build_session import cache_manager_for
+    from hot_modules import HotModuleAccelerator, HotModuleCancelled, HotModuleError
+
+    options = _load(args)
+
+    def progress(message):
+        print(f"[nuitkalicious] {message}", flush=True)
+
+    try:
+        accelerator = HotModuleAccelerator(options, cache_manager=cache_manager_for(options))
+        if args.remove:
+            for path in accelerator.remove():
+                progress(f"Removed {path}")
+            return 0
+        try:
+            report = accelerator.run(progress, lambda _stream, line: print(line, flush=True))
+        except KeyboardInterrupt:
+            progress("Cancelling...")
+            accelerator.cancel()
+            return 130
+    except HotModuleCancelled:
+        return 130
+    except (OSError, ValueError, HotModuleError) as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    for line in report.lines(accelerator.project_dir):
+        progress(line)
+    return 0
+
+
+def cmd_explore(args):
+    """Build and measure combinations of options and show the Pareto-optimal ones"""
+    from option_matrix import OptionMatrix, load_results
+    from project_config import find_project_file, save_project
+
+    options = _load(args)
+
+    def progress(message):
+        print(f"[nuitkalicious] {message}", flush=True)
+
+    if args.apply is not None:
+        # Save a configuration from the last exploration into the project file
+        results = load_results(options)
+        if not 1 <= args.apply <= len(results):
+            print(f"nuitkalicious: no configuration {args.apply} in the last exploration", file=sys.stderr)
+            return 1
+        result = results[args.apply - 1]
+        path = args.project or find_project_file(os.getcwd())
+        save_project(path, result.options)
+        print(f"Saved {result.label} to {path}")
+        return 0
+    if not args.vary:
+        print("nuitkalicious: pass --vary with the options to explore", file=sys.stderr)
+        return 1
+
+    try:
+        matrix = OptionMatrix(options, args.vary, max_parallel=args.parallel)
+    except ValueError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    return _run_matrix(matrix, progress)
+
+
+def _run_matrix(matrix, progress):
+    # Run an option matrix (or a subclass) and print its results table
+    from option_matrix import MatrixCancelled
+
+    try:
+        try:
+            results = matrix.run(progress)
+        except KeyboardInterrupt:
+            progress("Cancelling...")
+            matrix.cancel()
+            return 130
+    except MatrixCancelled:
+        return 130
+    except OSError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+
+    def cell(value, scale, digits=1):
+        return '-' if value is None else f"{value * scale:.{digits}f}"
+
+    # Only onefile benchmarks measure what unpacking leaves on disk
+    unpacked = any(result.metrics and result.metrics.unpacked is not None for result in results)
+    print(f"{'#':>3}   {'configuration':<32} {'size MB':>8} {'cold ms':>8} {'warm ms':>8} "
+          f"{'RSS MB':>7} {'bench s':>8} {'build s':>8}" + (f" {'unpacked MB':>11}" if unpacked else ""))
+    for index, result in enumerate(results, 1):
+        metrics = result.metrics
+        mark = '*' if result.pareto else ' '
+        if result.error or metrics is None:
+            print(f"{index:>3} {mark} {result.label:<32} {result.error}")
+            continue
+        print(f"{index:>3} {mark} {result.label:<32} {cell(metrics.size, 1 / 1024 ** 2):>8} "
+              f"{cell(metrics.cold_start, 1000):>8} {cell(metrics.warm_start, 1000):>8} "
+              f"{cell(metrics.peak_rss, 1 / 1024 ** 2):>7} {cell(metrics.benchmark, 1, 3):>8} "
+              f"{cell(result.build_seconds, 1):>8}" + (f" {cell(metrics.unpacked, 1 / 1024 ** 2):>11}"
+                                                      if unpacked else ""))
+    print("* = Pareto-optimal; save one with --apply N")
+    return 0
+
+
+def cmd_onefile(args):
+    """Benchmark onefile start-up with each unpacking mode and compression level"""
+    from onefile_benchmark import OnefileBenchmark, load_benchmark
+    from project_config import find_project_file, save_project
+
+    options = _load(args)
+    if args.apply is not None:
+        results = load_benchmark(options)
+        if not 1 <= args.apply <= len(results):
+            print(f"nuitkalicious: no configuration {args.apply} in the last onefile benchmark", file=sys.stderr)
+            return 1
+        result = results[args.apply - 1]
+        path = args.project or find_project_file(os.getcwd())
+        save_project(path, result.options)
+        print(f"Saved {result.label} to {path}")
+        return 0
+    try:
+        benchmark = OnefileBenchmark(options, args.compression, max_parallel=args.parallel)
+    except ValueError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    return _run_matrix(benchmark, lambda message: print(f"[nuitkalicious] {message}", flush=True))
+
+
+def cmd_init(args):
+    """Write a project file for a script with the default options"""
+    from nuitka_options import default_options
+    from project_config import save_project
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(args.script)), 'nuitkalicious.toml')
+    if os.path.exists(output) and not output.endswith('pyproject.toml'):
+        print(f"{output} already exists", file=sys.stderr)
+        return 1
+    options = default_options()
+    options['script'] = os.path.abspath(args.script)
+    save_project(output, options)
+    print(f"Wrote {output}")
+    return 0
+
+
+def cmd_imports(args):
+    """Show the script's import graph and the follow flags it needs"""
+    from import_graph import ImportGraph
+    from nuitka_options import interpreter_path
+    from project_config import find_project_file, save_project
+
+    options = _load(args)
+    graph = ImportGraph(options['script'], interpreter_path(options))
+    count, total, seconds = graph.subtree_stats(graph.ROOT)
+    print(f"{count} modules, {total / 1024:.0f} KB, ~{seconds:.0f}s to compile")
+    subtrees = sorted(((graph.subtree_stats(name), name, edge) for name, edge in graph.children(graph.ROOT)),
+                      reverse=True)
+    for (count, total, seconds), name, edge in subtrees:
+        print(f"  {name:<30} {edge:<8} {count:>5} modules {total / 1024:>9.0f} KB  ~{seconds:.1f}s")
+    optional = graph.optional_packages()
+    if optional:
+        print(f"Optional (try/except ImportError): {', '.join(optional)}")
+
+    flags = graph.suggested_flags(args.exclude_optional)
+    print('\n'.join(flags) if flags else "No extra flags needed")
+    if args.apply:
+        path = args.project or find_project_file(os.getcwd())
+        options['analyzed_imports'] = True
+        options['import_flags'] = flags
+        save_project(path, options)
+        print(f"Saved {len(flags)} flag(s) to {path}")
+    return 0
+
+
+def cmd_trace(args):
+    """Trace real runs of the script and suggest nofollows for modules they never import"""
+    import shlex
+    import subprocess
+    from import_graph import ImportGraph
+    from import_tracer import TraceStore, prune_report, trace_command
+    from nuitka_options import interpreter_path
+    from project_config import find_project_file, save_project
+
+    options = _load(args)
+    python_path = interpreter_path(options)
+    store = TraceStore(options['script'])
+    if args.clear:
+        store.clear()
+    trace = store.load()
+    for run in args.run or []:
+        run_args = shlex.split(run, posix=os.name != 'nt')
+        output_path = store.output_path()
+        print(f"[nuitkalicious] Tracing {os.path.basename(options['script'])} {run}", flush=True)
+        returncode = subprocess.call(trace_command(python_path, options['script'], run_args, output_path),
+                                     cwd=os.path.dirname(options['script']))
+        if not os.path.isfile(output_path):
+            print(f"nuitkalicious: traced run exited with code {returncode} without writing a trace",
+                  file=sys.stderr)
+            return 1
+        if returncode != 0:
+            print(f"[nuitkalicious] Run exited with code {returncode}; its trace is kept", flush=True)
+        trace = store.merge(output_path, run_args, returncode)
+    if not trace['runs']:
+        print("No trace runs yet; add some with --run", file=sys.stderr)
+        return 1
+
+    graph = ImportGraph(options['script'], python_path)
+    flags, before, after = prune_report(graph, trace)
+    print(f"{len(trace['runs'])} run(s) merged, {len(trace['modules'])} modules imported")
+    print(f"Compiled modules: {before[0]} -> {after[0]}, {before[1] / 1024:.0f} KB -> {after[1] / 1024:.0f} KB, "
+          f"~{before[2] - after[2]:.0f}s less compiling")
+    print('\n'.join(flags) if flags else "Every reachable module was used")
+    if args.apply:
+        path = args.project or find_project_file(os.getcwd())
+        combined = graph.suggested_flags()
+        combined.extend(flag for flag in flags if flag not in combined)
+        options['analyzed_imports'] = True
+        options['import_flags'] = combined
+        save_project(path, options)
+        print(f"Saved {len(combined)} flag(s) to {path}")
+    return 0
+
+
+def cmd_tcltrim(args):
+    """Trace a tkinter program's Tcl/Tk use and stage the trimmed libraries"""
+    import shlex
+    import subprocess
+    from nuitka_options import interpreter_path
+    from tcl_trim import TclTraceStore, TrimError, prepare_tcl_trim, trace_command
+
+    options = _load(args)
+    python_path = interpreter_path(options)
+    store = TclTraceStore(options['script'])
+    if args.clear:
+        store.clear()
+    for run in args.run or []:
+        output_path = store.output_path()
+        print(f"[nuitkalicious] Tracing {os.path.basename(options['script'])} {run}; close the program when done",
+              flush=True)
+        returncode = subprocess.call(trace_command(python_path, options['script'],
+                                                   shlex.split(run, posix=os.name != 'nt'), output_path),
+                                     cwd=os.path.dirname(options['script']))
+        if not os.path.isfile(output_path):
+            print(f"nuitkalicious: traced run exited with code {returncode} without writing a trace",
+                  file=sys.stderr)
+            return 1
+        store.merge(output_path)
+    try:
+        report = prepare_tcl_trim(options, python_path, lambda message: print(f"[nuitkalicious] {message}",
+                                                                              flush=True),
+                                  measure=not args.no_timing)
+    except TrimError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    print('\n'.join(report.lines()))
+    if not options['tcl_trim']['enabled']:
+        print("Builds still ship the full libraries; set enabled = true in [tcl_trim] to use the trimmed ones")
+    return 0
+
+
+def cmd_venvs(args):
+    """List the virtual environments under a folder"""
+    from venv_inventory import VenvInventory
+
+    for info in VenvInventory().scan(args.root, refresh=args.refresh):
+        nuitka = info.nuitka_version or ('probe failed' if info.error else 'no nuitka')
+        plugins = ', '.join(sorted(info.plugins)) or '-'
+        print(f"{info.path}\tPython {info.python_version or '?'}\t{nuitka}\t{plugins}")
+    return 0
+
+
+def _run(args):
+    # Commands print straight to the terminal; their output is not kept
+    import subprocess
+    from build_runner import format_command
+
+    print(f"[nuitkalicious] $ {format_command(args)}", flush=True)
+    return subprocess.call(args), ''
+
+
+def cmd_wheelhouse(args):
+    """Fill the wheelhouse with Nuitka, its helpers and a requirements file"""
+    from wheelhouse import Wheelhouse
+
+    wheelhouse = Wheelhouse(args.dir)
+    returncode, _output = _run(wheelhouse.fill_args(args.python, requirements_file=args.requirements))
+    if returncode == 0:
+        print(f"{len(wheelhouse.wheels())} wheel(s) in {wheelhouse.root}")
+    return returncode
+
+
+def cmd_venv(args):
+    """Create a ready venv from the pool, installing only from the wheelhouse"""
+    from venv_pool import VenvPool
+    from wheelhouse import Wheelhouse
+
+    try:
+        dest = VenvPool().checkout(args.dest, Wheelhouse(args.wheelhouse), _run, base_python=args.python,
+                                   requirements_file=args.requirements,
+                                   log=lambda message: print(f"[nuitkalicious] {message}", flush=True))
+    except (OSError, RuntimeError) as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+    print(f"Created {dest}")
+    return 0
+
+
+def main(argv=None):
+    from nuitka_options import ONEFILE_COMPRESSION
+
+    parser = argparse.ArgumentParser(prog='nuitkalicious', description="Headless Nuitkalicious builds")
+    commands = parser.add_subparsers(dest='action', required=True)
+
+    build = commands.add_parser('build', help="build a project")
+    build.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    build.add_argument('--no-cache', action='store_true', help="skip the build cache for this run")
+    ram = build.add_mutually_exclusive_group()
+    ram.add_argument('--ram-dir', metavar='DIR', help="stage the build in this RAM-disk folder, e.g. /dev/shm")
+    ram.add_argument('--no-ram-staging', action='store_true', help="build on disk even if the project stages")
+    build.add_argument('--jobs', help="override --jobs (a number or 'auto')")
+    build.set_defaults(handler=cmd_build)
+
+    smoke = commands.add_parser('smoke', help="smoke test the last build against the stored baseline")
+    smoke.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    smoke.add_argument('--accept', action='store_true', help="make the last smoke-tested build the baseline")
+    smoke.add_argument('--clear', action='store_true', help="forget the baseline and the history")
+    smoke.set_defaults(handler=cmd_smoke)
+
+    history = commands.add_parser('history', help="list recorded builds and their phase durations")
+    history.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    history.add_argument('--all', action='store_true', help="list builds of every script")
+    history.add_argument('--limit', type=int, default=20, help="builds to list (default: 20)")
+    history.set_defaults(handler=cmd_history)
+
+    diff = commands.add_parser('diff', help="explain what changed between two recorded builds")
+    diff.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    diff.add_argument('--list', action='store_true', help="list the recorded builds, 1 being the latest")
+    diff.add_argument('--old', type=int, default=2, help="build to compare from (default: 2, the one before last)")
+    diff.add_argument('--new', type=int, default=1, help="build to compare to (default: 1, the latest)")
+    diff.add_argument('--limit', type=int, default=20, help="entries to list per section (default: 20)")
+    diff.set_defaults(handler=cmd_diff)
+
+    report = commands.add_parser('report', help="list what each module cost the last build")
+    report.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    report.add_argument('--sort', choices=('time', 'csize', 'name'), default='time',
+                        help="order of the modules (default: time)")
+    report.add_argument('--limit', type=int, default=30, help="modules to list (default: 30)")
+    report.add_argument('--nofollow', action='append', metavar='MODULE',
+                        help="stop following a module in later builds; repeatable")
+    report.add_argument('--enable-plugin', action='append', metavar='NAME',
+                        help="enable a Nuitka plugin in later builds; repeatable")
+    report.set_defaults(handler=cmd_report)
+
+    analyze = commands.add_parser('analyze', help="break down the size of the last standalone build")
+    analyze.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    analyze.add_argument('--top', type=int, default=15, help="packages and duplicates to list (default: 15)")
+    analyze.add_argument('--apply', type=int, action='append', metavar='N',
+                         help="save suggestion N's flags into the project file; repeatable")
+    analyze.set_defaults(handler=cmd_analyze)
+
+    pgo = commands.add_parser('pgo', help="build with profile-guided optimization")
+    pgo.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    pgo.set_defaults(handler=cmd_pgo)
+
+    accelerate = commands.add_parser('accelerate', help="compile the hottest project modules in place")
+    accelerate.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    accelerate.add_argument('--remove', action='store_true', help="delete the compiled modules again")
+    accelerate.set_defaults(handler=cmd_accelerate)
+
+    explore = commands.add_parser('explore', help="benchmark combinations of options and rank them")
+    explore.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    explore.add_argument('--vary', nargs='+', metavar='AXIS',
+                         help="options to vary: lto, mode, static_libpython, python_flag_nosite, clang, "
+                              "optimization_level")
+    explore.add_argument('--parallel', type=int, help="builds to run at once (default: a quarter of the cores)")
+    explore.add_argument('--apply', type=int, metavar='N',
+                         help="save configuration N of the last exploration into the project file")
+    explore.set_defaults(handler=cmd_explore)
+
+    onefile = commands.add_parser('onefile', help="benchmark onefile unpacking and compression settings")
+    onefile.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    onefile.add_argument('--compression', nargs='+', metavar='LEVEL', choices=list(ONEFILE_COMPRESSION),
+                         help="compression levels to try: max (zstd 22), fast (zstd 3 via --low-memory, "
+                              "which also slows the build), none (default: all)")
+    onefile.add_argument('--parallel', type=int, help="builds to run at once (default: a quarter of the cores)")
+    onefile.add_argument('--apply', type=int, metavar='N',
+                         help="save configuration N of the last benchmark into the project file")
+    onefile.set_defaults(handler=cmd_onefile)
+
+    pack = commands.add_parser('pack', help="build or update the resource pack")
+    pack.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    pack.set_defaults(handler=cmd_pack)
+
+    command = commands.add_parser('command', help="print the Nuitka command")
+    command.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    command.set_defaults(handler=cmd_command)
+
+    init = commands.add_parser('init', help="create a project file for a script")
+    init.add_argument('script', help="Python script to compile")
+    init.add_argument('--output', help="project file to write (nuitkalicious.toml or pyproject.toml)")
+    init.set_defaults(handler=cmd_init)
+
+    imports = commands.add_parser('imports', help="analyze the script's imports")
+    imports.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    imports.add_argument('--exclude-optional', action='store_true',
+                         help="also skip packages only imported inside try/except ImportError")
+    imports.add_argument('--apply', action='store_true', help="save the flags into the project file")
+    imports.set_defaults(handler=cmd_imports)
+
+    trace = commands.add_parser('trace', help="trace real runs to find modules that are never imported")
+    trace.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    trace.add_argument('--run', action='append', metavar='ARGS',
+                       help="trace one run with these arguments (--run='-m pytest tests' traces a command); repeatable")
+    trace.add_argument('--clear', action='store_true', help="forget earlier runs first")
+    trace.add_argument('--apply', action='store_true', help="save the flags into the project file")
+    trace.set_defaults(handler=cmd_trace)
+
+    tcltrim = commands.add_parser('tcltrim', help="trim the Tcl/Tk files a tkinter program ships")
+    tcltrim.add_argument('project', nargs='?', help="project file (default: search upwards from here)")
+    tcltrim.add_argument('--run', action='append', metavar='ARGS',
+                         help="trace one run of the program with these arguments; repeatable")
+    tcltrim.add_argument('--clear', action='store_true', help="forget earlier runs first")
+    tcltrim.add_argument('--no-timing', action='store_true', help="skip the start-up time comparison")
+    tcltrim.set_defaults(handler=cmd_tcltrim)
+
+    venvs = commands.add_parser('venvs', help="list virtual environments under a folder")
+    venvs.add_argument('root', nargs='?', default='.', help="folder to search (default: here)")
+    venvs.add_argument('--refresh', action='store_true', help="probe again even if unchanged")
+    venvs.set_defaults(handler=cmd_venvs)
+
+    wheelhouse = commands.add_parser('wheelhouse', help="download wheels for offline installs")
+    wheelhouse.add_argument('--requirements', help="also fetch wheels for this requirements file")
+    wheelhouse.add_argument('--dir', help="wheelhouse folder (default: $NUITKALICIOUS_WHEELHOUSE or app data)")
+    wheelhouse.add_argument('--python', default=sys.executable, help="interpreter to fetch wheels for")
+    wheelhouse.set_defaults(handler=cmd_wheelhouse)
+
+    venv = commands.add_parser('venv', help="create a ready venv from the pool, offline")
+    venv.add_argument('dest', help="venv folder to create")
+    venv.add_argument('--requirements', help="requirements file to preinstall")
+    venv.add_argument('--wheelhouse', help="wheelhouse folder (default: $NUITKALICIOUS_WHEELHOUSE or app data)")
+    venv.add_argument('--python', default=sys.executable, help="base interpreter")
+    venv.set_defaults(handler=cmd_venv)
+
+    args = parser.parse_args(argv)
+    from project_config import ProjectError
+    from resource_pack import PackError
+    from tcl_trim import TrimError
+    try:
+        return args.handler(args)
+    except ProjectError as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 2
+    except (PackError, TrimError) as e:
+        print(f"nuitkalicious: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Nuitkalicious - Resource pack reader
+Description: Runtime accessor for the resource pack Nuitkalicious builds from
+a project's resource files. Copied next to the script when a pack is built;
+the program imports it and reads entries straight from the memory-mapped
+pack, without unpacking anything. Standard library only.
+
+    import nuitkalicious_resources as resources
+    data = resources.read('logo.png')
+"""
+
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b'NKRP'
+HEADER = MAGIC + b'\x01\x00\x00\x00'
+# index offset, index length, magic
+TRAILER = struct.Struct('<QQ4s')
+# Name of the pack inside a compiled program
+PACK_NAME = 'resources.respack'
+RAW = 'raw'
+ZLIB = 'zlib'
+
+
+class PackFormatError(Exception):
+    """Raised when a file is not a readable resource pack"""
+
+
+def read_index(data):
+    """Return (index, index offset) from the bytes or mmap of a pack
+
+    index['entries'] maps a name to [offset, stored size, size, method, source mtime_ns].
+    """
+    if len(data) < len(HEADER) + TRAILER.size or data[:len(HEADER)] != HEADER:
+        raise PackFormatError("Not a resource pack")
+    offset, length, magic = TRAILER.unpack(data[len(data) - TRAILER.size:])
+    if magic != MAGIC or offset + length + TRAILER.size != len(data):
+        raise PackFormatError("Resource pack is truncated")
+    return json.loads(bytes(data[offset:offset + length]).decode('utf-8')), offset
+
+
+def default_path():
+    """Return the pack of the running program
+
+    A compiled program has it next to its modules; running from source, the
+    pack built for the main script sits next to that script.
+    """
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), PACK_NAME)
+    if os.path.exists(here):
+        return here
+    main = getattr(sys.modules.get('__main__'), '__file__', None) or sys.argv[0]
+    return os.path.splitext(os.path.abspath(main))[0] + '.respack'
+
+
+class ResourcePack:
+    """Read-only view of a resource pack; entries are sliced out of an mmap"""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.entries = read_index(self._map)[0]['entries']
+        except PackFormatError:
+            self._map.close()
+            raise
+
+    def names(self):
+        return list(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def size(self, name):
+        return self.entries[name][2]
+
+    def view(self, name):
+        """Return a zero-copy memoryview of an uncompressed entry (bytes for a compressed one)
+
+        Release views before close(); an mmap cannot close while they exist.
+        """
+        offset, stored, _size, method, _mtime = self.entries[name]
+        if method == RAW:
+            return memoryview(self._map)[offset:offset + stored]
+        return self.read(name)
+
+    def read(self, name):
+        """Return an entry's bytes"""
+        offset, stored, _size, method, _mtime = self.entries[name]
+        data = self._map[offset:offset + stored]
+        return zlib.decompress(data) if method == ZLIB else data
+
+    def open(self, name):
+        """Return an entry as a binary file object"""
+        return io.BytesIO(self.read(name))
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default = None
+
+
+def default_pack():
+    """Return the running program's pack, opened on first use"""
+    global _default
+    if _default is None:
+        _default = ResourcePack()
+    return _default
+
+
+def read(name):
+    return default_pack().read(name)
+
+
+def open_resource(name):
+    return default_pack().open(name)
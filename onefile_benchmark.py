@@ -0,0 +1,55 @@
+"""
+Nuitkalicious - Onefile start-up benchmark
+Description: Builds a onefile program once per unpacking mode and payload
+compression level (through the option-matrix explorer) and measures each:
+cold start with nothing unpacked yet, warm start, binary size and what the
+unpacking leaves on disk. Every variant unpacks next to its own binary, so no
+run finds another variant's files.
+"""
+
+import os
+
+from build_cache import path_size
+from nuitka_options import ONEFILE_COMPRESSION, ONEFILE_EXTRACTION, merge_options
+from option_matrix import OptionMatrix, load_results
+
+# Where the variants unpack; {PROGRAM_BASE} is the binary's path without .exe/.bin
+BENCHMARK_EXTRACT_DIR = '{PROGRAM_BASE}.extract'
+
+
+class OnefileBenchmark(OptionMatrix):
+    """Build and measure a onefile program with each unpacking mode and compression level"""
+
+    kind = 'onefile'
+
+    def __init__(self, options, compression=None, max_parallel=None, env=None):
+        unknown = set(compression or ()) - set(ONEFILE_COMPRESSION)
+        if unknown:
+            raise ValueError(f"Unknown compression: {', '.join(sorted(unknown))}")
+        self.choices = {
+            'onefile_extraction': ONEFILE_EXTRACTION,
+            'onefile_compression': tuple(level for level in ONEFILE_COMPRESSION
+                                         if not compression or level in compression),
+        }
+        self.user_settings = options['onefile_startup']
+        base = merge_options(options, {'standalone': True, 'onefile': True,
+                                       'onefile_startup': {'extract_dir': BENCHMARK_EXTRACT_DIR, 'version': ''}})
+        super().__init__(base, list(self.choices), max_parallel, env)
+
+    def measure(self, result, executable):
+        # The builds are fresh, so the first (cold) run starts with nothing unpacked
+        metrics = super().measure(result, executable)
+        metrics.unpacked = path_size(os.path.splitext(executable)[0] + '.extract')
+        return metrics
+
+    def measure_all(self, progress=None):
+        super().measure_all(progress)
+        # Applied results unpack where the user's own settings say
+        for result in self.results:
+            result.options = merge_options(result.options, {'onefile_startup': {
+                'extract_dir': self.user_settings['extract_dir'], 'version': self.user_settings['version']}})
+
+
+def load_benchmark(options):
+    """Return the MatrixResults of a script's last onefile benchmark, or []"""
+    return load_results(options, OnefileBenchmark.kind)
@@ -0,0 +1,286 @@
+"""
+Nuitkalicious - Option-matrix explorer
+Description: Builds every combination of a few varied options on top of a
+base option set (in parallel through a BuildQueue), measures each program
+with the benchmark settings and marks the Pareto-optimal configurations:
+those no other configuration beats on every measured number at once.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import threading
+
+from benchmark import ProgramMetrics, benchmark_settings, measure_program
+from build_cache import expected_outputs, find_executable, probe_versions
+from build_queue import FINISHED_STATES, SUCCEEDED, BuildQueue
+from build_runner import venv_environment
+from build_session import cache_manager_for, prepare_build_inputs
+from nuitka_options import build_nuitka_command, interpreter_path, merge_options, with_output_dir
+
+# Options the explorer can vary, with the values it tries
+AXES = {
+    'lto': (False, True),
+    'mode': ('standalone', 'onefile'),
+    'static_libpython': (False, True),
+    'python_flag_nosite': (False, True),
+    'clang': (False, True),
+    'optimization_level': (0, 1, 2),
+}
+
+_COMPRESSION_LABELS = {'max': 'zstd-22', 'fast': 'zstd-3', 'none': 'uncompressed'}
+
+# Smaller is better for every metric
+OBJECTIVES = ProgramMetrics.FIELDS
+
+
+class MatrixCancelled(Exception):
+    """Raised when an exploration is cancelled"""
+
+
+def _variant_overrides(axis, value):
+    if axis == 'mode':
+        return {'standalone': True, 'onefile': value == 'onefile'}
+    if axis in ('static_libpython', 'clang'):
+        return {'compilation': {axis: value}}
+    if axis == 'python_flag_nosite':
+        return {'module': {axis: value}}
+    if axis in ('onefile_extraction', 'onefile_compression'):
+        return {'onefile_startup': {axis.split('_', 1)[1]: value}}
+    return {axis: value}
+
+
+def describe_values(values):
+    """Return a short label such as 'lto=on mode=onefile O2'"""
+    parts = []
+    for axis, value in values.items():
+        if axis == 'optimization_level':
+            parts.append(f'O{value}')
+        elif axis == 'mode':
+            parts.append(value)
+        elif axis == 'onefile_extraction':
+            parts.append(f'{value} extraction')
+        elif axis == 'onefile_compression':
+            parts.append(_COMPRESSION_LABELS[value])
+        else:
+            parts.append(f"{axis}={'on' if value else 'off'}")
+    return ' '.join(parts)
+
+
+def combinations(base, axes, choices=None):
+    """Return (values, options) for every combination of the varied axes
+
+    choices maps each axis to the values it takes, AXES by default.
+    """
+    choices = choices or AXES
+    result = []
+    for picked in itertools.product(*(choices[axis] for axis in axes)):
+        values = dict(zip(axes, picked))
+        options = base
+        for axis, value in values.items():
+            options = merge_options(options, _variant_overrides(axis, value))
+        result.append((values, options))
+    return result
+
+
+def pareto_front(rows):
+    """Return the indexes of the rows no other row dominates
+
+    rows are dicts of objective -> number (None when not measured). Only
+    objectives measured for every row are compared.
+    """
+    objectives = [name for name in OBJECTIVES if rows and all(row.get(name) is not None for row in rows)]
+    front = []
+    for i, row in enumerate(rows):
+        dominated = False
+        for j, other in enumerate(rows):
+            if i == j:
+                continue
+            if all(other[name] <= row[name] for name in objectives) and \
+                    any(other[name] < row[name] for name in objectives):
+                dominated = True
+                break
+        if not dominated:
+            front.append(i)
+    return front
+
+
+class MatrixResult:
+    """One explored configuration"""
+
+    def __init__(self, values, options, output_dir):
+        self.values = values
+        self.options = options
+        self.output_dir = output_dir
+        self.label = describe_values(values)
+        self.build_seconds = None
+        self.error = None
+        self.metrics = None
+        self.pareto = False
+
+    def to_dict(self):
+        return {'values': self.values, 'options': self.options, 'output_dir': self.output_dir,
+                'build_seconds': self.build_seconds, 'error': self.error, 'pareto': self.pareto,
+                'metrics': self.metrics.to_dict() if self.metrics else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        result = cls(data['values'], data['options'], data['output_dir'])
+        result.build_seconds = data['build_seconds']
+        result.error = data['error']
+        result.pareto = data['pareto']
+        result.metrics = ProgramMetrics.from_dict(data['metrics']) if data['metrics'] else None
+        return result
+
+
+class OptionMatrix:
+    """Build, measure and rank the combinations of the varied options"""
+
+    # The axes that can be varied with their values, and the suffix of the folder the builds go to
+    choices = AXES
+    kind = 'matrix'
+
+    def __init__(self, options, axes, max_parallel=None, env=None):
+        unknown = set(axes) - set(self.choices)
+        if unknown:
+            raise ValueError(f"Cannot vary: {', '.join(sorted(unknown))}")
+        self.base = options
+        self.axes = [axis for axis in self.choices if axis in axes]
+        self.settings = benchmark_settings(options)
+        self.work_dir = results_folder(options, self.kind)
+        self.results_path = os.path.join(self.work_dir, 'results.json')
+        self.max_parallel = max_parallel
+        self.env = env
+        self.results = []
+        self._queue = None
+        self._cancelled = False
+        self._process = None
+
+    def cancel(self):
+        self._cancelled = True
+        if self._queue is not None:
+            self._queue.cancel_all()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _check_cancelled(self):
+        if self._cancelled:
+            raise MatrixCancelled("Option matrix cancelled")
+
+    def _on_start(self, process):
+        self._process = process
+
+    def _environment(self):
+        # The venv plus the compiler caches for its Nuitka version, shared by every build
+        venv_dir = self.base['venv'] if self.base['use_venv'] and self.base['venv'] else None
+        env = venv_environment(venv_dir)
+        cache_manager = cache_manager_for(self.base)
+        _python_version, nuitka_version = probe_versions(interpreter_path(self.base))
+        env.update(cache_manager.environment(cache_manager.scope_for(nuitka_version, venv_dir)))
+        return env
+
+    def build_all(self, progress=None):
+        """Build every combination, several at a time"""
+        env = self.env if self.env is not None else self._environment()
+        finished = threading.Event()
+        results = {}
+        done = set()
+        # Re-entrant: BuildQueue.add() reports the new item to on_update straight away
+        lock = threading.RLock()
+
+        def on_update(item):
+            with lock:
+                result = results.get(item.id)
+                if result is None or item.id in done or item.status not in FINISHED_STATES:
+                    return
+                done.add(item.id)
+                # Builds cancelled before they started have no result
+                outcome = item.result.describe() if item.result else item.status
+                result.build_seconds = item.result.elapsed if item.result else 0.0
+                if item.status != SUCCEEDED:
+                    result.error = f"Build {item.status}: {outcome}"
+                count = len(done)
+            if progress:
+                progress(f"Matrix: built {count}/{len(results)} ({result.label}: {outcome})")
+            if count == len(results):
+                finished.set()
+
+        # Every combination ships the same resources and Tcl/Tk, so one preparation serves them all
+        prepare_build_inputs(self.base, build_nuitka_command(self.base), progress)
+        self._queue = BuildQueue(max_parallel=self.max_parallel, on_update=on_update)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        for index, (values, options) in enumerate(combinations(self.base, self.axes, self.choices)):
+            output_dir = os.path.join(self.work_dir, str(index))
+            os.makedirs(output_dir)
+            cmd = with_output_dir(build_nuitka_command(options), output_dir)
+            result = MatrixResult(values, options, output_dir)
+            with lock:
+                item = self._queue.add(options['script'], cmd, cwd=output_dir, env=env, start=False)
+                results[item.id] = result
+            self.results.append(result)
+        if progress:
+            progress(f"Matrix: building {len(self.results)} configurations, "
+                     f"{self._queue.max_parallel} at a time...")
+        self._queue.schedule()
+        finished.wait()
+        self._check_cancelled()
+
+    def measure_all(self, progress=None):
+        """Measure each built program one at a time, so runs do not disturb each other"""
+        for index, result in enumerate(self.results):
+            self._check_cancelled()
+            if result.error:
+                continue
+            options = result.options
+            executable = find_executable(options['script'], result.output_dir, options['standalone'],
+                                         options['onefile'])
+            if executable is None:
+                result.error = "No executable produced"
+                continue
+            if progress:
+                progress(f"Matrix: measuring {index + 1}/{len(self.results)} ({result.label})...")
+            result.metrics = self.measure(result, executable)
+            if result.metrics.errors:
+                result.error = '; '.join(result.metrics.errors)
+
+        measured = [result for result in self.results if result.metrics and not result.error]
+        for i in pareto_front([result.metrics.to_dict() for result in measured]):
+            measured[i].pareto = True
+
+    def measure(self, result, executable):
+        """Return the ProgramMetrics of one built configuration"""
+        options = result.options
+        output = expected_outputs(options['script'], result.output_dir, options['standalone'],
+                                  options['onefile'])[0]
+        return measure_program(executable, output, self.settings, cwd=os.path.dirname(options['script']),
+                               on_start=self._on_start, check_cancelled=self._check_cancelled)
+
+    def run(self, progress=None):
+        """Build and measure every combination; returns the MatrixResults"""
+        self.build_all(progress)
+        self.measure_all(progress)
+        self.save()
+        return self.results
+
+    def save(self):
+        with open(self.results_path, 'w') as f:
+            json.dump({'axes': self.axes, 'results': [result.to_dict() for result in self.results]}, f, indent=1)
+
+
+def results_folder(options, kind='matrix'):
+    """Return the folder an exploration of a script builds in and keeps its results"""
+    script_dir = os.path.dirname(os.path.abspath(options['script']))
+    stem = os.path.splitext(os.path.basename(options['script']))[0]
+    return os.path.join(script_dir, f'{stem}.{kind}')
+
+
+def load_results(options, kind='matrix'):
+    """Return the MatrixResults of the last exploration of a script, or []"""
+    try:
+        with open(os.path.join(results_folder(options, kind), 'results.json'), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [MatrixResult.from_dict(item) for item in data['results']]
@@ -0,0 +1,262 @@
+"""
+Nuitkalicious - Profile-guided optimization
+Description: Builds a plain baseline and an instrumented binary, runs the
+instrumented one against the project's training commands, rebuilds with the
+collected profile fed to the C compiler and times both finished binaries on
+the same commands. Profile flags reach Nuitka's C compiler through the
+CCFLAGS/LDFLAGS environment variables, so any gcc or clang toolchain works.
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from build_cache import find_executable
+from build_session import BuildSession
+from nuitka_options import build_nuitka_command, with_output_dir
+
+
+class PgoError(Exception):
+    """Raised when a stage of the PGO pipeline cannot complete"""
+
+
+class PgoCancelled(PgoError):
+    """Raised when the pipeline is cancelled"""
+
+
+def pgo_toolchain(options):
+    """Return 'gcc' or 'clang' for the compiler these options build with"""
+    compilation = options.get('compilation', {})
+    if os.name == 'nt':
+        if compilation.get('mingw64'):
+            return 'gcc'
+        raise PgoError("PGO needs MinGW64 on Windows (tick MinGW64); MSVC profile builds are not supported")
+    if compilation.get('clang') or sys.platform == 'darwin':
+        return 'clang'
+    return 'gcc'
+
+
+def _profdata_tool():
+    # clang writes raw profiles that must be merged before they can be used
+    tool = shutil.which('llvm-profdata')
+    if tool:
+        return [tool]
+    if sys.platform == 'darwin' and shutil.which('xcrun'):
+        return ['xcrun', 'llvm-profdata']
+    raise PgoError("llvm-profdata not found; it is needed to merge clang profiles")
+
+
+def profile_environment(toolchain, stage, profile_dir, base_env=None):
+    """Return CCFLAGS/LDFLAGS for the 'generate' or 'use' stage"""
+    if stage == 'generate':
+        flags = [f'-fprofile-generate={profile_dir}']
+        if toolchain == 'gcc':
+            # Compiled programs may run threads
+            flags.append('-fprofile-update=prefer-atomic')
+    elif toolchain == 'gcc':
+        flags = [f'-fprofile-use={profile_dir}', '-fprofile-correction', '-Wno-missing-profile']
+    else:
+        flags = [f'-fprofile-use={os.path.join(profile_dir, "merged.profdata")}',
+                 '-Wno-profile-instr-unprofiled', '-Wno-profile-instr-out-of-date']
+    base_env = os.environ if base_env is None else base_env
+    env = {}
+    for name in ('CCFLAGS', 'LDFLAGS'):
+        env[name] = ' '.join(filter(None, [base_env.get(name, '')] + flags))
+    return env
+
+
+class PgoRun:
+    """One timed run of a binary"""
+
+    def __init__(self, args, returncode, elapsed, timed_out=False):
+        self.args = args
+        self.returncode = returncode
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+
+class PgoReport:
+    """Stage timings and the baseline vs PGO benchmark"""
+
+    def __init__(self):
+        self.stage_seconds = {}
+        self.training = []
+        # (command, best baseline seconds, best PGO seconds)
+        self.benchmark = []
+        self.executable = None
+
+    @property
+    def speedup(self):
+        baseline = sum(row[1] for row in self.benchmark)
+        optimized = sum(row[2] for row in self.benchmark)
+        return baseline / optimized if optimized else None
+
+    @property
+    def extra_build_seconds(self):
+        # What PGO costs on top of a normal build
+        return sum(self.stage_seconds.get(stage, 0) for stage in ('instrumented', 'training', 'optimized')) \
+            - self.stage_seconds.get('baseline', 0)
+
+    def lines(self):
+        result = [f"{stage}: {seconds:.1f}s" for stage, seconds in self.stage_seconds.items()]
+        for run in self.training:
+            outcome = 'timed out (no profile)' if run.timed_out else f"exit code {run.returncode}"
+            result.append(f"training '{shlex.join(run.args)}': {outcome} in {run.elapsed:.1f}s")
+        for command, baseline, optimized in self.benchmark:
+            result.append(f"'{command}': {baseline:.3f}s -> {optimized:.3f}s ({baseline / optimized:.2f}x)")
+        if self.speedup:
+            result.append(f"Speedup {self.speedup:.2f}x for {self.extra_build_seconds:.0f}s of extra build time")
+        return result
+
+
+class PgoPipeline:
+    """Baseline build, instrumented build, training, optimized build and benchmark"""
+
+    def __init__(self, options, cache_manager=None, inventory=None, work_dir=None):
+        self.options = options
+        settings = options['pgo']
+        self.training = [shlex.split(line, posix=os.name != 'nt') for line in settings['training']
+                         if line.strip()] or [[]]
+        self.timeout = float(settings['timeout'])
+        self.repeat = max(1, int(settings['repeat']))
+        self.toolchain = pgo_toolchain(options)
+        self.cache_manager = cache_manager
+        self.inventory = inventory
+        self.script_path = options['script']
+        self.output_dir = os.path.dirname(self.script_path)
+        stem = os.path.splitext(os.path.basename(self.script_path))[0]
+        self.work_dir = work_dir or os.path.join(self.output_dir, f'{stem}.pgo')
+        self.profile_dir = os.path.join(self.work_dir, 'profile')
+        self.baseline_dir = os.path.join(self.work_dir, 'baseline')
+        self.report = PgoReport()
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._session = None
+        self._process = None
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            session, process = self._session, self._process
+        if session is not None:
+            session.cancel()
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _check_cancelled(self):
+        if self._cancelled:
+            raise PgoCancelled("PGO build cancelled")
+
+    def _build(self, stage, output_dir, env, progress, on_output):
+        self._check_cancelled()
+        if progress:
+            progress(f"PGO: {stage} build...")
+        os.makedirs(output_dir, exist_ok=True)
+        cmd = with_output_dir(build_nuitka_command(self.options), output_dir)
+        # No build cache: the profile flags live in the environment, not the command.
+        # No RAM staging: gcc finds each .gcda by the object's full path, which must not move
+        session = BuildSession(self.options, cmd=cmd, cache_manager=self.cache_manager,
+                               inventory=self.inventory, output_dir=output_dir, env=env, stage=False)
+        session.prepare(progress)
+        with self._lock:
+            self._session = session
+        self._check_cancelled()
+        session.start(on_output)
+        result = session.wait()
+        with self._lock:
+            self._session = None
+        session.finish(result.success, progress)
+        self._check_cancelled()
+        if not result.success:
+            raise PgoError(f"The {stage} build failed: {result.describe()}")
+        self.report.stage_seconds[stage] = result.elapsed
+        executable = find_executable(self.script_path, output_dir, self.options['standalone'],
+                                     self.options['onefile'])
+        if executable is None:
+            raise PgoError(f"The {stage} build produced no executable in {output_dir}")
+        return executable
+
+    def _execute(self, executable, args, timeout=None):
+        # Output is discarded: it would only distort the timings
+        self._check_cancelled()
+        start = time.perf_counter()
+        process = subprocess.Popen([executable] + args, cwd=self.output_dir, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with self._lock:
+            self._process = process
+        try:
+            returncode = process.wait(timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            process.kill()
+            returncode = process.wait()
+            timed_out = True
+        with self._lock:
+            self._process = None
+        self._check_cancelled()
+        return PgoRun(args, returncode, time.perf_counter() - start, timed_out)
+
+    def _has_profile(self):
+        suffix = '.gcda' if self.toolchain == 'gcc' else '.profraw'
+        for _directory, _dirnames, filenames in os.walk(self.profile_dir):
+            if any(name.endswith(suffix) for name in filenames):
+                return True
+        return False
+
+    def run(self, progress=None, on_output=None):
+        """Run every stage and return the PgoReport; raises PgoError or PgoCancelled"""
+        if self.toolchain == 'clang':
+            merge_tool = _profdata_tool()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        os.makedirs(self.profile_dir)
+
+        baseline = self._build('baseline', self.baseline_dir, {}, progress, on_output)
+        # The instrumented and optimized builds share an output folder so the
+        # compiler finds each object's profile under the same path
+        instrumented = self._build('instrumented', self.output_dir,
+                                   profile_environment(self.toolchain, 'generate', self.profile_dir),
+                                   progress, on_output)
+
+        started = time.perf_counter()
+        for args in self.training:
+            if progress:
+                progress(f"PGO: training run '{shlex.join(args)}'...")
+            self.report.training.append(self._execute(instrumented, args, self.timeout))
+        if not self._has_profile():
+            raise PgoError("The training runs wrote no profile data (did they all time out?)")
+        if self.toolchain == 'clang':
+            raw = [os.path.join(self.profile_dir, name) for name in os.listdir(self.profile_dir)
+                   if name.endswith('.profraw')]
+            result = subprocess.run(merge_tool + ['merge', '-output',
+                                                  os.path.join(self.profile_dir, 'merged.profdata')] + raw,
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                raise PgoError(f"llvm-profdata merge failed: {result.stderr.strip()[-500:]}")
+        self.report.stage_seconds['training'] = time.perf_counter() - started
+
+        optimized = self._build('optimized', self.output_dir,
+                                profile_environment(self.toolchain, 'use', self.profile_dir),
+                                progress, on_output)
+        self.report.executable = optimized
+
+        started = time.perf_counter()
+        for args in self.training:
+            if progress:
+                progress(f"PGO: timing '{shlex.join(args)}' ({self.repeat}x each)...")
+            best_baseline = best_optimized = None
+            # Alternate the two binaries so drift in machine load hits both alike
+            for _ in range(self.repeat):
+                run = self._execute(baseline, args, self.timeout)
+                if not run.timed_out:
+                    best_baseline = min(best_baseline or run.elapsed, run.elapsed)
+                run = self._execute(optimized, args, self.timeout)
+                if not run.timed_out:
+                    best_optimized = min(best_optimized or run.elapsed, run.elapsed)
+            if best_baseline and best_optimized:
+                self.report.benchmark.append((shlex.join(args), best_baseline, best_optimized))
+        self.report.stage_seconds['benchmark'] = time.perf_counter() - started
+        return self.report
@@ -0,0 +1,186 @@
+"""
+Nuitkalicious - Process tree sampling
+Description: Minimal, dependency-optional view of a build's process tree
+(Nuitka, scons and the C compilers) and of system memory. Uses psutil when it
+is installed and falls back to /proc on Linux.
+"""
+
+import os
+import signal
+import sys
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class ProcessSample:
+    """Point-in-time numbers for one process"""
+
+    def __init__(self, pid, ppid, name, rss=0, cpu_time=0.0, read_bytes=0, write_bytes=0, create_time=0.0,
+                 children_cpu_time=0.0):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.rss = rss
+        self.cpu_time = cpu_time
+        # CPU time of exited children this process has waited for
+        self.children_cpu_time = children_cpu_time
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+        self.create_time = create_time
+
+
+def supported():
+    """True when process trees can be sampled on this machine"""
+    return psutil is not None or os.path.isdir('/proc/self')
+
+
+def _read_proc(pid):
+    # Parse /proc/<pid>/stat, statm and io into a ProcessSample
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read().decode('utf-8', 'replace')
+    except OSError:
+        return None
+    # The command name is in parentheses and may itself contain spaces
+    name = stat[stat.index('(') + 1:stat.rindex(')')]
+    fields = stat[stat.rindex(')') + 2:].split()
+    ppid = int(fields[1])
+    cpu_time = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    children_cpu_time = (int(fields[13]) + int(fields[14])) / _CLOCK_TICKS
+    start_ticks = int(fields[19])
+    rss = int(fields[21]) * _PAGE_SIZE
+
+    read_bytes = write_bytes = 0
+    try:
+        with open(f'/proc/{pid}/io', 'r') as f:
+            for line in f:
+                key, _sep, value = line.partition(':')
+                if key == 'read_bytes':
+                    read_bytes = int(value)
+                elif key == 'write_bytes':
+                    write_bytes = int(value)
+    except (OSError, ValueError):
+        pass
+    return ProcessSample(pid, ppid, name, rss, cpu_time, read_bytes, write_bytes,
+                         start_ticks / _CLOCK_TICKS, children_cpu_time)
+
+
+def process_tree(root_pid):
+    """Return ProcessSamples for root_pid and all of its descendants"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+        samples = []
+        for process in processes:
+            try:
+                with process.oneshot():
+                    cpu = process.cpu_times()
+                    try:
+                        io = process.io_counters()
+                        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+                    except (psutil.Error, AttributeError):
+                        read_bytes = write_bytes = 0
+                    samples.append(ProcessSample(
+                        process.pid, process.ppid(), process.name(), process.memory_info().rss,
+                        cpu.user + cpu.system, read_bytes, write_bytes, process.create_time(),
+                        getattr(cpu, 'children_user', 0.0) + getattr(cpu, 'children_system', 0.0)))
+            except psutil.Error:
+                continue
+        return samples
+
+    if not os.path.isdir('/proc/self'):
+        return []
+    all_samples = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            sample = _read_proc(int(entry))
+            if sample is not None:
+                all_samples[sample.pid] = sample
+    children = {}
+    for sample in all_samples.values():
+        children.setdefault(sample.ppid, []).append(sample.pid)
+    result = []
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        if pid in all_samples:
+            result.append(all_samples[pid])
+            pending.extend(children.get(pid, []))
+    return result
+
+
+def memory_status():
+    """Return (total_bytes, available_bytes), or (None, None) if unknown"""
+    if psutil is not None:
+        memory = psutil.virtual_memory()
+        return memory.total, memory.available
+
+    if os.path.exists('/proc/meminfo'):
+        values = {}
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, _sep, value = line.partition(':')
+                parts = value.split()
+                if parts and parts[0].isdigit():
+                    values[key] = int(parts[0]) * 1024
+        available = values.get('MemAvailable', values.get('MemFree', 0) + values.get('Cached', 0))
+        return values.get('MemTotal'), available
+
+    if sys.platform == 'win32':
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys, status.ullAvailPhys
+    return None, None
+
+
+def suspend(pid):
+    """Pause a process; returns False where that is not possible"""
+    if psutil is not None:
+        try:
+            psutil.Process(pid).suspend()
+            return True
+        except psutil.Error:
+            return False
+    if hasattr(signal, 'SIGSTOP'):
+        try:
+            os.kill(pid, signal.SIGSTOP)
+            return True
+        except OSError:
+            return False
+    return False
+
+
+def resume(pid):
+    """Resume a process paused with suspend()"""
+    if psutil is not None:
+        try:
+            psutil.Process(pid).resume()
+            return True
+        except psutil.Error:
+            return False
+    if hasattr(signal, 'SIGCONT'):
+        try:
+            os.kill(pid, signal.SIGCONT)
+            return True
+        except OSError:
+            return False
+    return False
@@ -0,0 +1,176 @@
+"""
+Nuitkalicious - Project files
+Description: Load and save build options as nuitkalicious.toml or as a
+[tool.nuitkalicious] table in pyproject.toml, so desktop and CI builds use
+identical settings. Paths are stored relative to the project file.
+"""
+
+import os
+import re
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from nuitka_options import ONEFILE_COMPRESSION, ONEFILE_EXTRACTION, default_options, merge_options
+
+PROJECT_FILE = 'nuitkalicious.toml'
+PYPROJECT_FILE = 'pyproject.toml'
+PATH_KEYS = ('script', 'venv', 'icon')
+
+
+class ProjectError(Exception):
+    """Raised when a project file is missing, unreadable or invalid"""
+
+
+def find_project_file(start_dir):
+    """Return the nearest nuitkalicious.toml or pyproject.toml with a [tool.nuitkalicious] table"""
+    directory = os.path.abspath(start_dir)
+    while True:
+        candidate = os.path.join(directory, PROJECT_FILE)
+        if os.path.isfile(candidate):
+            return candidate
+        pyproject = os.path.join(directory, PYPROJECT_FILE)
+        if os.path.isfile(pyproject):
+            with open(pyproject, 'r', encoding='utf-8') as f:
+                if re.search(r'^\[tool\.nuitkalicious[\].]', f.read(), re.MULTILINE):
+                    return pyproject
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _resolve_paths(options, base_dir):
+    for key in PATH_KEYS:
+        if options.get(key):
+            options[key] = os.path.normpath(os.path.join(base_dir, options[key]))
+    options['resources'] = [os.path.normpath(os.path.join(base_dir, path))
+                            for path in options.get('resources', [])]
+    for key in ('shared_dir', 'compiler_dir'):
+        if options['cache'].get(key):
+            options['cache'][key] = os.path.normpath(os.path.join(base_dir, options['cache'][key]))
+    return options
+
+
+def _relative(path, base_dir):
+    if not path:
+        return path
+    try:
+        return os.path.relpath(path, base_dir).replace(os.sep, '/')
+    except ValueError:
+        # Different drive on Windows - keep it absolute
+        return path
+
+
+def load_project(path):
+    """Return the options stored in a project file, with absolute paths"""
+    if tomllib is None:
+        raise ProjectError("Reading project files needs Python 3.11+ or the 'tomli' package")
+    try:
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    except OSError as e:
+        raise ProjectError(f"Cannot read {path}: {e}")
+    except tomllib.TOMLDecodeError as e:
+        raise ProjectError(f"Invalid TOML in {path}: {e}")
+
+    if os.path.basename(path) == PYPROJECT_FILE:
+        data = data.get('tool', {}).get('nuitkalicious')
+        if data is None:
+            raise ProjectError(f"{path} has no [tool.nuitkalicious] table")
+
+    unknown = set(data) - set(default_options())
+    if unknown:
+        raise ProjectError(f"Unknown option(s) in {path}: {', '.join(sorted(unknown))}")
+    options = merge_options(default_options(), data)
+    onefile = options['onefile_startup']
+    if onefile['extraction'] not in ONEFILE_EXTRACTION:
+        raise ProjectError(f"Unknown onefile extraction {onefile['extraction']!r} in {path}; "
+                           f"use {' or '.join(ONEFILE_EXTRACTION)}")
+    if onefile['compression'] not in ONEFILE_COMPRESSION:
+        raise ProjectError(f"Unknown onefile compression {onefile['compression']!r} in {path}; "
+                           f"use {', '.join(ONEFILE_COMPRESSION)}")
+    return _resolve_paths(options, os.path.dirname(os.path.abspath(path)))
+
+
+# Minimal TOML writer - the standard library can read TOML but not write it
+def _toml_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_toml_value(item) for item in value) + ']'
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _toml_key(key):
+    return key if re.fullmatch(r'[A-Za-z0-9_-]+', key) else _toml_value(key)
+
+
+def _toml_tables(data, prefix):
+    # Scalars first, then one [table] per nested dict
+    lines = []
+    scalars = [(k, v) for k, v in data.items() if not isinstance(v, dict)]
+    tables = [(k, v) for k, v in data.items() if isinstance(v, dict)]
+    if scalars or not tables:
+        lines.append(f'[{prefix}]')
+        lines.extend(f'{_toml_key(k)} = {_toml_value(v)}' for k, v in scalars)
+        lines.append('')
+    for key, value in tables:
+        lines.extend(_toml_tables(value, f'{prefix}.{_toml_key(key)}'))
+    return lines
+
+
+def dumps_options(options, base_dir, table_prefix=None):
+    """Return options as TOML text with paths relative to base_dir"""
+    data = merge_options(options, {})
+    for key in PATH_KEYS:
+        data[key] = _relative(data.get(key), base_dir)
+    data['resources'] = [_relative(path, base_dir) for path in data.get('resources', [])]
+    for key in ('shared_dir', 'compiler_dir'):
+        data['cache'][key] = _relative(data['cache'].get(key), base_dir)
+
+    if table_prefix:
+        return '\n'.join(_toml_tables(data, table_prefix))
+
+    lines = [f'{_toml_key(k)} = {_toml_value(v)}' for k, v in data.items() if not isinstance(v, dict)]
+    lines.append('')
+    for key, value in data.items():
+        if isinstance(value, dict):
+            lines.extend(_toml_tables(value, _toml_key(key)))
+    return '\n'.join(lines)
+
+
+def save_project(path, options):
+    """Write options to nuitkalicious.toml, or into pyproject.toml's [tool.nuitkalicious]"""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    if os.path.basename(path) != PYPROJECT_FILE:
+        text = "# Nuitkalicious project - shared by the GUI and nuitkalicious_cli.py\n"
+        text += dumps_options(options, base_dir)
+    else:
+        existing = ''
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                existing = f.read()
+        # Drop the old [tool.nuitkalicious...] tables and keep everything else
+        kept = []
+        skipping = False
+        for line in existing.splitlines():
+            header = re.match(r'^\s*\[+([^\]]+)\]+', line)
+            if header:
+                skipping = re.fullmatch(r'\s*tool\.nuitkalicious(\..*)?\s*', header.group(1)) is not None
+            if not skipping:
+                kept.append(line)
+        text = '\n'.join(kept).rstrip() + '\n\n' if kept else ''
+        text += dumps_options(options, base_dir, 'tool.nuitkalicious')
+
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(text.rstrip() + '\n')
+    os.replace(path + '.tmp', path)
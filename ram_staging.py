@@ -0,0 +1,171 @@
+"""
+Nuitkalicious - RAM-disk build staging
+Description: Runs Nuitka with its output folder on a RAM disk (tmpfs such as
+/dev/shm, or a configured folder), so the tens of thousands of generated C and
+object files in <script>.build never touch a slow or network disk. Only the
+finished program is moved to the real output folder; the rest of the tree is
+unlinked on a background thread. The size each script's build tree reached
+last time decides whether the next build fits.
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+import uuid
+
+from app_paths import app_data_dir
+from build_cache import expected_outputs, path_size
+from process_tree import memory_status
+
+# Tried in order when no folder is configured
+DEFAULT_RAM_DIRS = ('/dev/shm',) if sys.platform.startswith('linux') else ()
+# Assumed for a script's first staged build, before its tree was ever measured
+DEFAULT_ESTIMATE = 1024 ** 3
+# Headroom over the last measured tree, for growth since
+ESTIMATE_MARGIN = 1.25
+_PREFIX = 'nuitkalicious-'
+
+
+class StagingError(Exception):
+    """Raised when the finished program cannot be moved off the RAM disk"""
+
+
+def ram_root(settings):
+    """Return the RAM-disk folder to stage in, or None when there is none"""
+    candidates = [settings['dir']] if settings['dir'] else DEFAULT_RAM_DIRS
+    return next((path for path in candidates if os.path.isdir(path) and os.access(path, os.W_OK)), None)
+
+
+class StagingSizes:
+    """Size of each script's last staged build tree, kept under the app data folder"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), 'ram_staging.json')
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def estimate(self, script_path):
+        """Return the bytes the next build of a script is expected to need"""
+        size = self.load().get(os.path.abspath(script_path))
+        return int(size * ESTIMATE_MARGIN) if size else DEFAULT_ESTIMATE
+
+    def record(self, script_path, size):
+        data = self.load()
+        data[os.path.abspath(script_path)] = size
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(data, f, indent=1)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        import ctypes
+
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def sweep_stale(root):
+    """Remove staging folders whose Nuitkalicious process is gone, e.g. after a crash
+
+    RAM disks hold on to memory until their files are deleted, so nothing may linger.
+    """
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        if not entry.name.startswith(_PREFIX) or not entry.is_dir(follow_symlinks=False):
+            continue
+        pid = entry.name[len(_PREFIX):].split('-', 1)[0]
+        if pid.isdigit() and not _process_alive(int(pid)):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class RamStage:
+    """The output folder of one build, on a RAM disk"""
+
+    def __init__(self, root, script_path):
+        self.script_path = script_path
+        stem = os.path.splitext(os.path.basename(script_path))[0]
+        # The pid lets sweep_stale() tell a running build's folder from a leftover
+        self.folder = os.path.join(root, f'{_PREFIX}{os.getpid()}-{stem}-{uuid.uuid4().hex[:8]}')
+        os.makedirs(self.folder)
+        self.build_dir = os.path.join(self.folder, f'{stem}.build')
+
+    def size(self):
+        return path_size(self.folder)
+
+    def copy_back(self, output_dir, standalone, onefile):
+        """Move the finished program into output_dir, replacing the previous one; returns the paths"""
+        moved = []
+        for source, target in zip(expected_outputs(self.script_path, self.folder, standalone, onefile),
+                                  expected_outputs(self.script_path, output_dir, standalone, onefile)):
+            if not os.path.exists(source):
+                continue
+            try:
+                if os.path.isdir(target):
+                    shutil.rmtree(target)
+                elif os.path.exists(target):
+                    os.remove(target)
+                # A copy, as the RAM disk is another file system
+                shutil.move(source, target)
+            except OSError as e:
+                raise StagingError(f"Could not move {os.path.basename(source)} to {output_dir}: {str(e)}; "
+                                   f"it is still in {self.folder}")
+            moved.append(target)
+        return moved
+
+    def discard(self):
+        """Unlink the staged tree on a background thread; returns the thread"""
+        # Not a daemon: a command-line build waits for it at exit rather than leave memory in use
+        thread = threading.Thread(target=shutil.rmtree, args=(self.folder, True), name='ram-staging-cleanup')
+        thread.start()
+        return thread
+
+
+def plan_stage(options):
+    """Return (RamStage, note) when the build fits on the RAM disk, else (None, why not)"""
+    settings = options['ram_staging']
+    root = ram_root(settings)
+    if root is None:
+        where = settings['dir'] or 'no default RAM disk on this system'
+        return None, f"RAM-disk staging skipped: {where} is not a writable folder"
+    sweep_stale(root)
+    needed = StagingSizes().estimate(options['script'])
+    try:
+        reserve = int(float(settings['reserve_mb']) * 1024 ** 2)
+    except (TypeError, ValueError):
+        reserve = 0
+    mb = 1024 ** 2
+    free = shutil.disk_usage(root).free
+    if free - needed < reserve:
+        return None, (f"RAM-disk staging skipped: the build needs about {needed / mb:.0f} MB and {root} has "
+                      f"{free / mb:.0f} MB free, {reserve / mb:.0f} MB of which must stay free; building on disk")
+    # tmpfs pages are memory the compilers then cannot use
+    _total, available = memory_status()
+    if available is not None and available - needed < reserve:
+        return None, (f"RAM-disk staging skipped: the build needs about {needed / mb:.0f} MB and only "
+                      f"{available / mb:.0f} MB of memory is available; building on disk")
+    stage = RamStage(root, options['script'])
+    return stage, f"Staging the build in {stage.folder} (about {needed / mb:.0f} MB of {free / mb:.0f} MB free)"
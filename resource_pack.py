@@ -0,0 +1,201 @@
+"""
+Nuitkalicious - Resource pack builder
+Description: Bundles a project's resource files into one archive with an
+offset index, so a build includes a single data file instead of one
+--include-data-file per resource. Entries are optionally zlib-compressed.
+Updates are incremental: unchanged entries stay where they are, changed ones
+are appended and the index rewritten, and the pack is only compacted once
+too much of it is dead space. Programs read it with nuitkalicious_resources.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import zlib
+
+from nuitkalicious_resources import HEADER, MAGIC, RAW, TRAILER, ZLIB, PackFormatError, read_index
+
+ACCESSOR_MODULE = 'nuitkalicious_resources'
+# Formats that are compressed already; zlib would only cost time
+STORED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.zip', '.gz', '.bz2', '.xz', '.7z',
+                     '.mp3', '.mp4', '.ogg', '.flac', '.woff', '.woff2', '.whl', '.jar'}
+# Entries smaller than this are stored as they are
+MIN_COMPRESS = 256
+# Compact once dead space is this share of the pack's data
+COMPACT_RATIO = 0.5
+
+
+class PackError(Exception):
+    """Raised when the resource files cannot be packed"""
+
+
+class PackResult:
+    """What one update did to the pack"""
+
+    def __init__(self, path):
+        self.path = path
+        self.written = 0
+        self.reused = 0
+        self.removed = 0
+        self.compacted = False
+        self.size = 0
+
+    def describe(self):
+        if not (self.written or self.removed):
+            return f"Resource pack up to date ({self.reused} entries)"
+        how = "rebuilt" if self.compacted else "updated"
+        return (f"Resource pack {how}: {self.written} written, {self.reused} unchanged, {self.removed} removed, "
+                f"{self.size / 1024 ** 2:.1f} MB")
+
+
+def pack_path(script_path):
+    """Return the pack built for a script; it is named PACK_NAME inside the program"""
+    return os.path.splitext(os.path.abspath(script_path))[0] + '.respack'
+
+
+def packed_resources(resources):
+    """Return {entry name: source path}; entries are named after the file, as with separate data files"""
+    names = {}
+    for source in resources:
+        # .ico files are the program icon, which Nuitka handles on its own
+        if source.lower().endswith('.ico'):
+            continue
+        name = os.path.basename(source)
+        if name in names and os.path.abspath(names[name]) != os.path.abspath(source):
+            raise PackError(f"Two resource files are both named {name}: {names[name]} and {source}")
+        names[name] = source
+    return names
+
+
+def install_accessor(script_dir):
+    """Copy the runtime reader next to the script, where the program imports it"""
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), ACCESSOR_MODULE + '.py')
+    target = os.path.join(script_dir, ACCESSOR_MODULE + '.py')
+    if os.path.abspath(source) == os.path.abspath(target):
+        return target
+    with open(source, 'rb') as f:
+        wanted = f.read()
+    try:
+        with open(target, 'rb') as f:
+            if f.read() == wanted:
+                return target
+    except OSError:
+        pass
+    shutil.copyfile(source, target)
+    return target
+
+
+def _encode(source, compress):
+    with open(source, 'rb') as f:
+        data = f.read()
+    if compress and len(data) >= MIN_COMPRESS and os.path.splitext(source)[1].lower() not in STORED_EXTENSIONS:
+        packed = zlib.compress(data, 6)
+        if len(packed) < len(data) * 0.9:
+            return packed, len(data), ZLIB
+    return data, len(data), RAW
+
+
+def _read_old(path):
+    # Returns (index, data end) of an existing pack, or (None, None) when there is none to reuse
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return read_index(data)
+    except (OSError, ValueError, PackFormatError):
+        return None, None
+
+
+def _finish(f, index):
+    offset = f.tell()
+    encoded = json.dumps(index, separators=(',', ':')).encode('utf-8')
+    f.write(encoded)
+    f.write(TRAILER.pack(offset, len(encoded), MAGIC))
+    f.truncate()
+    return f.tell()
+
+
+def update_pack(resources, path, compress=True, check_cancelled=None):
+    """Bring the pack at path in line with the resource files; returns a PackResult"""
+    sources = packed_resources(resources)
+    result = PackResult(path)
+    stats = {}
+    for name, source in sources.items():
+        try:
+            stat = os.stat(source)
+        except OSError as e:
+            raise PackError(f"Cannot read resource {source}: {e}")
+        stats[name] = (stat.st_mtime_ns, stat.st_size)
+
+    old, data_end = _read_old(path)
+    if old is not None and old.get('compress') != compress:
+        # Entries were encoded for the other setting
+        old = None
+    old_entries = old['entries'] if old else {}
+    kept = {name: entry for name, entry in old_entries.items()
+            if name in stats and (entry[4], entry[2]) == stats[name]}
+    changed = [name for name in sources if name not in kept]
+    result.reused = len(kept)
+    result.removed = len(set(old_entries) - set(sources))
+    if old is not None and not changed and not result.removed:
+        result.size = os.path.getsize(path)
+        return result
+
+    live = sum(entry[1] for entry in kept.values())
+    dead = (data_end - len(HEADER) - live) if old is not None else 0
+    entries = dict(kept)
+    if old is not None and dead <= COMPACT_RATIO * max(live, 1):
+        # Append the changed entries where the old index was; unchanged ones stay put
+        with open(path, 'r+b') as f:
+            f.seek(data_end)
+            for name in changed:
+                if check_cancelled:
+                    check_cancelled()
+                data, size, method = _encode(sources[name], compress)
+                entries[name] = [f.tell(), len(data), size, method, stats[name][0]]
+                f.write(data)
+            result.size = _finish(f, {'compress': compress, 'entries': entries})
+        result.written = len(changed)
+        return result
+
+    # Fresh or compacted pack, written aside and swapped in
+    result.compacted = old is not None
+    temporary = path + '.tmp'
+    old_file = open(path, 'rb') if kept else None
+    try:
+        with open(temporary, 'wb') as f:
+            f.write(HEADER)
+            for name in sources:
+                if check_cancelled:
+                    check_cancelled()
+                if name in kept:
+                    offset, stored, size, method, mtime = kept[name]
+                    old_file.seek(offset)
+                    data = old_file.read(stored)
+                else:
+                    data, size, method = _encode(sources[name], compress)
+                    mtime = stats[name][0]
+                    result.written += 1
+                entries[name] = [f.tell(), len(data), size, method, mtime]
+                f.write(data)
+            result.size = _finish(f, {'compress': compress, 'entries': entries})
+    finally:
+        if old_file is not None:
+            old_file.close()
+    os.replace(temporary, path)
+    result.reused = len(kept)
+    return result
+
+
+def prepare_pack(options, progress=None, check_cancelled=None):
+    """Build or update the script's resource pack when packing is on; returns a PackResult or None"""
+    settings = options['resource_pack']
+    if not settings['enabled'] or not packed_resources(options['resources']):
+        return None
+    script = options['script']
+    install_accessor(os.path.dirname(os.path.abspath(script)))
+    if progress:
+        progress("Packing resources...")
+    result = update_pack(options['resources'], pack_path(script), settings['compress'], check_cancelled)
+    if progress:
+        progress(result.describe())
+    return result
@@ -0,0 +1,178 @@
+"""
+Nuitkalicious - Post-build smoke benchmark
+Description: Runs a freshly built program with the [benchmark] settings to
+check that it starts at all, then compares its startup time, output size and
+peak memory with the baseline stored for the script. Startup or size growth
+past the configured thresholds marks the build as a regression. The first
+measured build becomes the baseline; later ones only replace it when accepted.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from app_paths import app_data_dir
+from benchmark import ProgramMetrics, benchmark_settings, measure_program
+from build_cache import expected_outputs, find_executable
+
+# Startup changes smaller than this are noise, whatever the percentage
+MIN_STARTUP_DELTA = 0.01
+# Runs kept per script for the history
+HISTORY_LIMIT = 50
+
+
+class SmokeTestError(Exception):
+    """Raised when there is no program to smoke test"""
+
+
+def _percent(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+class SmokeResult:
+    """The smoke test of one build, compared with the stored baseline"""
+
+    def __init__(self, metrics, baseline=None, command_changed=False):
+        self.metrics = metrics
+        # ProgramMetrics of the baseline, None for the first measured build
+        self.baseline = baseline
+        self.command_changed = command_changed
+        self.regressions = []
+
+    @property
+    def failed(self):
+        # The program did not start, or did not exit cleanly / reach the ready line
+        return bool(self.metrics.errors)
+
+    @property
+    def regressed(self):
+        return bool(self.regressions)
+
+    def headline(self):
+        if self.failed:
+            return f"Smoke test failed: {'; '.join(self.metrics.errors)}"
+        if self.regressed:
+            return f"Regression: {'; '.join(self.regressions)}"
+        if self.baseline is None:
+            return f"Smoke test passed; stored as the baseline ({self.metrics.warm_start * 1000:.0f} ms startup)"
+        return f"Smoke test passed ({self.metrics.warm_start * 1000:.0f} ms startup)"
+
+    def lines(self):
+        result = [self.headline()]
+        if self.failed:
+            return result
+        rows = (("Startup (warm)", 'warm_start', 1000, 'ms'), ("Startup (cold)", 'cold_start', 1000, 'ms'),
+                ("Peak RSS", 'peak_rss', 1 / 1024 ** 2, 'MB'), ("Size", 'size', 1 / 1024 ** 2, 'MB'))
+        for label, field, scale, unit in rows:
+            value = getattr(self.metrics, field)
+            if value is None:
+                continue
+            line = f"{label}: {value * scale:.1f} {unit}"
+            old = getattr(self.baseline, field) if self.baseline else None
+            if old:
+                line += f" (baseline {old * scale:.1f} {unit}, {_percent(old, value):+.1f}%)"
+            result.append(line)
+        if self.command_changed:
+            result.append("The Nuitka command changed since the baseline; accept this build to compare "
+                          "against it from now on")
+        return result
+
+
+def compare(metrics, baseline, settings):
+    """Return the regressions of metrics against a baseline, as messages"""
+    regressions = []
+    if metrics.warm_start is not None and baseline.warm_start:
+        growth = _percent(baseline.warm_start, metrics.warm_start)
+        if growth > settings['startup_threshold_pct'] and \
+                metrics.warm_start - baseline.warm_start > MIN_STARTUP_DELTA:
+            regressions.append(f"startup {baseline.warm_start * 1000:.0f} -> {metrics.warm_start * 1000:.0f} ms "
+                               f"(+{growth:.0f}%)")
+    if metrics.size is not None and baseline.size:
+        growth = _percent(baseline.size, metrics.size)
+        if growth > settings['size_threshold_pct']:
+            regressions.append(f"size {baseline.size / 1024 ** 2:.1f} -> {metrics.size / 1024 ** 2:.1f} MB "
+                               f"(+{growth:.0f}%)")
+    return regressions
+
+
+class BaselineStore:
+    """Smoke-test baseline and history of one script, kept under the app data folder"""
+
+    def __init__(self, script_path, root=None):
+        self.script_path = os.path.abspath(script_path)
+        key = hashlib.sha256(os.path.normcase(self.script_path).encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(root or app_data_dir('baselines'), f'{key}.json')
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'script': self.script_path, 'baseline': None, 'history': []}
+
+    def _save(self, data):
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(data, f, indent=1)
+        os.replace(self.path + '.tmp', self.path)
+
+    def baseline(self):
+        """Return (ProgramMetrics, command) of the baseline, or (None, None)"""
+        baseline = self.load()['baseline']
+        if not baseline:
+            return None, None
+        return ProgramMetrics.from_dict(baseline['metrics']), baseline['command']
+
+    def record(self, metrics, command, regressions, make_baseline=False):
+        """Add a run to the history, optionally making it the baseline"""
+        data = self.load()
+        entry = {'time': time.time(), 'command': command, 'metrics': metrics.to_dict(),
+                 'regressions': regressions}
+        data['history'] = (data['history'] + [entry])[-HISTORY_LIMIT:]
+        if make_baseline:
+            data['baseline'] = entry
+        self._save(data)
+
+    def accept_last(self):
+        """Make the last recorded run the baseline; returns it, or None when there is none"""
+        data = self.load()
+        runs = [entry for entry in data['history'] if not entry['metrics']['errors']]
+        if not runs:
+            return None
+        data['baseline'] = runs[-1]
+        self._save(data)
+        return runs[-1]
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def run_smoke_test(options, output_dir, command, check_cancelled=None, on_start=None, store=None):
+    """Measure the program a build produced and compare it with the baseline
+
+    command is the Nuitka command of the build; a baseline taken with a
+    different command is still compared, but the result says so. Returns a
+    SmokeResult; raises SmokeTestError when the build left no program.
+    """
+    script = options['script']
+    executable = find_executable(script, output_dir, options['standalone'], options['onefile'])
+    if executable is None:
+        raise SmokeTestError(f"No program to smoke test in {output_dir}")
+    output = expected_outputs(script, output_dir, options['standalone'], options['onefile'])[0]
+    settings = benchmark_settings(options)
+    # The benchmark command can take long; it is left to the option-matrix explorer
+    settings['command'] = ''
+    metrics = measure_program(executable, output, settings, cwd=os.path.dirname(os.path.abspath(script)),
+                              on_start=on_start, check_cancelled=check_cancelled)
+
+    store = store or BaselineStore(script)
+    baseline, baseline_command = store.baseline()
+    command = list(command)
+    result = SmokeResult(metrics, baseline, baseline is not None and baseline_command != command)
+    if baseline is not None and not result.failed:
+        result.regressions = compare(metrics, baseline, settings)
+    store.record(metrics, command, result.regressions, make_baseline=baseline is None and not result.failed)
+    return result
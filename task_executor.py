@@ -0,0 +1,193 @@
+"""
+Nuitkalicious - Background task executor
+Description: Thread pool for blocking subprocess and filesystem work. Workers
+never touch Tk; they post progress, results and errors onto a thread-safe
+queue which the Tk main loop drains.
+"""
+
+import itertools
+import os
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker when its task has been cancelled"""
+
+
+class Task:
+    """Handle passed to a worker function and returned to the caller"""
+
+    def __init__(self, executor, task_id, name):
+        self.executor = executor
+        self.id = task_id
+        self.name = name
+        self.done = False
+        self._cancel_event = threading.Event()
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation; workers see it via cancelled/check_cancelled"""
+        with self._lock:
+            if self.done or self._cancel_event.is_set():
+                return
+            self._cancel_event.set()
+            callbacks = list(self._cancel_callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback):
+        """Register a callback (e.g. terminating a process) run on cancellation"""
+        with self._lock:
+            if not self._cancel_event.is_set():
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise TaskCancelled(self.name)
+
+    def report_progress(self, message=None, fraction=None):
+        """Post a progress update to the Tk thread"""
+        self.executor._post('progress', self, (message, fraction))
+
+
+class TaskExecutor:
+    """Run callables on a thread pool and deliver their outcome on the Tk thread
+
+    on_done(result), on_error(exception), on_progress(message, fraction) and
+    on_cancelled() are always called from the Tk main loop.
+    """
+
+    def __init__(self, root, max_workers=4, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='nuitkalicious')
+        self._results = queue.Queue()
+        self._callbacks = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        self.tasks = {}
+        self.root.after(self.poll_ms, self._drain)
+
+    def submit(self, fn, *args, name=None, on_done=None, on_error=None,
+               on_progress=None, on_cancelled=None, **kwargs):
+        """Run fn(task, *args, **kwargs) on the pool and return the Task"""
+        task = Task(self, next(self._ids), name or getattr(fn, '__name__', 'task'))
+        self._callbacks[task.id] = (on_done, on_error, on_progress, on_cancelled)
+        self.tasks[task.id] = task
+
+        def run():
+            try:
+                task.check_cancelled()
+                result = fn(task, *args, **kwargs)
+                task.check_cancelled()
+            except TaskCancelled:
+                self._post('cancelled', task, None)
+            except Exception as e:
+                self._post('cancelled' if task.cancelled else 'error', task, e)
+            else:
+                self._post('done', task, result)
+
+        self._pool.submit(run)
+        return task
+
+    def _post(self, kind, task, payload):
+        self._results.put((kind, task, payload))
+
+    def call_in_main(self, fn, *args):
+        """Run fn(*args) on the Tk thread; safe to call from any thread"""
+        self._post('call', None, (fn, args))
+
+    def running(self):
+        return [task for task in self.tasks.values() if not task.done]
+
+    def cancel_all(self):
+        for task in self.running():
+            task.cancel()
+
+    def _drain(self):
+        # Deliver everything the workers posted since the last tick
+        try:
+            while True:
+                kind, task, payload = self._results.get_nowait()
+                if kind == 'call':
+                    fn, args = payload
+                    try:
+                        fn(*args)
+                    except Exception as e:
+                        print(f"Error in main thread call {fn}: {e}")
+                    continue
+                on_done, on_error, on_progress, on_cancelled = self._callbacks.get(
+                    task.id, (None, None, None, None))
+                if kind == 'progress':
+                    if on_progress and not task.done:
+                        on_progress(*payload)
+                    continue
+
+                task.done = True
+                self._callbacks.pop(task.id, None)
+                self.tasks.pop(task.id, None)
+                try:
+                    if kind == 'done' and on_done:
+                        on_done(payload)
+                    elif kind == 'error' and on_error:
+                        on_error(payload)
+                    elif kind == 'cancelled' and on_cancelled:
+                        on_cancelled()
+                except Exception as e:
+                    print(f"Error in callback for task {task.name}: {e}")
+        except queue.Empty:
+            pass
+        if not self._closed:
+            self.root.after(self.poll_ms, self._drain)
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel_all()
+        self._pool.shutdown(wait=False)
+
+
+def run_process(task, args, on_line=None, **popen_kwargs):
+    """Run a subprocess from a worker, streaming output lines and honouring cancel
+
+    Returns (returncode, output). Output lines are also reported as task
+    progress unless on_line is given.
+    """
+    if os.name == 'nt':
+        popen_kwargs.setdefault('creationflags', subprocess.CREATE_NO_WINDOW)
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        errors='replace',
+        **popen_kwargs
+    )
+    task.on_cancel(process.terminate)
+
+    output = []
+    for line in process.stdout:
+        line = line.rstrip()
+        output.append(line)
+        if not line:
+            continue
+        if on_line:
+            on_line(line)
+        else:
+            task.report_progress(line)
+    process.wait()
+    task.check_cancelled()
+    return process.returncode, '\n'.join(output)
@@ -0,0 +1,369 @@
+"""
+Nuitkalicious - Tcl/Tk trimming
+Description: Works out which parts of the Tcl and Tk libraries a tkinter
+program needs and stages a trimmed copy for Nuitka's tk-inter plugin. The
+target interpreter is asked about its Tcl (info library, encoding system);
+optional trace runs record the Tcl packages, encodings, msgcat locales and
+clock use of the real program. Everything else (unused encodings, message
+catalogs, timezone data, demos, images, unused packages) is left out, and the
+saving is reported in files, bytes and Tcl/Tk start-up time.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+
+from app_paths import app_data_dir
+
+# Encodings built into Tcl or needed by Tk wherever it runs
+BASE_ENCODINGS = {'ascii', 'utf-8', 'iso8859-1', 'cp1252', 'unicode', 'identity'}
+# Packages Tk itself loads
+BASE_PACKAGES = {'msgcat'}
+# Folders of the Tk library no program needs at run time
+TK_DROP = {'demos', 'images'}
+
+_PROBE = r'''
+import json, os, tkinter
+tcl = tkinter.Tcl()
+library = tcl.eval('info library')
+version = tcl.eval('info tclversion')
+print(json.dumps({
+    'tcl_library': os.path.normpath(library),
+    'tk_library': os.path.normpath(os.environ.get('TK_LIBRARY') or
+                                   os.path.join(os.path.dirname(library), 'tk' + version)),
+    'version': version,
+    'patchlevel': tcl.eval('info patchlevel'),
+    'encoding': tcl.eval('encoding system'),
+}))
+'''
+
+# Runs inside the traced interpreter: python _tcl_bootstrap.py OUTPUT -- script args...
+# Every Tcl interpreter the program creates records its sourced files and the
+# encodings it converts with; what was used is written when it is destroyed or at exit.
+_BOOTSTRAP = r'''
+import atexit, json, os, runpy, sys, tkinter
+
+_output = os.path.abspath(sys.argv[1])
+_seen = {'packages': set(), 'encodings': set(), 'locales': set(), 'sourced': set()}
+_interps = []
+_HOOK = """
+if {[info commands ::__nk_source] eq ""} {
+    set ::__nk_sourced {}
+    set ::__nk_encodings {}
+    rename ::source ::__nk_source
+    proc ::source {args} {
+        lappend ::__nk_sourced [lindex $args end]
+        uplevel 1 [linsert $args 0 ::__nk_source]
+    }
+    rename ::encoding ::__nk_encoding
+    proc ::encoding {args} {
+        if {[lindex $args 0] in {convertto convertfrom} && [llength $args] == 3} {
+            lappend ::__nk_encodings [lindex $args 1]
+        } elseif {[lindex $args 0] eq "system" && [llength $args] == 2} {
+            lappend ::__nk_encodings [lindex $args 1]
+        }
+        uplevel 1 [linsert $args 0 ::__nk_encoding]
+    }
+}
+"""
+_COLLECT = """
+set __nk_present {}
+foreach __nk_name [package names] {
+    if {![catch {package present $__nk_name}]} { lappend __nk_present $__nk_name }
+}
+list $__nk_present $::__nk_sourced [concat $::__nk_encodings [::__nk_encoding system]] \
+    [expr {[package provide msgcat] ne "" ? [::msgcat::mcpreferences] : {}}]
+"""
+
+def _collect(tk):
+    try:
+        packages, sourced, encodings, locales = tk.splitlist(tk.eval(_COLLECT))
+    except Exception:
+        return
+    for key, value in (('packages', packages), ('sourced', sourced), ('encodings', encodings),
+                       ('locales', locales)):
+        _seen[key].update(item for item in tk.splitlist(value) if item)
+
+_init = tkinter.Tk.__init__
+_destroy = tkinter.Tk.destroy
+
+def __init__(self, *args, **kwargs):
+    _init(self, *args, **kwargs)
+    self.tk.eval(_HOOK)
+    _interps.append(self.tk)
+
+def destroy(self):
+    _collect(self.tk)
+    _destroy(self)
+
+tkinter.Tk.__init__ = __init__
+tkinter.Tk.destroy = destroy
+
+def _write():
+    for tk in _interps:
+        _collect(tk)
+    with open(_output, 'w') as f:
+        json.dump({key: sorted(values) for key, values in _seen.items()}, f)
+
+atexit.register(_write)
+target = sys.argv[sys.argv.index('--') + 1:]
+sys.argv = target
+sys.path[0] = os.path.dirname(os.path.abspath(target[0]))
+runpy.run_path(target[0], run_name='__main__')
+'''
+
+_STARTUP = r'''
+import sys, time, tkinter
+start = time.perf_counter()
+try:
+    root = tkinter.Tk()
+    root.withdraw()
+    root.update()
+    root.destroy()
+    kind = 'tk'
+except tkinter.TclError:
+    # No display: time the Tcl side only
+    start = time.perf_counter()
+    tkinter.Tcl().eval('package require msgcat')
+    kind = 'tcl'
+print(kind, time.perf_counter() - start)
+'''
+
+
+class TrimError(Exception):
+    """Raised when the interpreter's Tcl/Tk cannot be found or staged"""
+
+
+def probe_tcl(python_path):
+    """Return the target interpreter's Tcl/Tk libraries, version and system encoding"""
+    result = subprocess.run([python_path, '-c', _PROBE], capture_output=True, text=True,
+                            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+    if result.returncode != 0:
+        raise TrimError(f"Could not ask {python_path} about Tcl/Tk: {result.stderr.strip()}")
+    info = json.loads(result.stdout)
+    for key in ('tcl_library', 'tk_library'):
+        if not os.path.isdir(info[key]):
+            raise TrimError(f"{info[key]} does not exist; set TK_LIBRARY if Tk lives elsewhere")
+    return info
+
+
+def bootstrap_path():
+    """Write the Tcl tracer bootstrap to the app data folder and return its path"""
+    path = os.path.join(app_data_dir('tcltrim'), '_tcl_bootstrap.py')
+    try:
+        with open(path, 'r') as f:
+            if f.read() == _BOOTSTRAP:
+                return path
+    except OSError:
+        pass
+    with open(path, 'w') as f:
+        f.write(_BOOTSTRAP)
+    return path
+
+
+def trace_command(python_path, script_path, run_args, output_path):
+    """Return the command for one traced run of a tkinter program"""
+    return [python_path, bootstrap_path(), output_path, '--', os.path.abspath(script_path)] + list(run_args)
+
+
+class TclTraceStore:
+    """Merged Tcl traces of one script, kept under the app data folder"""
+
+    def __init__(self, script_path, root=None):
+        self.script_path = os.path.abspath(script_path)
+        key = hashlib.sha256(os.path.normcase(self.script_path).encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(root or app_data_dir('tcltrim'), f'{key}.json')
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'script': self.script_path, 'runs': 0, 'packages': [], 'encodings': [], 'locales': [],
+                    'sourced': []}
+
+    def output_path(self):
+        return f"{self.path[:-5]}-{os.getpid()}-{time.time_ns()}.run.json"
+
+    def merge(self, output_path):
+        """Fold one run into the store and return the merged trace"""
+        trace = self.load()
+        try:
+            with open(output_path, 'r') as f:
+                run = json.load(f)
+        finally:
+            os.remove(output_path)
+        for key in ('packages', 'encodings', 'locales', 'sourced'):
+            trace[key] = sorted(set(trace[key]) | set(run.get(key, [])))
+        trace['runs'] += 1
+        with open(self.path, 'w') as f:
+            json.dump(trace, f, indent=1)
+        return trace
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def needs_from(info, trace, options):
+    """Return what the program needs: {'packages', 'encodings', 'locales', 'clock'}"""
+    settings = options['tcl_trim']
+    encodings = BASE_ENCODINGS | {info['encoding']} | set(trace['encodings']) | set(settings['encodings'])
+    locales = {locale.lower() for locale in set(trace['locales']) | set(settings['locales']) if locale}
+    return {
+        'packages': BASE_PACKAGES | {name.split('::')[0] for name in trace['packages']},
+        'encodings': {name.lower() for name in encodings},
+        'locales': locales,
+        # clock.tcl is sourced on first use of clock format/scan; it needs msgs and tzdata
+        'clock': any(os.path.basename(path) == 'clock.tcl' for path in trace['sourced']),
+    }
+
+
+def _package_of(relative):
+    # tcl8/8.5/msgcat-1.6.1.tm -> msgcat (Debian drops the 8.5/); tcl8/8.4/platform/shell-1.1.4.tm -> platform;
+    # http1.0/http.tcl -> http
+    parts = relative.split('/')
+    if parts[0] == 'tcl8':
+        parts = [part for part in parts[1:] if not re.fullmatch(r'[\d.]+', part)]
+        return parts[0].split('-')[0]
+    return re.sub(r'[\d.]+$', '', parts[0])
+
+
+def _files(root):
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            yield os.path.relpath(path, root).replace(os.sep, '/'), path
+
+
+def select_files(info, needs):
+    """Return {'tcl': [(relative, path)], 'tk': [...]} of the files to keep, and the full counts"""
+    kept = {'tcl': [], 'tk': []}
+    full = {'files': 0, 'bytes': 0}
+    for side, root in (('tcl', info['tcl_library']), ('tk', info['tk_library'])):
+        for relative, path in _files(root):
+            full['files'] += 1
+            full['bytes'] += os.path.getsize(path)
+            parts = relative.split('/')
+            stem = os.path.splitext(parts[-1])[0].lower()
+            if len(parts) == 1:
+                keep = True
+            elif side == 'tk':
+                if parts[0] == 'msgs':
+                    keep = stem in needs['locales'] or stem.split('_')[0] in needs['locales']
+                else:
+                    keep = parts[0] not in TK_DROP
+            elif parts[0] == 'encoding':
+                keep = stem in needs['encodings']
+            elif parts[0] == 'msgs':
+                keep = needs['clock'] and (stem in needs['locales'] or stem.split('_')[0] in needs['locales'])
+            elif parts[0] == 'tzdata':
+                keep = needs['clock']
+            else:
+                keep = _package_of(relative) in needs['packages']
+            if keep:
+                kept[side].append((relative, path))
+    return kept, full
+
+
+def staging_dir(script_path):
+    """Return the folder the trimmed tcl/ and tk/ libraries are staged in"""
+    return os.path.splitext(os.path.abspath(script_path))[0] + '.tcltk'
+
+
+def stage(script_path, kept):
+    """Copy the kept files into the staging folder, unless it already holds exactly them"""
+    folder = staging_dir(script_path)
+    listing = {side: sorted(f'{relative}:{os.path.getsize(path)}:{os.stat(path).st_mtime_ns}'
+                            for relative, path in files) for side, files in kept.items()}
+    marker = os.path.join(folder, 'selection.json')
+    try:
+        with open(marker, 'r') as f:
+            if json.load(f) == listing:
+                return folder
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(folder, ignore_errors=True)
+    for side, files in kept.items():
+        for relative, path in files:
+            target = os.path.join(folder, side, *relative.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                # Hard links when the library is on the same disk; copies otherwise
+                os.link(path, target)
+            except OSError:
+                shutil.copy2(path, target)
+    with open(marker, 'w') as f:
+        json.dump(listing, f)
+    return folder
+
+
+def measure_startup(python_path, tcl_library, tk_library, repeat=5):
+    """Return (median seconds, 'tk' or 'tcl') to bring Tcl/Tk up with the given libraries"""
+    import statistics
+
+    env = dict(os.environ, TCL_LIBRARY=tcl_library, TK_LIBRARY=tk_library)
+    times, kind = [], 'tcl'
+    for _ in range(repeat):
+        result = subprocess.run([python_path, '-c', _STARTUP], capture_output=True, text=True, env=env,
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+        if result.returncode != 0:
+            raise TrimError(f"Tcl/Tk did not start with {tcl_library}: {result.stderr.strip()[-300:]}")
+        kind, seconds = result.stdout.split()
+        times.append(float(seconds))
+    return statistics.median(times), kind
+
+
+class TrimReport:
+    """What trimming kept and saved"""
+
+    def __init__(self, folder, kept, full, needs, runs):
+        self.folder = folder
+        self.needs = needs
+        self.runs = runs
+        self.files = sum(len(files) for files in kept.values())
+        self.bytes = sum(os.path.getsize(path) for files in kept.values() for _relative, path in files)
+        self.full_files = full['files']
+        self.full_bytes = full['bytes']
+        self.full_startup = None
+        self.trimmed_startup = None
+        self.startup_kind = None
+
+    def lines(self):
+        lines = [f"Tcl/Tk payload: {self.full_files} files, {self.full_bytes / 1024:.0f} KB -> "
+                 f"{self.files} files, {self.bytes / 1024:.0f} KB "
+                 f"(saves {self.full_files - self.files} files, {(self.full_bytes - self.bytes) / 1024:.0f} KB)",
+                 f"Encodings kept: {', '.join(sorted(self.needs['encodings']))}",
+                 f"Packages kept: {', '.join(sorted(self.needs['packages']))}",
+                 f"Locales kept: {', '.join(sorted(self.needs['locales'])) or 'none (English)'}"
+                 + ("; clock data kept" if self.needs['clock'] else "")]
+        if not self.runs:
+            lines.append("No trace runs yet: only Tk's own needs are kept. Trace the program to be sure.")
+        if self.full_startup is not None:
+            side = "Tk" if self.startup_kind == 'tk' else "Tcl (no display for Tk)"
+            lines.append(f"{side} start-up: {self.full_startup * 1000:.1f} ms -> {self.trimmed_startup * 1000:.1f} ms")
+        return lines
+
+
+def prepare_tcl_trim(options, python_path, progress=None, measure=False):
+    """Stage the trimmed Tcl/Tk libraries for a script; returns a TrimReport"""
+    if progress:
+        progress("Trimming Tcl/Tk...")
+    info = probe_tcl(python_path)
+    trace = TclTraceStore(options['script']).load()
+    needs = needs_from(info, trace, options)
+    kept, full = select_files(info, needs)
+    folder = stage(options['script'], kept)
+    report = TrimReport(folder, kept, full, needs, trace['runs'])
+    if measure:
+        if progress:
+            progress("Timing Tcl/Tk start-up, full and trimmed...")
+        report.full_startup, report.startup_kind = measure_startup(python_path, info['tcl_library'],
+                                                                   info['tk_library'])
+        report.trimmed_startup, _kind = measure_startup(python_path, os.path.join(folder, 'tcl'),
+                                                        os.path.join(folder, 'tk'))
+    return report
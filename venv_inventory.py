@@ -0,0 +1,225 @@
+"""
+Nuitkalicious - Virtual environment inventory
+Description: Finds virtual environments under a project root and probes them
+in parallel for their Python version, Nuitka version and the packages that
+Nuitka plugins exist for. Probes are cached against the mtimes of the venv's
+site-packages and pyvenv.cfg, so asking again about an unchanged venv costs
+a couple of stat calls instead of starting an interpreter.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app_paths import app_data_dir
+from nuitka_options import venv_python
+
+# Directories never worth descending into while looking for venvs
+SKIP_DIRS = {'.git', '.hg', '.svn', 'node_modules', '__pycache__', '.tox', '.nox',
+             '.mypy_cache', '.pytest_cache', 'build', 'dist'}
+
+# One interpreter start answers everything; importlib.metadata is far cheaper than `pip list`
+_PROBE = r'''
+import importlib.util, json, sys
+from importlib import metadata
+
+def dist_version(name):
+    try:
+        return metadata.version(name)
+    except Exception:
+        return ''
+
+nuitka = dist_version('nuitka')
+if not nuitka and importlib.util.find_spec('nuitka') is not None:
+    # Nuitka importable without package metadata (e.g. a source checkout)
+    try:
+        from nuitka.Version import getNuitkaVersion
+        nuitka = getNuitkaVersion()
+    except Exception:
+        nuitka = 'unknown'
+
+plugins = {}
+for plugin, dist in (('pyqt6', 'PyQt6'), ('pyqt5', 'PyQt5'), ('pyside6', 'PySide6'),
+                     ('pyside2', 'PySide2'), ('matplotlib', 'matplotlib'), ('numpy', 'numpy')):
+    version = dist_version(dist)
+    if version:
+        plugins[plugin] = f'{dist} {version}'
+if importlib.util.find_spec('_tkinter') is not None:
+    plugins['tk-inter'] = 'tkinter'
+
+print(json.dumps({'python_version': sys.version.split()[0], 'nuitka_version': nuitka,
+                  'plugins': plugins}))
+'''
+
+
+class VenvInfo:
+    """What a probe found out about one environment"""
+
+    def __init__(self, path, python, python_version='', nuitka_version='', plugins=None, error=None):
+        self.path = path
+        self.python = python
+        self.python_version = python_version
+        self.nuitka_version = nuitka_version
+        self.plugins = plugins or {}
+        self.error = error
+
+    @property
+    def has_nuitka(self):
+        return bool(self.nuitka_version)
+
+    def to_dict(self):
+        return {'path': self.path, 'python': self.python, 'python_version': self.python_version,
+                'nuitka_version': self.nuitka_version, 'plugins': self.plugins}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['path'], data['python'], data.get('python_version', ''),
+                   data.get('nuitka_version', ''), data.get('plugins'))
+
+
+def is_venv(path):
+    return os.path.isfile(os.path.join(path, 'pyvenv.cfg'))
+
+
+def find_venvs(root, max_depth=3):
+    """Return the virtual environments at or below root, shallowest first"""
+    found = []
+    root = os.path.abspath(root)
+    pending = [(root, 0)]
+    while pending:
+        directory, depth = pending.pop(0)
+        if is_venv(directory):
+            # Nothing inside a venv is another project's venv
+            found.append(directory)
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name in SKIP_DIRS or entry.is_symlink():
+                continue
+            if entry.is_dir():
+                pending.append((entry.path, depth + 1))
+    return found
+
+
+def site_packages(venv_dir):
+    """Return the venv's site-packages directory, or None if it has none"""
+    if os.name == 'nt':
+        path = os.path.join(venv_dir, 'Lib', 'site-packages')
+        return path if os.path.isdir(path) else None
+    lib = os.path.join(venv_dir, 'lib')
+    try:
+        versions = sorted(name for name in os.listdir(lib) if name.startswith('python'))
+    except OSError:
+        return None
+    for name in versions:
+        path = os.path.join(lib, name, 'site-packages')
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def venv_fingerprint(venv_dir):
+    """Return the mtimes that change whenever packages are (un)installed or the venv is rebuilt"""
+    stamps = []
+    for path in (site_packages(venv_dir), os.path.join(venv_dir, 'pyvenv.cfg')):
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except (OSError, TypeError):
+            stamps.append(None)
+    return stamps
+
+
+def probe_interpreter(python_path, timeout=60):
+    """Run the probe in an interpreter and return (python_version, nuitka_version, plugins)"""
+    result = subprocess.run(
+        [python_path, '-c', _PROBE],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip()
+                           else f"{python_path} exited with code {result.returncode}")
+    data = json.loads(lines[-1])
+    return data['python_version'], data['nuitka_version'], data['plugins']
+
+
+class VenvInventory:
+    """Probe virtual environments in parallel, caching results per venv"""
+
+    def __init__(self, cache_path=None, max_workers=None):
+        self.cache_path = cache_path or os.path.join(app_data_dir(), 'venv_inventory.json')
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self._cache = None
+
+    def _load(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_path, 'r') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save(self):
+        with open(self.cache_path + '.tmp', 'w') as f:
+            json.dump(self._cache, f, indent=1)
+        os.replace(self.cache_path + '.tmp', self.cache_path)
+
+    def cached(self, venv_dir):
+        """Return the cached VenvInfo if the venv has not changed since it was probed"""
+        venv_dir = os.path.abspath(venv_dir)
+        with self._lock:
+            entry = self._load().get(venv_dir)
+        if entry and entry['fingerprint'] == venv_fingerprint(venv_dir):
+            return VenvInfo.from_dict(entry['info'])
+        return None
+
+    def probe(self, venv_dir, refresh=False):
+        """Return a VenvInfo for venv_dir, probing only when it has changed"""
+        venv_dir = os.path.abspath(venv_dir)
+        if not refresh:
+            info = self.cached(venv_dir)
+            if info is not None:
+                return info
+
+        python = venv_python(venv_dir)
+        fingerprint = venv_fingerprint(venv_dir)
+        try:
+            python_version, nuitka_version, plugins = probe_interpreter(python)
+        except (OSError, ValueError, RuntimeError, subprocess.SubprocessError) as e:
+            # Failures are not cached; a broken venv may be repaired at any time
+            return VenvInfo(venv_dir, python, error=str(e))
+        info = VenvInfo(venv_dir, python, python_version, nuitka_version, plugins)
+        with self._lock:
+            self._load()[venv_dir] = {'fingerprint': fingerprint, 'info': info.to_dict()}
+            self._save()
+        return info
+
+    def probe_all(self, venv_dirs, refresh=False):
+        """Probe several venvs at once; returns VenvInfos in the same order"""
+        venv_dirs = list(venv_dirs)
+        if len(venv_dirs) <= 1:
+            return [self.probe(path, refresh) for path in venv_dirs]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(lambda path: self.probe(path, refresh), venv_dirs))
+
+    def scan(self, root, max_depth=3, refresh=False):
+        """Find and probe every venv under root"""
+        return self.probe_all(find_venvs(root, max_depth), refresh)
+
+    def invalidate(self, venv_dir):
+        """Forget a venv, e.g. after installing into it"""
+        with self._lock:
+            if self._load().pop(os.path.abspath(venv_dir), None) is not None:
+                self._save()
@@ -0,0 +1,127 @@
+"""
+Nuitkalicious - Pre-provisioned venv pool
+Description: Keeps one ready-made template venv per Python version and
+requirement set, populated from the wheelhouse, and clones it into place
+with hardlinks (copy-on-write or a plain copy where links are not possible)
+instead of creating and populating a fresh venv.
+"""
+
+import os
+import shutil
+import sys
+
+from app_paths import app_data_dir
+from nuitka_options import venv_python
+from venv_inventory import probe_interpreter
+from wheelhouse import BUILD_REQUIREMENTS, requirements_hash
+
+# Small text files that embed the venv's own path and are rewritten on clone
+_SCRIPT_DIR = 'Scripts' if os.name == 'nt' else 'bin'
+_MAX_REWRITE_BYTES = 256 * 1024
+
+
+def _clone_file(source, dest):
+    # Hardlink when possible; fall back to a copy (copy-on-write on filesystems that do it)
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+def _clone_tree(source, dest):
+    for directory, dirnames, filenames in os.walk(source):
+        target = os.path.join(dest, os.path.relpath(directory, source))
+        os.makedirs(target, exist_ok=True)
+        for name in dirnames + filenames:
+            path = os.path.join(directory, name)
+            if os.path.islink(path):
+                # e.g. bin/python -> the base interpreter
+                os.symlink(os.readlink(path), os.path.join(target, name))
+                if name in dirnames:
+                    dirnames.remove(name)
+            elif name in filenames:
+                _clone_file(path, os.path.join(target, name))
+
+
+def _rewrite_paths(venv_dir, old, new):
+    # Activate scripts and console-script shebangs name the venv they were made in
+    script_dir = os.path.join(venv_dir, _SCRIPT_DIR)
+    old_bytes, new_bytes = old.encode('utf-8'), new.encode('utf-8')
+    for name in os.listdir(script_dir):
+        path = os.path.join(script_dir, name)
+        if os.path.islink(path) or not os.path.isfile(path) or os.path.getsize(path) > _MAX_REWRITE_BYTES:
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        # Binary launchers are left alone; Nuitka is always run as python -m nuitka
+        if old_bytes not in data or b'\0' in data:
+            continue
+        mode = os.stat(path).st_mode
+        # Replace rather than edit in place: the file is hardlinked to the template
+        os.unlink(path)
+        with open(path, 'wb') as f:
+            f.write(data.replace(old_bytes, new_bytes))
+        os.chmod(path, mode)
+
+
+class VenvPool:
+    """Template venvs keyed by Python version and requirements"""
+
+    def __init__(self, root=None):
+        self.root = root or app_data_dir('venv_pool')
+
+    def template_dir(self, python_version, requirements=BUILD_REQUIREMENTS, requirements_file=None):
+        return os.path.join(self.root, f"py{python_version}-{requirements_hash(requirements, requirements_file)}")
+
+    def templates(self):
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isfile(os.path.join(self.root, name, 'pyvenv.cfg')))
+
+    def provision(self, base_python, wheelhouse, run, requirements=BUILD_REQUIREMENTS,
+                  requirements_file=None, log=None):
+        """Return the template for base_python, building it from the wheelhouse if needed
+
+        run(args) runs a command and returns (returncode, output).
+        """
+        python_version, _nuitka, _plugins = probe_interpreter(base_python)
+        template = self.template_dir(python_version, requirements, requirements_file)
+        if os.path.isfile(os.path.join(template, 'pyvenv.cfg')):
+            return template
+
+        if log:
+            log(f"Creating template venv for Python {python_version}...")
+        staging = template + '.partial'
+        shutil.rmtree(staging, ignore_errors=True)
+        steps = ([base_python, '-m', 'venv', staging],
+                 wheelhouse.install_args(venv_python(staging), requirements, requirements_file))
+        for args in steps:
+            returncode, output = run(args)
+            if returncode != 0:
+                shutil.rmtree(staging, ignore_errors=True)
+                detail = f":\n{output[-2000:]}" if output else ""
+                raise RuntimeError(f"{args[0]} failed with exit code {returncode}{detail}")
+        _rewrite_paths(staging, staging, template)
+        # Publish atomically so a half-built template is never cloned
+        os.replace(staging, template)
+        return template
+
+    def clone(self, template, dest):
+        """Clone a template venv to dest, which must not exist yet"""
+        if os.path.exists(dest):
+            raise FileExistsError(f"{dest} already exists")
+        dest = os.path.abspath(dest)
+        staging = dest + '.partial'
+        shutil.rmtree(staging, ignore_errors=True)
+        _clone_tree(template, staging)
+        _rewrite_paths(staging, template, dest)
+        os.replace(staging, dest)
+        return dest
+
+    def checkout(self, dest, wheelhouse, run, base_python=None, requirements=BUILD_REQUIREMENTS,
+                 requirements_file=None, log=None):
+        """Provision (if needed) and clone a ready venv to dest"""
+        template = self.provision(base_python or sys.executable, wheelhouse, run, requirements,
+                                  requirements_file, log)
+        if log:
+            log(f"Cloning {os.path.basename(template)} to {dest}...")
+        return self.clone(template, dest)
@@ -0,0 +1,63 @@
+"""
+Nuitkalicious - Offline wheelhouse
+Description: A local folder of wheels for Nuitka, its helpers and a project's
+requirements. Fill it once on a connected machine (or copy it onto an
+air-gapped builder) and every later install runs with no index access.
+"""
+
+import hashlib
+import os
+
+from app_paths import app_data_dir
+
+# Nuitka plus the optional packages it uses for onefile compression and ordered sets
+BUILD_REQUIREMENTS = ('nuitka', 'ordered-set', 'zstandard')
+
+
+def requirements_hash(requirements=(), requirements_file=None):
+    """Return a short hash identifying a set of requirements"""
+    digest = hashlib.sha256('\n'.join(sorted(requirements)).encode('utf-8'))
+    if requirements_file and os.path.isfile(requirements_file):
+        with open(requirements_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:10]
+
+
+def find_requirements_file(script_path):
+    """Return requirements.txt next to a script, or None"""
+    if not script_path:
+        return None
+    path = os.path.join(os.path.dirname(os.path.abspath(script_path)), 'requirements.txt')
+    return path if os.path.isfile(path) else None
+
+
+class Wheelhouse:
+    """A folder of wheels that pip installs from with --no-index"""
+
+    def __init__(self, root=None):
+        # NUITKALICIOUS_WHEELHOUSE points builders at a shared or copied-in folder
+        self.root = root or os.environ.get('NUITKALICIOUS_WHEELHOUSE') or app_data_dir('wheelhouse')
+        os.makedirs(self.root, exist_ok=True)
+
+    def wheels(self):
+        return sorted(name for name in os.listdir(self.root) if name.endswith('.whl'))
+
+    def is_empty(self):
+        return not self.wheels()
+
+    def _requirement_args(self, requirements, requirements_file):
+        args = list(requirements)
+        if requirements_file:
+            args.extend(['-r', requirements_file])
+        return args
+
+    def fill_args(self, python_path, requirements=BUILD_REQUIREMENTS, requirements_file=None):
+        """Return the pip command that builds or downloads wheels into the wheelhouse"""
+        # pip wheel (not download) so sdist-only packages such as Nuitka arrive as wheels
+        return [python_path, '-m', 'pip', 'wheel', '--wheel-dir', self.root,
+                *self._requirement_args(requirements, requirements_file)]
+
+    def install_args(self, python_path, requirements=BUILD_REQUIREMENTS, requirements_file=None):
+        """Return the pip command that installs from the wheelhouse only"""
+        return [python_path, '-m', 'pip', 'install', '--no-index', '--find-links', self.root,
+                *self._requirement_args(requirements, requirements_file)]